@@ -0,0 +1,187 @@
+"""Several games in one window, each in its own corner of it
+
+    python -m game.arena --players 2
+    python -m game.arena --benchmark
+
+Every game is a GameManager drawing into a subsurface of the window at the
+game's own resolution, two players are stacked and three or four share a
+2x2 grid. They share one SharedAssets, so fonts, the background, the jump
+table, the sound effects and the cached shadow and overlay surfaces are
+built once no matter how many games are running.
+
+The random module and the frame clock belong to the process, so the games
+share them too. The first game advances the clock and the others update
+after it on the same frame, and only the first one drives the music.
+Courses still differ per game unless --seed gives them all the same one.
+"""
+import os
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'  # Hide Pygame welcome message
+
+import argparse
+import time
+import pygame
+from game.game_manager import GameManager
+from game.utils.animation import frame_clock
+from game.utils.constants import SCREEN_WIDTH, SCREEN_HEIGHT, WHITE
+from game.utils.display import create_display
+from game.utils.shared import SharedAssets
+
+MAX_PLAYERS = 4
+# Jump key of each player, pressing it sends SPACE to that player's game
+JUMP_KEYS = (pygame.K_SPACE, pygame.K_RETURN, pygame.K_UP, pygame.K_w)
+# Keys every game gets, M only goes to the first since they share the music
+SHARED_KEYS = (pygame.K_p, pygame.K_F3)
+
+
+def grid(players):
+    """(columns, rows) of the window layout for a number of players"""
+    columns = 1 if players <= 2 else 2
+    return columns, (players + columns - 1) // columns
+
+
+class Arena:
+    """A GameManager per player, each drawing into its cell of one surface
+
+    Args:
+        window (pygame.Surface): Surface the games are laid out on, at least
+            grid(players) game resolutions in size
+        players (int): Number of games, 1 to MAX_PLAYERS
+        seed (int): Course seed of every game, None gives each a random course
+        audio (bool): Play sound effects and music
+        share_assets (bool): Give every game the same SharedAssets, the
+            benchmark turns this off to compare
+    """
+
+    def __init__(self, window, players, seed=None, audio=True, share_assets=True):
+        if not 1 <= players <= MAX_PLAYERS:
+            raise ValueError(f"players must be between 1 and {MAX_PLAYERS}")
+        self.window = window
+        self.assets = SharedAssets() if share_assets else None
+        columns, _ = grid(players)
+        self.games = []
+        for player in range(players):
+            column, row = player % columns, player // columns
+            screen = window.subsurface((column * SCREEN_WIDTH, row * SCREEN_HEIGHT,
+                                        SCREEN_WIDTH, SCREEN_HEIGHT))
+            game = GameManager(screen, seed=seed, audio=audio,
+                               assets=self.assets if share_assets else SharedAssets())
+            game.primary = player == 0
+            self.games.append(game)
+
+    def handle_event(self, event):
+        """Route a key to the games it belongs to"""
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key in JUMP_KEYS[:len(self.games)]:
+            player = JUMP_KEYS.index(event.key)
+            self.games[player].handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+        elif event.key in SHARED_KEYS:
+            for game in self.games:
+                game.handle_event(event)
+        elif event.key == pygame.K_m:
+            self.games[0].handle_event(event)
+
+    def update(self):
+        # The primary game goes first, it moves the shared clock to this frame
+        for game in self.games:
+            game.update()
+
+    def draw(self):
+        for game in self.games:
+            game.draw()
+
+    def record_frame_time(self, frame_ms):
+        """Every game sees the whole frame, so they shed quality together"""
+        for game in self.games:
+            game.record_frame_time(frame_ms)
+
+
+def run(players, seed=None):
+    """Play until the window is closed or Escape is pressed"""
+    pygame.init()
+    columns, rows = grid(players)
+    display = create_display('surface', (columns * SCREEN_WIDTH, rows * SCREEN_HEIGHT),
+                             "Sheep Jump! Arena")
+    display.screen.fill(WHITE)
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN])
+    arena = Arena(display.screen, players, seed=seed)
+
+    clock = pygame.time.Clock()
+    running = True
+    while running:
+        frame_start = time.perf_counter()
+        for game in arena.games:
+            game.latency.poll()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN
+                                             and event.key == pygame.K_ESCAPE):
+                running = False
+            else:
+                arena.handle_event(event)
+        arena.update()
+        arena.draw()
+        display.present()
+        arena.record_frame_time((time.perf_counter() - frame_start) * 1000)
+        clock.tick(60)
+    pygame.quit()
+
+
+def benchmark(frames=600, max_players=MAX_PLAYERS):
+    """Time setup and frames for growing numbers of games
+
+    Setup is timed with shared and with per-game assets. Frames are timed
+    with shared assets and every game playing, each jumps on its own rhythm
+    and restarts when it dies. Drawing goes to an offscreen surface, so
+    only the games are timed and not the window.
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    frame_clock.use_fixed_rate()
+    columns, rows = grid(max_players)
+    window = pygame.Surface((columns * SCREEN_WIDTH, rows * SCREEN_HEIGHT))
+
+    print("players  setup shared  setup separate  frame ms  per game")
+    for players in range(1, max_players + 1):
+        setups = {}
+        for share in (False, True):
+            start = time.perf_counter()
+            arena = Arena(window, players, seed=players, audio=False, share_assets=share)
+            setups[share] = (time.perf_counter() - start) * 1000
+
+        for game in arena.games:
+            game.start_game()
+        jump = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)
+        elapsed = 0
+        for frame in range(frames):
+            for player, game in enumerate(arena.games):
+                if game.is_game_over or (frame + player * 7) % 45 == 0:
+                    game.handle_event(jump)
+            start = time.perf_counter()
+            arena.update()
+            arena.draw()
+            elapsed += time.perf_counter() - start
+        frame_ms = elapsed * 1000 / frames
+        print(f"{players:7d}  {setups[True]:9.1f} ms  {setups[False]:11.1f} ms  "
+              f"{frame_ms:8.2f}  {frame_ms / players:8.2f}")
+    print(f"Shared assets: {arena.assets.stats()}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sheep Jump! for up to four players")
+    parser.add_argument('--players', type=int, default=2, choices=range(1, MAX_PLAYERS + 1),
+                        help="games in the window, jump with SPACE, RETURN, UP and W")
+    parser.add_argument('--seed', type=int, help="give every player the same course")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="print setup and frame time for 1 to 4 games and exit")
+    parser.add_argument('--frames', type=int, default=600, help="frames per benchmark run")
+    args = parser.parse_args(argv)
+    if args.benchmark:
+        benchmark(frames=args.frames)
+    else:
+        run(args.players, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
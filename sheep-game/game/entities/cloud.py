@@ -1,31 +1,47 @@
 import pygame
 import random
-import math
+from ..utils import ecs
+from ..utils.render_queue import CLOUDS
 from ..utils.constants import SCREEN_HEIGHT
+from ..utils.animation import RADIANS_TO_INDEX
 
-class Cloud:
-    def __init__(self, x):
-        self.x = x
-        self.y = random.randint(50, SCREEN_HEIGHT // 3 - 20)  # Keep clouds in upper part of screen
-        
-        # Just 3 circles in a line
-        self.radius = random.randint(15, 25)
-        
-        # Simple vertical drift
-        self.drift_counter = random.uniform(0, 6.28)
-        self.drift_speed = random.uniform(0.01, 0.02)
-        self.drift_amount = random.uniform(0.5, 1.0)
-        self.y_offset = 0
+SCROLL = 0.5  # Clouds move slower than obstacles
+CLOUD_COLOR = (255, 255, 255)
 
-    def update(self, game_speed):
-        self.x -= game_speed * 0.5  # Clouds move slower than obstacles
-        
-        # Subtle vertical movement
-        self.drift_counter += self.drift_speed
-        self.y_offset = math.sin(self.drift_counter) * self.drift_amount
 
-    def draw(self, screen):
-        # Draw exactly 3 white circles in a line to represent a cloud
-        pygame.draw.circle(screen, (255, 255, 255), (int(self.x), int(self.y + self.y_offset)), self.radius)
-        pygame.draw.circle(screen, (255, 255, 255), (int(self.x + self.radius*1.2), int(self.y + self.y_offset)), int(self.radius*0.8))
-        pygame.draw.circle(screen, (255, 255, 255), (int(self.x - self.radius*0.8), int(self.y + self.y_offset)), int(self.radius*0.9))
+def spawn(world, x):
+    """Add a cloud at x, returns its row"""
+    y = random.randint(50, SCREEN_HEIGHT // 3 - 20)  # Keep clouds in upper part of screen
+    
+    # Just 3 circles in a line
+    radius = random.randint(15, 25)
+    
+    # Simple vertical drift, in curve table indices
+    drift_phase = random.uniform(0, 6.28) * RADIANS_TO_INDEX
+    drift_step = random.uniform(0.01, 0.02) * RADIANS_TO_INDEX
+    drift_amount = random.uniform(0.5, 1.0)
+    return world.spawn(ecs.CLOUD, ('position', 'velocity', 'bounds', 'animation', 'renderable'),
+                       x=x, y=y, scroll=SCROLL,
+                       # Use radius * 3 as an approximation of the cloud's total width
+                       width=radius * 3, height=radius * 2,
+                       phase=drift_phase, step=drift_step, amount=drift_amount,
+                       radius=radius)
+
+
+def draw(queue, world, rows, tier, assets):
+    # Exactly 3 white circles in a line represent each cloud, one sprite per radius
+    queue.submit_all([(assets.surface(('cloud', radius), lambda: _render(radius)),
+                       (int(x) - 2 * radius, int(y + y_offset) - radius))
+                      for x, y, y_offset, radius in zip(
+                          world.x[rows].tolist(), world.y[rows].tolist(),
+                          world.offset[rows].tolist(), world.radius[rows].tolist())], CLOUDS)
+
+
+def _render(radius):
+    """A cloud centred at (2 * radius, radius) of a surface"""
+    surface = pygame.Surface((radius * 4 + 1, radius * 2 + 1), pygame.SRCALPHA)
+    x, y = radius * 2, radius
+    pygame.draw.circle(surface, CLOUD_COLOR, (x, y), radius)
+    pygame.draw.circle(surface, CLOUD_COLOR, (x + int(radius*1.2), y), int(radius*0.8))
+    pygame.draw.circle(surface, CLOUD_COLOR, (x - int(radius*0.8), y), int(radius*0.9))
+    return surface
@@ -0,0 +1,48 @@
+import random
+from ..utils import ecs
+from ..utils.render_queue import GROUND
+from ..utils.constants import (
+    GROUND_Y, GROUND_BROWN_DARK, SHADOW_OFFSET,
+    GRASS_GREEN, GRASS_GREEN_DARK, GRASS_GREEN_LIGHT
+)
+
+GROUND_SHADOW = (0, 0, 0, 30)  # Semi-transparent black
+
+
+def spawn_tuft(world, x):
+    """Add a grass tuft at x with a random size and shade, returns its row"""
+    height = random.randint(5, 15)
+    width = random.randint(2, 6)
+    color = random.choice([GRASS_GREEN, GRASS_GREEN_LIGHT, GRASS_GREEN_DARK])
+    return world.spawn(ecs.TUFT, ('position', 'velocity', 'bounds', 'renderable'),
+                       x=x, y=GROUND_Y - height, scroll=1.0, width=width, height=height,
+                       colors=color)
+
+
+def spawn_pattern(world, x, width, height):
+    """Add a dirt patch in the grass at x, returns its row"""
+    return world.spawn(ecs.PATTERN, ('position', 'velocity', 'bounds', 'renderable'),
+                       x=x, y=GROUND_Y - height, scroll=1.0, width=width, height=height)
+
+
+def draw_tufts(queue, world, rows, tier, assets):
+    if not tier.grass:
+        return
+    _draw_patches(queue, world, rows, tier, assets, [tuple(c) for c in world.colors[rows, 0].tolist()])
+
+
+def draw_patterns(queue, world, rows, tier, assets):
+    # Dirt/soil patches are all the same brown
+    _draw_patches(queue, world, rows, tier, assets, [GROUND_BROWN_DARK] * len(rows))
+
+
+def _draw_patches(queue, world, rows, tier, assets, colors):
+    commands = []
+    for x, width, height, color in zip(world.x[rows].tolist(), world.width[rows].tolist(),
+                                       world.height[rows].tolist(), colors):
+        # Draw shadow (using semi-transparent surface)
+        if tier.ground_shadows:
+            shadow_surface = assets.fill((width, height), GROUND_SHADOW)
+            commands.append((shadow_surface, (x + SHADOW_OFFSET, GROUND_Y - height + SHADOW_OFFSET)))
+        commands.append((assets.fill((width, height), color), (x, GROUND_Y - height)))
+    queue.submit_all(commands, GROUND)
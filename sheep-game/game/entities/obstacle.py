@@ -1,57 +1,42 @@
 import pygame
-import random
-from ..utils.constants import GROUND_Y, BLACK, WHITE
+from ..utils import ecs
+from ..utils.render_queue import OBSTACLES
+from ..utils.constants import GROUND_Y, BLACK, SHADOW_OFFSET
 
-class Obstacle:
-    def __init__(self, x):
-        self.width = 20
-        self.height = random.randint(30, 50)
-        self.x = x
-        self.y = GROUND_Y - self.height
-        self.points = 10  # Base points for jumping over a hurdle
-        self.rect = pygame.Rect(x, self.y, self.width, self.height)
-        
-        # Determine hurdle type and adjust points
-        if self.height <= 35:  # Low hurdle
-            self.points = 5
-        elif self.height >= 45:  # High hurdle
-            self.points = 20
-            
-        # Sometimes create a double hurdle
-        self.is_double = random.random() < 0.3
-        if self.is_double:
-            self.width = 40
-            self.points = 15
-            self.rect.width = self.width
+WIDTH = 20
+DOUBLE_WIDTH = 40
+POLE_WIDTH = 4
+PASS_POINTS = 10  # Awarded for getting past any obstacle
 
-    def update(self, game_speed):
-        self.x -= game_speed
-        self.rect.x = int(self.x)
 
-    def draw(self, screen):
-        # Draw poles
-        pole_width = 4
-        if self.is_double:
-            # First pole
-            pygame.draw.rect(screen, BLACK,
-                           (self.x, self.y,
-                            pole_width, self.height))
-            # Second pole
-            pygame.draw.rect(screen, BLACK,
-                           (self.x + self.width - pole_width, self.y,
-                            pole_width, self.height))
-            # Crossbar
-            pygame.draw.rect(screen, BLACK,
-                           (self.x, self.y,
-                            self.width, pole_width))
-        else:
-            # Single hurdle
-            pygame.draw.rect(screen, BLACK,
-                           (self.x, self.y,
-                            pole_width, self.height))
-            pygame.draw.rect(screen, BLACK,
-                           (self.x + self.width - pole_width, self.y,
-                            pole_width, self.height))
-            pygame.draw.rect(screen, BLACK,
-                           (self.x, self.y,
-                            self.width, pole_width))
+def spawn(world, x, height, is_double):
+    """Add an obstacle from the course at x, returns its row"""
+    width = DOUBLE_WIDTH if is_double else WIDTH
+    y = GROUND_Y - height
+    return world.spawn(ecs.OBSTACLE,
+                       ('position', 'velocity', 'bounds', 'hitbox', 'score', 'renderable'),
+                       x=x, y=y, scroll=1.0, width=width, height=height,
+                       hit_w=width, hit_h=height, hit_x=int(x), hit_y=y,
+                       points=PASS_POINTS, flags=ecs.DOUBLE if is_double else 0)
+
+
+def draw(queue, world, rows, tier, assets):
+    commands = []
+    for x, y, width, height in zip(world.x[rows].tolist(), world.y[rows].tolist(),
+                                   world.width[rows].tolist(), world.height[rows].tolist()):
+        # Draw shadow (using semi-transparent surface)
+        if tier.ground_shadows:
+            shadow_surface = assets.ellipse((width, height // 3), (0, 0, 0, 30))
+            commands.append((shadow_surface, (x + SHADOW_OFFSET, GROUND_Y - SHADOW_OFFSET)))
+        sprite = assets.surface(('obstacle', width, height), lambda: _render(width, height))
+        commands.append((sprite, (x, y)))
+    queue.submit_all(commands, OBSTACLES)
+
+
+def _render(width, height):
+    # Two poles and a crossbar, a double hurdle is just wider
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    pygame.draw.rect(surface, BLACK, (0, 0, POLE_WIDTH, height))
+    pygame.draw.rect(surface, BLACK, (width - POLE_WIDTH, 0, POLE_WIDTH, height))
+    pygame.draw.rect(surface, BLACK, (0, 0, width, POLE_WIDTH))
+    return surface
@@ -1,9 +1,15 @@
 import pygame
 import math
 from ..utils.constants import (
-    GROUND_Y, BLACK, WHITE, GRAVITY, JUMP_SPEED,
+    GROUND_Y, BLACK, WHITE, GRAVITY, JUMP_SPEED, JUMP_BUFFER_FRAMES,
     SHADOW_COLOR, SHADOW_OFFSET, GROUND_THICKNESS
 )
+from ..utils.render_queue import SHEEP
+
+# Extent of the sheep's sprite past its rect, for the ears, head and legs
+SPRITE_TOP = 8
+SPRITE_RIGHT = 8
+SPRITE_BOTTOM = 8
 
 class Sheep:
     def __init__(self, x=80, y=None):  # Default x position at 80
@@ -14,6 +20,7 @@ class Sheep:
         self.velocity_y = 0
         self.is_jumping = False
         self.jumps_left = 2
+        self.jump_buffer = 0  # Frames left to land and use a jump pressed too early
         self.rect = pygame.Rect(x, self.y, self.width - 14, self.height)  # Smaller hitbox
         
         # Animation settings
@@ -39,7 +46,10 @@ class Sheep:
                 self.is_jumping = True
             
             self.jumps_left -= 1
+            self.jump_buffer = 0
             return True
+        # Out of jumps, remember the press in case the sheep lands soon
+        self.jump_buffer = JUMP_BUFFER_FRAMES
         return False
 
     def update(self):
@@ -60,88 +70,101 @@ class Sheep:
         self.rect.x = int(self.x + 5)  # Adjust hitbox to be slightly inset
         self.rect.y = int(self.y)
 
-    def draw(self, screen):
+    def draw(self, queue, assets):
+        """Submit the sheep for the current leg frame and its shadow"""
+        frame_index = int(self.leg_frame) % len(self.leg_positions)
+        sprite = assets.surface(('sheep', self.width, self.height, frame_index),
+                                lambda: self._render(frame_index))
+        queue.submit(sprite, (int(self.x), int(self.y) - SPRITE_TOP), SHEEP)
+        
+        # Shadow
+        shadow_y = GROUND_Y - SHADOW_OFFSET
+        shadow_width = self.width * 0.7
+        shadow_height = 10
+        shadow_x = self.x + (self.width - shadow_width)/2
+        queue.submit(assets.ellipse((int(shadow_width), shadow_height), SHADOW_COLOR),
+                     (shadow_x, shadow_y), SHEEP)
+
+    def _render(self, frame_index):
+        """The sheep at (0, SPRITE_TOP) of a surface, the ears stick out above"""
+        surface = pygame.Surface((self.width + SPRITE_RIGHT, SPRITE_TOP + self.height + SPRITE_BOTTOM),
+                                 pygame.SRCALPHA)
+        x, y = 0, SPRITE_TOP
+        
         # Fluffy body
         body_width = self.width - 8
         body_height = self.height - 12
-        body_rect = pygame.Rect(self.x + 4, self.y + 8, body_width, body_height)
-        pygame.draw.rect(screen, BLACK, body_rect, border_radius=15)
+        body_rect = pygame.Rect(x + 4, y + 8, body_width, body_height)
+        pygame.draw.rect(surface, BLACK, body_rect, border_radius=15)
         
         # Wool texture (small circles around the body)
         for i in range(4):
             for j in range(2):
-                wool_x = self.x + 8 + (i * 10)
-                wool_y = self.y + 12 + (j * 10)
-                pygame.draw.circle(screen, WHITE, (wool_x, wool_y), 4)
+                wool_x = x + 8 + (i * 10)
+                wool_y = y + 12 + (j * 10)
+                pygame.draw.circle(surface, WHITE, (wool_x, wool_y), 4)
         
         # Cute head
         head_width = 20
         head_height = 18
-        head_x = self.x + self.width - 16
-        head_y = self.y + 4
-        pygame.draw.rect(screen, BLACK, (head_x, head_y, head_width, head_height), border_radius=8)
+        head_x = x + self.width - 16
+        head_y = y + 4
+        pygame.draw.rect(surface, BLACK, (head_x, head_y, head_width, head_height), border_radius=8)
         
         # Ears
         ear_width = 8
         ear_height = 12
         # Left ear
-        pygame.draw.ellipse(screen, BLACK, (head_x + 2, head_y - 6, ear_width, ear_height))
+        pygame.draw.ellipse(surface, BLACK, (head_x + 2, head_y - 6, ear_width, ear_height))
         # Right ear
-        pygame.draw.ellipse(screen, BLACK, (head_x + 10, head_y - 6, ear_width, ear_height))
+        pygame.draw.ellipse(surface, BLACK, (head_x + 10, head_y - 6, ear_width, ear_height))
         
         # Face details
         # Eyes
         eye_y = head_y + 6
         # Left eye
-        pygame.draw.circle(screen, WHITE, (head_x + 6, eye_y), 3)
-        pygame.draw.circle(screen, BLACK, (head_x + 6, eye_y), 2)
+        pygame.draw.circle(surface, WHITE, (head_x + 6, eye_y), 3)
+        pygame.draw.circle(surface, BLACK, (head_x + 6, eye_y), 2)
         # Right eye
-        pygame.draw.circle(screen, WHITE, (head_x + 14, eye_y), 3)
-        pygame.draw.circle(screen, BLACK, (head_x + 14, eye_y), 2)
+        pygame.draw.circle(surface, WHITE, (head_x + 14, eye_y), 3)
+        pygame.draw.circle(surface, BLACK, (head_x + 14, eye_y), 2)
         
         # Nose
         nose_x = head_x + head_width - 4
         nose_y = head_y + 10
-        pygame.draw.circle(screen, BLACK, (nose_x, nose_y), 3)
+        pygame.draw.circle(surface, BLACK, (nose_x, nose_y), 3)
         
-        # Get current leg positions
-        frame_index = int(self.leg_frame) % len(self.leg_positions)
+        # Leg positions of this frame
         left_leg_y, right_leg_y = self.leg_positions[frame_index]
         
         # Cute stubby legs
         leg_thickness = 4
         
         # Left legs (front and back)
-        left_leg_start1 = (self.x + 10, self.y + self.height - 8)
-        left_leg_end1 = (self.x + 8, self.y + self.height + left_leg_y)
-        pygame.draw.line(screen, BLACK, left_leg_start1, left_leg_end1, leg_thickness)
+        left_leg_start1 = (x + 10, y + self.height - 8)
+        left_leg_end1 = (x + 8, y + self.height + left_leg_y)
+        pygame.draw.line(surface, BLACK, left_leg_start1, left_leg_end1, leg_thickness)
         
-        left_leg_start2 = (self.x + 20, self.y + self.height - 8)
-        left_leg_end2 = (self.x + 18, self.y + self.height + left_leg_y)
-        pygame.draw.line(screen, BLACK, left_leg_start2, left_leg_end2, leg_thickness)
+        left_leg_start2 = (x + 20, y + self.height - 8)
+        left_leg_end2 = (x + 18, y + self.height + left_leg_y)
+        pygame.draw.line(surface, BLACK, left_leg_start2, left_leg_end2, leg_thickness)
         
         # Right legs (front and back)
-        right_leg_start1 = (self.x + self.width - 20, self.y + self.height - 8)
-        right_leg_end1 = (self.x + self.width - 22, self.y + self.height + right_leg_y)
-        pygame.draw.line(screen, BLACK, right_leg_start1, right_leg_end1, leg_thickness)
+        right_leg_start1 = (x + self.width - 20, y + self.height - 8)
+        right_leg_end1 = (x + self.width - 22, y + self.height + right_leg_y)
+        pygame.draw.line(surface, BLACK, right_leg_start1, right_leg_end1, leg_thickness)
         
-        right_leg_start2 = (self.x + self.width - 10, self.y + self.height - 8)
-        right_leg_end2 = (self.x + self.width - 12, self.y + self.height + right_leg_y)
-        pygame.draw.line(screen, BLACK, right_leg_start2, right_leg_end2, leg_thickness)
-        
-        # Shadow
-        shadow_y = GROUND_Y - SHADOW_OFFSET
-        shadow_width = self.width * 0.7
-        shadow_height = 10
-        shadow_x = self.x + (self.width - shadow_width)/2
-        pygame.draw.ellipse(screen, SHADOW_COLOR, 
-                          (shadow_x, shadow_y, shadow_width, shadow_height))
+        right_leg_start2 = (x + self.width - 10, y + self.height - 8)
+        right_leg_end2 = (x + self.width - 12, y + self.height + right_leg_y)
+        pygame.draw.line(surface, BLACK, right_leg_start2, right_leg_end2, leg_thickness)
+        return surface
 
     def reset(self):
         """Reset sheep to initial position"""
         self.y = GROUND_Y - self.height
         self.velocity_y = 0
         self.jumps_left = 2
+        self.jump_buffer = 0
         self.is_jumping = False
         self.rect.y = int(self.y)  # Update collision box
         self.leg_frame = 0
@@ -1,27 +1,57 @@
 import pygame
 import random
-import math
+import numpy as np
 import sys
 from .entities.sheep import Sheep
-from .entities.obstacle import Obstacle
-from .entities.cloud import Cloud
-from .entities.eagle import Eagle
+from .entities import obstacle, eagle, cloud, decoration
+from .utils import ecs
 from .utils.particle import ParticleSystem
-from .utils.sound_manager import SoundManager
+from .utils.shared import default_assets
+from .utils.course import CourseGenerator, EAGLE_MIN_SCORE
+from .utils.snapshot import pack_state, restore_state
+from .utils.animation import PULSE, POPUP_RISE, RADIANS_TO_INDEX, frame_clock
+from .utils.instrumentation import Instrumentation
+from .utils.latency import LatencyTracker
+from .utils.quality import QualityGovernor
+from .utils.render_queue import RenderQueue, SKY, HUD, MENU
+from .utils.time_of_day import TimeOfDay
+from .utils.event_bus import (
+    EventBus, NullEventBus, Jump, Land, Run, Scored, Passed, Died, Click
+)
 from .utils.constants import (
-    WHITE, BLACK, SKY_BLUE, GROUND_BROWN, GROUND_BROWN_DARK, GROUND_Y,
-    INITIAL_GAME_SPEED, MAX_GAME_SPEED, SPEED_INCREMENT, MIN_OBSTACLE_DISTANCE,
+    WHITE, BLACK, SKY_BLUE, GROUND_BROWN, GROUND_Y,
+    INITIAL_GAME_SPEED, MAX_GAME_SPEED, SPEED_INCREMENT,
     GROUND_THICKNESS, CLOUD_FREQUENCY, SCREEN_WIDTH, SCREEN_HEIGHT,
-    GRADIENT_TOP, GRADIENT_MIDDLE, GRADIENT_BOTTOM, SHADOW_COLOR, SHADOW_OFFSET,
-    GRASS_GREEN, GRASS_GREEN_DARK, GRASS_GREEN_LIGHT
+    GRADIENT_TOP, GRADIENT_MIDDLE, GRADIENT_BOTTOM, SHADOW_COLOR,
+    GRASS_GREEN
 )
 
+# Start menu title pulse, in curve table indices per clock tick
+MENU_PULSE_RATE = 0.005 * RADIANS_TO_INDEX
+
+# How the render system draws each kind of entity in the world
+RENDERERS = {
+    ecs.CLOUD: cloud.draw,
+    ecs.TUFT: decoration.draw_tufts,
+    ecs.PATTERN: decoration.draw_patterns,
+    ecs.OBSTACLE: obstacle.draw,
+    ecs.EAGLE: eagle.draw,
+}
+
+
 class GameManager:
-    def __init__(self, screen):
+    def __init__(self, screen, headless=False, display=None, seed=None, audio=True, assets=None):
         self.screen = screen
+        self.headless = headless
+        self.display = display  # Backend from utils.display, None when drawing to a plain surface
+        # Fonts, sounds, background and sprites, shared with other games in this process
+        self.assets = assets if assets is not None else default_assets
+        # The primary game advances the shared frame clock and feeds the music,
+        # the other games of a split screen run on its clock
+        self.primary = True
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
+        self.font = self.assets.font(36)
+        self.small_font = self.assets.font(24)
         self.game_started = False
         self.is_game_over = False
         self.is_paused = False
@@ -31,25 +61,62 @@ class GameManager:
         self.start_time = 0  # To track survival time
         self.game_speed = INITIAL_GAME_SPEED
         self.sheep = Sheep(80, GROUND_Y - 40)
-        self.obstacles = []
-        self.eagles = []  # New list for eagles
-        self.clouds = []
-        self.ground_pattern = []
-        self.grass_tufts = []
+        self.jump_table = self.assets.jump_table(self.sheep.x)
+        self.seed = seed  # Course seed, a new random course every game when None
+        self.course = CourseGenerator(self.jump_table, seed=seed, width=self.screen.get_width())
+        self.distance = 0  # How far the ground has scrolled this game
+        self.world = ecs.World()  # Obstacles, eagles, clouds and ground decorations
         self.last_obstacle_x = self.screen.get_width()
         self.last_cloud_x = self.screen.get_width()
         self.time_since_last_point = 0
-        
-        # Initialize sound manager
-        self.sound_manager = SoundManager()
+        self.recording = None  # utils.replay.Recording capturing this session's inputs
+        self.tick_log = None  # utils.tick_log.TickLogWriter getting a record every frame
+        self.telemetry = None  # utils.telemetry.SessionTelemetry collecting per-game metrics
+        self.spectators = None  # utils.spectator.SpectatorServer streaming every frame
+        self.autopilot = None  # utils.autopilot.Autopilot pressing SPACE, driven by the main loop
+        self.leaderboard = None  # utils.leaderboard.Leaderboard every final score goes into
+        self.rank = None  # (rank, total) of the last final score on the leaderboard
+        
+        # Simulation events are drained once per frame by the presentation
+        # subscribers, headless runs drop them without any audio or effects
+        if headless:
+            self.events = NullEventBus()
+            self.sound_manager = None
+        else:
+            self.events = EventBus()
+            self.sound_manager = None
+            if audio:  # Offline renders keep the effects but stay silent
+                self.sound_manager = self.assets.sound_manager()
+                self.events.subscribe_all(self.play_event_sounds)
+            self.events.subscribe_all(self.spawn_event_particles)
+            self.events.subscribe_all(self.show_event_popups)
         
         # Initialize ground pattern
         self.initialize_ground_pattern()
         
+        # The sky gradient and ground strip never change, render them once
+        self.background = None
+        if not headless:
+            self.background = self.assets.surface(('background', self.screen.get_size()),
+                                                  self.render_background)
+            if self.display is not None:
+                self.display.set_layer('background', self.background)
+        
         # Add initial clouds
         for _ in range(3):
             x = random.randint(0, self.screen.get_width())
-            self.clouds.append(Cloud(x))
+            cloud.spawn(self.world, x)
+        
+        # Frame timing overlay (F3) and the quality tier it drives
+        self.instrumentation = Instrumentation()
+        self.quality = QualityGovernor()
+        self.instrumentation.set('quality', self.quality.tier.name)
+        self.latency = LatencyTracker()  # Stamped by the main loop around polling and present()
+        self.render_queue = RenderQueue()  # Everything drawn in a frame, blitted in one batch
+        self.time_of_day = TimeOfDay()  # Dusk and night as the score climbs
+        if self.background is not None:
+            self.time_of_day.reserve(self.background)  # Too large to allocate within a frame's share
+        self.buffered_jumps = 0  # Jumps pressed before landing that still happened
         
         # Visual effects
         self.particle_system = ParticleSystem()
@@ -69,125 +136,100 @@ class GameManager:
         ]
         
         # Draw initial screen
-        self.draw()
-        pygame.display.flip()
+        if not headless:
+            self.draw()
 
     def start_game(self):
         """Start a new game"""
         self.game_started = True
-        self.start_time = pygame.time.get_ticks()
-        # Play click sound
-        self.sound_manager.play('click')
+        self.start_time = frame_clock.ticks
+        self.events.emit(Click())
         # Add first obstacle at a comfortable distance
-        self.add_new_obstacle()
+        self.start_course()
 
-    def add_new_obstacle(self):
-        """Add a new obstacle at the right edge of the screen"""
-        if len(self.obstacles) == 0:
-            x = self.screen.get_width()
-        else:
-            last_obstacle = self.obstacles[-1]
-            x = last_obstacle.x + last_obstacle.width + MIN_OBSTACLE_DISTANCE
-        
-        new_obstacle = Obstacle(x)
-        self.obstacles.append(new_obstacle)
+    def start_course(self):
+        """Start a fresh course from the seed and spawn the first obstacle"""
+        self.course = CourseGenerator(self.jump_table, seed=self.seed, width=self.screen.get_width())
+        self.distance = 0
+        self.spawn_from_course()
 
-    def add_new_eagle(self):
-        """Add a new eagle obstacle"""
-        # Generate a random height for the eagle
-        # Eagles fly at different heights to be more challenging
-        new_eagle = Eagle(self.screen.get_width())
-        
-        # Make the eagle's y position random between top of ground and half the screen height
-        # This makes eagles more challenging as they can fly at different heights
-        new_eagle.y = random.randint(GROUND_Y - 150, GROUND_Y - 70)
-        new_eagle.rect.y = new_eagle.y
-        
-        self.eagles.append(new_eagle)
+    def spawn_from_course(self):
+        """Spawn every course placement that has scrolled into view"""
+        if self.score >= EAGLE_MIN_SCORE and not self.course.eagles_allowed:
+            # The course only generates eagles from here, at most two on screen
+            self.course.allow_eagles()
+        for placement in self.course.due(self.distance):
+            if placement.kind == 'obstacle':
+                self.add_new_obstacle(placement)
+            else:
+                self.add_new_eagle(placement)
+
+    def add_new_obstacle(self, placement):
+        """Add an obstacle from the course as it scrolls in at the right edge"""
+        obstacle.spawn(self.world, placement.distance - self.distance,
+                       placement.height, placement.is_double)
+
+    def add_new_eagle(self, placement):
+        """Add an eagle from the course at the right edge of the screen"""
+        # Eagles fly at different heights to be more challenging, the course
+        # already checked this one doesn't block the only way over an obstacle
+        eagle.spawn(self.world, placement.distance - self.distance, placement.y)
 
     def initialize_ground_pattern(self):
         """Initialize the pattern for ground decoration"""
-        self.ground_pattern = []
+        self.world.clear(ecs.PATTERN, ecs.TUFT)
         for x in range(0, self.screen.get_width() + 200, 20):
             if random.random() < 0.4:  # 40% chance for a pattern piece
                 height = random.randint(3, 8)
                 width = random.randint(5, 15)
-                self.ground_pattern.append({
-                    'x': x,
-                    'height': height,
-                    'width': width
-                })
+                decoration.spawn_pattern(self.world, x, width, height)
         
         # Add some grass tufts
-        self.grass_tufts = []
         for x in range(0, self.screen.get_width() + 200, 15):
             if random.random() < 0.6:  # 60% chance for grass
-                height = random.randint(5, 15)
-                width = random.randint(2, 6)
-                self.grass_tufts.append({
-                    'x': x,
-                    'height': height,
-                    'width': width,
-                    'color': random.choice([GRASS_GREEN, GRASS_GREEN_LIGHT, GRASS_GREEN_DARK])
-                })
-
-    def update_ground_pattern(self):
-        """Update ground pattern positions and add new patterns as needed"""
-        # Move patterns left
-        for pattern in self.ground_pattern[:]:
-            pattern['x'] -= self.game_speed
-        
-        # Remove patterns that are off screen
-        self.ground_pattern = [p for p in self.ground_pattern if p['x'] + p['width'] > 0]
-        
-        # Add new patterns if needed
-        while len(self.ground_pattern) < (self.screen.get_width() // 20) + 2:
-            pattern = {
-                'x': self.ground_pattern[-1]['x'] + 20,
-                'width': 20,
-                'height': random.randint(2, 5)
-            }
-            self.ground_pattern.append(pattern)
+                decoration.spawn_tuft(self.world, x)
+
+    def spawn_decorations(self):
+        """Keep the ground covered as the decorations scroll off"""
+        world = self.world
+        
+        # Generate new grass tufts if needed
+        if world.count(ecs.TUFT) < 20:
+            tufts = world.rows(ecs.TUFT)
+            new_x = np.max(world.x[tufts] + world.width[tufts], initial=0)
+            for x in range(int(new_x), int(new_x) + 200, 15):
+                if random.random() < 0.6:  # 60% chance for grass
+                    decoration.spawn_tuft(world, x)
+        
+        # Generate new ground pattern if needed
+        if world.count(ecs.PATTERN) < 5:
+            patterns = world.rows(ecs.PATTERN)
+            new_x = np.max(world.x[patterns] + world.width[patterns], initial=0)
+            decoration.spawn_pattern(world, float(new_x), 20, random.randint(2, 5))
 
     def handle_event(self, event):
         """Handle pygame events"""
         if event.type == pygame.KEYDOWN:
+            if self.recording is not None:
+                self.recording.add_key(frame_clock.frame, event.key)
+            if self.tick_log is not None:
+                self.tick_log.add_key(event.key)
             if event.key == pygame.K_SPACE:
                 if not self.game_started:
                     self.start_game()
                 elif self.is_game_over:
                     self.reset_game()
-                else:
-                    if self.sheep.jump():
-                        # Add points for jumping (5 points)
-                        self.update_score(5)
-                        
-                        # Add different jump particles depending on if it's a double jump
-                        jump_x = self.sheep.x + self.sheep.width//2
-                        jump_y = self.sheep.y + self.sheep.height
-                        
-                        if self.sheep.jumps_left == 0:  # This was the second jump
-                            # Play double jump sound
-                            self.sound_manager.play('double_jump')
-                            # Special particles for double jump
-                            self.particle_system.add_jump_particles(
-                                jump_x, jump_y, color=(255, 215, 0), count=15
-                            )
-                            # Show double jump score popup
-                            self.show_score_popup("+5 DOUBLE!", jump_x, self.sheep.y - 30)
-                        else:
-                            # Play regular jump sound
-                            self.sound_manager.play('jump')
-                            # Regular jump particles
-                            self.particle_system.add_jump_particles(
-                                jump_x, jump_y
-                            )
-                            # Show score popup
-                            self.show_score_popup("+5", jump_x, self.sheep.y - 20)
+                elif not self.jump():
+                    # Buffered until the sheep lands, measured from this press then
+                    self.latency.buffer()
+                    return
+            elif event.key == pygame.K_F3:
+                self.instrumentation.toggle()
+            elif event.key == pygame.K_m and self.sound_manager is not None:
+                self.sound_manager.toggle_music()
             elif event.key == pygame.K_p and self.game_started and not self.is_game_over:
                 self.is_paused = not self.is_paused
-                # Play click sound
-                self.sound_manager.play('click')
+                self.events.emit(Click())
             elif event.key == pygame.K_q:
                 if not self.game_started:
                     # Quit the game when Q is pressed from the start menu
@@ -195,8 +237,7 @@ class GameManager:
                 elif self.is_game_over or self.is_paused:
                     self.reset_game()
                     self.game_started = False
-                    # Play click sound
-                    self.sound_manager.play('click')
+                    self.events.emit(Click())
                 else:
                     # Return to start menu
                     self.game_started = False
@@ -207,16 +248,34 @@ class GameManager:
                     self.time_score = 0
                     self.game_speed = INITIAL_GAME_SPEED
                     self.sheep.reset()
-                    self.obstacles = []
-                    self.eagles = []
-                    self.clouds = []
-                    self.ground_pattern = []
-                    self.grass_tufts = []
+                    self.world.clear()
                     self.initialize_ground_pattern()
-                    # Play click sound
-                    self.sound_manager.play('click')
+                    self.events.emit(Click())
+            else:
+                return
+            self.latency.input()
+        
+    def jump(self):
+        """Jump if the sheep has a jump left, returns False if the press was buffered"""
+        if not self.sheep.jump():
+            return False
+        # Add points for jumping (5 points)
+        self.update_score(5)
+        self.events.emit(Jump(
+            self.sheep.x + self.sheep.width//2,
+            self.sheep.y + self.sheep.height,
+            self.sheep.y,
+            self.sheep.jumps_left == 0  # This was the second jump
+        ))
+        return True
         
     def update(self):
+        if self.primary:
+            frame_clock.advance()
+        # Popups count down here rather than in draw(), so skipping draws
+        # (replays, headless runs) leaves the state the same
+        if self.score_popup_timer > 0:
+            self.score_popup_timer -= 1
         if not self.is_paused and self.game_started and not self.is_game_over:
             # Update game speed (maintain user's preferred pace)
             self.game_speed = min(self.game_speed + SPEED_INCREMENT, MAX_GAME_SPEED)
@@ -227,170 +286,137 @@ class GameManager:
             
             # Check if sheep just landed
             if prev_is_jumping and not self.sheep.is_jumping:
-                # Play landing sound
-                self.sound_manager.play('land')
+                self.events.emit(Land(self.sheep.x + self.sheep.width//2, GROUND_Y))
+            
+            # A jump pressed just before landing happens on the landing frame
+            if self.sheep.jump_buffer:
+                self.sheep.jump_buffer -= 1
+                if not self.sheep.is_jumping:
+                    self.buffered_jumps += 1
+                    self.instrumentation.set('buffered_jumps', self.buffered_jumps)
+                    self.jump()
+                    self.latency.fire_buffered()
+                elif not self.sheep.jump_buffer:
+                    self.latency.drop_buffered()
                 
             if not self.sheep.is_jumping:
-                self.particle_system.add_run_particles(
-                    self.sheep.x + self.sheep.width//2,
-                    GROUND_Y - 5
-                )
+                self.events.emit(Run(self.sheep.x + self.sheep.width//2, GROUND_Y - 5))
             self.particle_system.update()
             
-            # Update ground pattern
-            for rect in self.ground_pattern[:]:
-                rect['x'] -= self.game_speed
-                if rect['x'] + rect['width'] < 0:
-                    self.ground_pattern.remove(rect)
-            
-            # Update grass tufts
-            for tuft in self.grass_tufts[:]:
-                tuft['x'] -= self.game_speed
-                if tuft['x'] + tuft['width'] < 0:
-                    self.grass_tufts.remove(tuft)
-            
-            # Generate new grass tufts if needed
-            if len(self.grass_tufts) < 20:
-                new_x = max([t['x'] + t['width'] for t in self.grass_tufts] + [0])
-                for x in range(int(new_x), int(new_x) + 200, 15):
-                    if random.random() < 0.6:  # 60% chance for grass
-                        height = random.randint(5, 15)
-                        width = random.randint(2, 6)
-                        self.grass_tufts.append({
-                            'x': x,
-                            'height': height,
-                            'width': width,
-                            'color': random.choice([GRASS_GREEN, GRASS_GREEN_LIGHT, GRASS_GREEN_DARK])
-                        })
-            
-            # Generate new ground pattern if needed
-            if len(self.ground_pattern) < 5:
-                new_x = max([r['x'] + r['width'] for r in self.ground_pattern] + [0])
-                self.ground_pattern.append({
-                    'x': new_x,
-                    'width': 20,
-                    'height': random.randint(2, 5)
-                })
+            # Everything else in the world scrolls, animates and leaves the
+            # screen in one pass of each system
+            ecs.move(self.world, self.game_speed)
+            ecs.animate(self.world, frame_clock.ticks)
+            ecs.sync_hitboxes(self.world)
+            for kind, points in ecs.cull(self.world):
+                # Award points for successfully avoiding an obstacle or eagle
+                self.update_score(points)
+                self.events.emit(Passed(ecs.KIND_NAMES[kind], points))
             
-            # Update clouds
-            self.update_clouds()
+            self.spawn_decorations()
+            # Generate new clouds, up to what the quality tier allows
+            if random.random() < CLOUD_FREQUENCY and self.world.count(ecs.CLOUD) < self.quality.tier.max_clouds:
+                cloud.spawn(self.world, self.screen.get_width())
             
-            # Update obstacles and check collisions
-            if self.update_obstacles():
+            cause = self.check_collision()
+            if cause is not None:
+                self.game_over(cause)
+                self.events.dispatch()
                 return  # Collision occurred
             
-            # Update eagles if score > 100
-            self.update_eagles()
-            
-            # Check eagle collisions
-            for eagle in self.eagles:
-                if self.check_eagle_collision(eagle):
-                    self.game_over()
-                    return
+            # Bring in the next stretch of the course
+            self.distance += self.game_speed
+            self.spawn_from_course()
             
             # Update time score (1 point per second)
-            current_time = pygame.time.get_ticks()
-            self.time_score = (current_time - self.start_time) // 1000
+            self.time_score = (frame_clock.ticks - self.start_time) // 1000
             self.score = self.jump_score + self.time_score
         
-        # Update display
-        pygame.display.flip()
-
-    def update_eagles(self):
-        """Update positions of eagles and generate new ones"""
-        # Only spawn eagles if score is 100 or more
-        if self.score >= 100:
-            # Move existing eagles
-            for eagle in self.eagles[:]:
-                eagle.update(self.game_speed)
-                if eagle.x + eagle.width < 0:
-                    self.eagles.remove(eagle)
-                    # Award points for successfully avoiding an eagle
-                    self.update_score(10)
-                    self.show_score_popup("+10", 
-                                      self.screen.get_width()//2,
-                                      GROUND_Y - 100)
-            
-            # Spawn new eagles based on score (higher score = more eagles)
-            # Keep the spawn rate moderate to maintain the user's preference for indefinite play
-            eagle_spawn_chance = min(0.005 + (self.score - 100) / 3000, 0.02)  # Caps at 2% per frame
-            if random.random() < eagle_spawn_chance and len(self.eagles) < 2:  # Limit to 2 eagles at once
-                self.add_new_eagle()
+        # Hand this frame's events to sounds, particles and popups in one batch
+        self.events.dispatch()
+
+    def record_frame_time(self, frame_ms):
+        """Feed the measured frame time to the instrumentation and quality governor"""
+        self.instrumentation.record_frame(frame_ms)
+        if self.quality.observe(frame_ms):
+            self.apply_quality()
+            if self.recording is not None:
+                # Tiers change what gets spawned, so replays have to follow them
+                self.recording.add_quality(frame_clock.frame, self.quality.level)
+        if self.tick_log is not None:
+            self.tick_log.append(self, frame_ms)
+        if self.telemetry is not None:
+            self.telemetry.frame(frame_ms)
+        if self.autopilot is not None:
+            for name, value in self.autopilot.stats().items():
+                self.instrumentation.set(name, value)
+        if self.spectators is not None:
+            self.spectators.tick(self)
+            for name, value in self.spectators.stats().items():
+                self.instrumentation.set(name, value)
+        if self.sound_manager is not None and self.primary:
+            # The music speeds up with the game and idles at the base tempo otherwise
+            playing = self.game_started and not self.is_game_over
+            self.sound_manager.update_music(
+                self.game_speed / INITIAL_GAME_SPEED if playing else 1.0, paused=self.is_paused)
+            if self.sound_manager.music_stream is not None:
+                self.instrumentation.set('music_underruns', self.sound_manager.music_stream.underruns)
+        if self.latency.presented():
+            for name, value in self.latency.summary().items():
+                self.instrumentation.set(name, value)
+
+    def apply_quality(self):
+        """Apply the current quality tier to the effects that read it every frame"""
+        tier = self.quality.tier
+        self.particle_system.spawn_rate = tier.particle_rate
+        clouds = self.world.rows(ecs.CLOUD)
+        if len(clouds) > tier.max_clouds:
+            extra = np.zeros(self.world.size, bool)
+            extra[clouds[tier.max_clouds:]] = True
+            self.world.remove(extra)
+        self.instrumentation.set('quality', tier.name)
 
     def draw(self):
-        # Fill background with smooth gradient
-        self.draw_background_gradient()
-        
-        # Draw clouds with shadows
-        for cloud in self.clouds:
-            # Draw cloud
-            cloud.draw(self.screen)
-            
-            # Skip shadows for clouds to avoid rectangular artifacts
-            # Clouds look fine without shadows in the sky
+        """Draw the frame through the render queue, then the overlay on top"""
+        self.update_time_of_day()
+        self.draw_frame()
+        self.render_queue.flush(self.screen)
+        for name, value in self.render_queue.stats().items():
+            self.instrumentation.set(name, value)
+        for name, value in self.time_of_day.stats().items():
+            self.instrumentation.set(name, value)
+        
+        # Frame timing overlay goes on top of everything
+        self.instrumentation.draw(self.screen)
+
+    def update_time_of_day(self):
+        """Tint the scene for the score, the sprites are only recoloured ahead of a step change"""
+        time_of_day = self.time_of_day
+        changed = time_of_day.update(self.score)
+        time_of_day.prepare(self.score, () if self.background is None else (self.background,))
+        self.render_queue.tint = (time_of_day.tint if time_of_day.tinting or time_of_day.preparing
+                                  else None)
+        if changed and self.display is not None and self.background is not None:
+            # Layered displays draw the background themselves
+            self.display.set_layer('background', time_of_day.tint(self.background)
+                                   if time_of_day.tinting else self.background)
+
+    def draw_frame(self):
+        """Submit everything on screen this frame to the render queue"""
+        queue = self.render_queue
         
-        # Draw ground line with grass
-        pygame.draw.rect(self.screen, GRASS_GREEN, 
-                        (0, GROUND_Y, self.screen.get_width(), GROUND_THICKNESS))
+        # Fill background with smooth gradient
+        self.draw_background()
         
-        # Draw soil under grass
-        pygame.draw.rect(self.screen, GROUND_BROWN, 
-                        (0, GROUND_Y + 10, self.screen.get_width(), GROUND_THICKNESS - 10))
-                        
-        # Draw grass tufts
-        for tuft in self.grass_tufts:
-            # Draw shadow
-            shadow_surface = pygame.Surface((tuft['width'], tuft['height']), pygame.SRCALPHA)
-            shadow_surface.fill((0, 0, 0, 30))
-            self.screen.blit(shadow_surface, 
-                          (tuft['x'] + SHADOW_OFFSET, 
-                           GROUND_Y - tuft['height'] + SHADOW_OFFSET))
-            # Draw tuft
-            pygame.draw.rect(self.screen, tuft['color'],
-                          (tuft['x'], GROUND_Y - tuft['height'],
-                           tuft['width'], tuft['height']))
-        
-        # Draw ground pattern with shadows (dirt/soil patches)
-        for rect in self.ground_pattern:
-            # Draw shadow (using semi-transparent surface)
-            shadow_surface = pygame.Surface((rect['width'], rect['height']), pygame.SRCALPHA)
-            shadow_surface.fill((0, 0, 0, 30))  # Semi-transparent black
-            self.screen.blit(shadow_surface, 
-                           (rect['x'] + SHADOW_OFFSET, 
-                            GROUND_Y - rect['height'] + SHADOW_OFFSET))
-            # Draw pattern as brown dirt patches in the grass
-            pygame.draw.rect(self.screen, GROUND_BROWN_DARK,
-                           (rect['x'], GROUND_Y - rect['height'],
-                            rect['width'], rect['height']))
-        
-        # Draw obstacles with shadows
-        for obstacle in self.obstacles:
-            # Draw shadow (using semi-transparent surface)
-            shadow_surface = pygame.Surface((obstacle.width, obstacle.height // 3), pygame.SRCALPHA)
-            pygame.draw.ellipse(shadow_surface, (0, 0, 0, 30), 
-                             (0, 0, obstacle.width, obstacle.height // 3))
-            self.screen.blit(shadow_surface, 
-                           (obstacle.x + SHADOW_OFFSET, GROUND_Y - SHADOW_OFFSET))
-            # Draw obstacle
-            obstacle.draw(self.screen)
-        
-        # Draw eagles with shadows
-        for eagle in self.eagles:
-            # Draw shadow (using semi-transparent surface)
-            shadow_width = eagle.width * 0.8
-            shadow_surface = pygame.Surface((int(shadow_width), 8), pygame.SRCALPHA)
-            pygame.draw.ellipse(shadow_surface, (0, 0, 0, 30), 
-                             (0, 0, int(shadow_width), 8))
-            self.screen.blit(shadow_surface, 
-                           (eagle.x + SHADOW_OFFSET, GROUND_Y - SHADOW_OFFSET))
-            # Draw eagle
-            eagle.draw(self.screen)
+        # Clouds, grass, dirt patches, obstacles and eagles with their
+        # shadows, back to front
+        ecs.render(self.world, queue, RENDERERS, self.quality.tier, self.assets)
         
         # Draw particles
-        self.particle_system.draw(self.screen)
+        self.particle_system.draw(queue, self.assets)
         
         # Draw sheep
-        self.sheep.draw(self.screen)
+        self.sheep.draw(queue, self.assets)
         
         # Draw game info
         self.draw_game_info()
@@ -402,27 +428,26 @@ class GameManager:
         
         # Shadow text
         shadow_text = self.font.render(score_text, True, (50, 50, 50))  # Dark gray shadow
-        self.screen.blit(shadow_text, (score_x + 2, score_y + 2))
+        queue.submit(shadow_text, (score_x + 2, score_y + 2), HUD)
         
         # Main text
         text = self.font.render(score_text, True, BLACK)
-        self.screen.blit(text, (score_x, score_y))
+        queue.submit(text, (score_x, score_y), HUD)
         
         # Draw score popup if active
         if self.score_popup_timer > 0:
-            self.score_popup_timer -= 1
             popup_color = self.rainbow_colors[self.rainbow_color_index]
             popup_text = self.font.render(self.score_popup_text, True, popup_color)
             # Move popup up as it fades
-            popup_y_offset = int(30 * (1 - self.score_popup_timer / 60))
-            self.screen.blit(popup_text, 
-                            (self.score_popup_pos[0] - popup_text.get_width() // 2, 
-                             self.score_popup_pos[1] - popup_y_offset))
+            popup_y_offset = int(30 * POPUP_RISE.at(61 - self.score_popup_timer))
+            queue.submit(popup_text, 
+                         (self.score_popup_pos[0] - popup_text.get_width() // 2, 
+                          self.score_popup_pos[1] - popup_y_offset), HUD)
         
         # Display warning about eagles when score is getting close to 100
         if 80 <= self.score < 100:
             warning_text = self.small_font.render("Eagles approaching at score 100!", True, (200, 0, 0))
-            self.screen.blit(warning_text, (score_x, score_y + 30))
+            queue.submit(warning_text, (score_x, score_y + 30), HUD)
         
         # Draw game states
         if not self.game_started:
@@ -432,9 +457,33 @@ class GameManager:
         elif self.is_paused:
             self.draw_pause_menu()
 
-    def draw_background_gradient(self):
-        for i in range(self.screen.get_height()):
-            progress = i / self.screen.get_height()
+    def draw_background(self):
+        """Draw the cached sky and ground, unless the display composes it"""
+        playing = self.game_started and not (self.is_game_over or self.is_paused)
+        if playing and self.display is not None and self.display.layered:
+            # The renderer draws the background texture under this frame. Menus
+            # stack translucent overlays, so they still get the background here.
+            self.screen.fill((0, 0, 0, 0))
+        else:
+            self.render_queue.submit(self.background, (0, 0), SKY)
+
+    def render_background(self):
+        """Render the static sky gradient and ground strip into a surface"""
+        background = pygame.Surface(self.screen.get_size())
+        self.draw_background_gradient(background)
+        
+        # Draw ground line with grass
+        pygame.draw.rect(background, GRASS_GREEN, 
+                        (0, GROUND_Y, background.get_width(), GROUND_THICKNESS))
+        
+        # Draw soil under grass
+        pygame.draw.rect(background, GROUND_BROWN, 
+                        (0, GROUND_Y + 10, background.get_width(), GROUND_THICKNESS - 10))
+        return background
+
+    def draw_background_gradient(self, surface):
+        for i in range(surface.get_height()):
+            progress = i / surface.get_height()
             if progress < 0.6:  # Sky gradient (top to middle)
                 r = int(GRADIENT_TOP[0] + (GRADIENT_MIDDLE[0] - GRADIENT_TOP[0]) * (progress / 0.6))
                 g = int(GRADIENT_TOP[1] + (GRADIENT_MIDDLE[1] - GRADIENT_TOP[1]) * (progress / 0.6))
@@ -446,14 +495,13 @@ class GameManager:
                 g = int(GRADIENT_MIDDLE[1] + (GRADIENT_BOTTOM[1] - GRADIENT_MIDDLE[1]) * ground_progress)
                 b = int(GRADIENT_MIDDLE[2] + (GRADIENT_BOTTOM[2] - GRADIENT_MIDDLE[2]) * ground_progress)
                 color = (r, g, b)
-            pygame.draw.line(self.screen, color, (0, i), (self.screen.get_width(), i))
+            pygame.draw.line(surface, color, (0, i), (surface.get_width(), i))
 
     def draw_start_menu(self):
         """Draw the start menu with pulsing title"""
         # Draw start menu with pulsing effect
-        pulse = (math.sin(pygame.time.get_ticks() * 0.005) + 1) * 0.5
-        title_size = 48 + int(pulse * 8)
-        title_font = pygame.font.Font(None, title_size)
+        pulse = PULSE.at(frame_clock.ticks * MENU_PULSE_RATE)
+        title_font = self.assets.font(48 + int(pulse * 8))
         
         title_text = title_font.render("Sheep Jump!", True, BLACK)
         start_text = self.font.render("SPACE: Start Game", True, BLACK)
@@ -465,17 +513,15 @@ class GameManager:
         jump_rect = jump_text.get_rect(center=(self.screen.get_width()//2, self.screen.get_height()//2 + 40))
         quit_rect = quit_text.get_rect(center=(self.screen.get_width()//2, self.screen.get_height()//2 + 80))
         
-        self.screen.blit(title_text, title_rect)
-        self.screen.blit(start_text, start_rect)
-        self.screen.blit(jump_text, jump_rect)
-        self.screen.blit(quit_text, quit_rect)
+        self.render_queue.submit(title_text, title_rect, MENU)
+        self.render_queue.submit(start_text, start_rect, MENU)
+        self.render_queue.submit(jump_text, jump_rect, MENU)
+        self.render_queue.submit(quit_text, quit_rect, MENU)
 
     def draw_game_over(self):
         """Draw game over screen with fade effect"""
-        overlay = pygame.Surface((self.screen.get_width(), self.screen.get_height()))
-        overlay.fill((255, 255, 255))
-        overlay.set_alpha(128)
-        self.screen.blit(overlay, (0, 0))
+        overlay = self.assets.fill(self.screen.get_size(), (255, 255, 255, 128))
+        self.render_queue.submit(overlay, (0, 0), MENU)
         
         game_over_text = self.font.render("GAME OVER", True, BLACK)
         restart_text = self.font.render("Press SPACE to restart", True, BLACK)
@@ -487,17 +533,21 @@ class GameManager:
         final_score_rect = final_score_text.get_rect(center=(self.screen.get_width()//2, self.screen.get_height()//2 + 50))
         menu_rect = menu_text.get_rect(center=(self.screen.get_width()//2, self.screen.get_height()//2 + 100))
         
-        self.screen.blit(game_over_text, game_over_rect)
-        self.screen.blit(restart_text, restart_rect)
-        self.screen.blit(final_score_text, final_score_rect)
-        self.screen.blit(menu_text, menu_rect)
+        self.render_queue.submit(game_over_text, game_over_rect, MENU)
+        self.render_queue.submit(restart_text, restart_rect, MENU)
+        self.render_queue.submit(final_score_text, final_score_rect, MENU)
+        self.render_queue.submit(menu_text, menu_rect, MENU)
+        
+        if self.rank is not None:
+            rank, total = self.rank
+            rank_text = self.small_font.render(f"Rank #{rank:,} of {total:,}", True, BLACK)
+            rank_rect = rank_text.get_rect(center=(self.screen.get_width()//2, self.screen.get_height()//2 + 75))
+            self.render_queue.submit(rank_text, rank_rect, MENU)
 
     def draw_pause_menu(self):
         """Draw pause screen with overlay"""
-        overlay = pygame.Surface((self.screen.get_width(), self.screen.get_height()))
-        overlay.fill((255, 255, 255))
-        overlay.set_alpha(160)
-        self.screen.blit(overlay, (0, 0))
+        overlay = self.assets.fill(self.screen.get_size(), (255, 255, 255, 160))
+        self.render_queue.submit(overlay, (0, 0), MENU)
         
         pause_text = self.font.render("PAUSED", True, BLACK)
         resume_text = self.font.render("P: Resume Game", True, BLACK)
@@ -507,16 +557,15 @@ class GameManager:
         resume_rect = resume_text.get_rect(center=(self.screen.get_width()//2, self.screen.get_height()//2))
         quit_rect = quit_text.get_rect(center=(self.screen.get_width()//2, self.screen.get_height()//2 + 50))
         
-        self.screen.blit(pause_text, pause_rect)
-        self.screen.blit(resume_text, resume_rect)
-        self.screen.blit(quit_text, quit_rect)
+        self.render_queue.submit(pause_text, pause_rect, MENU)
+        self.render_queue.submit(resume_text, resume_rect, MENU)
+        self.render_queue.submit(quit_text, quit_rect, MENU)
 
     def draw_game_info(self):
         # Game info background - make it smaller since we only have score now
         info_rect = pygame.Rect(10, 10, 200, 50)
-        s = pygame.Surface((info_rect.width, info_rect.height), pygame.SRCALPHA)
-        s.fill((0, 0, 0, 128))  # Semi-transparent black
-        self.screen.blit(s, (info_rect.x, info_rect.y))
+        s = self.assets.fill(info_rect.size, (0, 0, 0, 128))  # Semi-transparent black
+        self.render_queue.submit(s, (info_rect.x, info_rect.y), HUD)
         
         # Draw score with shadow
         score_text = f"Score: {self.score}"
@@ -524,19 +573,22 @@ class GameManager:
         score_surface = self.font.render(score_text, True, WHITE)
         
         # Shadow first
-        self.screen.blit(score_shadow, (info_rect.x + 12, info_rect.y + 12))
+        self.render_queue.submit(score_shadow, (info_rect.x + 12, info_rect.y + 12), HUD)
         # Then text
-        self.screen.blit(score_surface, (info_rect.x + 10, info_rect.y + 10))
+        self.render_queue.submit(score_surface, (info_rect.x + 10, info_rect.y + 10), HUD)
 
-    def game_over(self):
+    def game_over(self, cause='obstacle'):
         """Handle game over state"""
         self.is_game_over = True
         # Stop all movement
         self.game_speed = 0
         # Final score calculation
-        current_time = pygame.time.get_ticks()
-        self.time_score = (current_time - self.start_time) // 1000
+        self.time_score = (frame_clock.ticks - self.start_time) // 1000
         self.score = self.jump_score + self.time_score
+        if self.leaderboard is not None:
+            self.rank = (self.leaderboard.add(self.score), len(self.leaderboard))
+            self.leaderboard.save_later()  # Written by its own thread
+        self.events.emit(Died(cause, self.score))
 
     def reset_game(self):
         """Reset the game state for a new game"""
@@ -544,39 +596,30 @@ class GameManager:
         self.score = 0
         self.jump_score = 0
         self.time_score = 0
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = frame_clock.ticks
         self.is_game_over = False
         self.is_paused = False
         self.game_started = True  # Start the game immediately on reset
         
         # Reset game objects
         self.sheep.reset()
-        self.obstacles = []
-        self.eagles = []
-        self.clouds = []
+        self.world.clear()
         
         # Reset ground pattern
-        self.ground_pattern = []
-        self.grass_tufts = []
         self.initialize_ground_pattern()
 
-    def check_collision(self, obstacle):
-        """Check if sheep collides with an obstacle"""
-        if self.sheep.rect.colliderect(obstacle.rect):
-            # Play game over sound
-            self.sound_manager.play('game_over')
-            self.game_over()
-            return True
-        return False
-
-    def check_eagle_collision(self, eagle):
-        """Check if sheep collides with an eagle"""
-        # The collision is less forgiving with eagles (smaller hitbox benefit)
-        if self.sheep.rect.colliderect(eagle.rect):
-            # Play game over sound
-            self.sound_manager.play('game_over')
-            return True
-        return False
+    def snapshot(self):
+        """Pack the complete simulation state into a compact bytes buffer"""
+        return pack_state(self)
+
+    def restore(self, data):
+        """Restore the simulation state from a buffer made by snapshot()"""
+        restore_state(self, data)
+
+    def check_collision(self):
+        """Kind name of what the sheep runs into, None if nothing"""
+        row = ecs.collide(self.world, self.sheep.rect)
+        return ecs.KIND_NAMES[self.world.kind[row]] if row >= 0 else None
 
     def update_score(self, points):
         """Update score and check for milestones"""
@@ -585,18 +628,58 @@ class GameManager:
         self.score = self.jump_score + self.time_score
         
         # Check if we've passed a milestone
-        if old_score // 100 < self.score // 100:
-            # Play milestone sound for each 100 points
-            self.sound_manager.play('milestone')
-            
-            # Show milestone celebration text
-            milestone_text = f"SCORE: {self.score}"
-            self.show_score_popup(milestone_text, 
-                               self.screen.get_width() // 2, 
-                               self.screen.get_height() // 3)
-        else:
-            # Play regular score sound
-            self.sound_manager.play('score')
+        milestone = old_score // 100 < self.score // 100
+        self.events.emit(Scored(points, self.score, milestone))
+    
+    def play_event_sounds(self, events):
+        """Audio subscriber, plays the sound for each simulation event"""
+        for event in events:
+            event_type = type(event)
+            if event_type is Jump:
+                self.sound_manager.play('double_jump' if event.is_double else 'jump')
+            elif event_type is Land:
+                self.sound_manager.play('land')
+            elif event_type is Scored:
+                # Milestone sound for each 100 points
+                self.sound_manager.play('milestone' if event.milestone else 'score')
+            elif event_type is Died:
+                self.sound_manager.play('game_over')
+            elif event_type is Click:
+                self.sound_manager.play('click')
+    
+    def spawn_event_particles(self, events):
+        """Particle subscriber, adds dust and jump effects"""
+        for event in events:
+            event_type = type(event)
+            if event_type is Run:
+                self.particle_system.add_run_particles(event.x, event.y)
+            elif event_type is Jump:
+                if event.is_double:
+                    # Special particles for double jump
+                    self.particle_system.add_jump_particles(
+                        event.x, event.y, color=(255, 215, 0), count=15
+                    )
+                else:
+                    self.particle_system.add_jump_particles(event.x, event.y)
+    
+    def show_event_popups(self, events):
+        """Popup subscriber, shows score popups for jumps, passes and milestones"""
+        for event in events:
+            event_type = type(event)
+            if event_type is Jump:
+                if event.is_double:
+                    self.show_score_popup("+5 DOUBLE!", event.x, event.top - 30)
+                else:
+                    self.show_score_popup("+5", event.x, event.top - 20)
+            elif event_type is Passed:
+                self.show_score_popup(f"+{event.points}",
+                                   self.screen.get_width()//2,
+                                   GROUND_Y - 100)
+            elif event_type is Scored and event.milestone:
+                # Show milestone celebration text
+                self.show_score_popup(f"SCORE: {event.score}",
+                                   self.screen.get_width() // 2,
+                                   self.screen.get_height() // 3)
     
     def show_score_popup(self, text, x, y):
         """Show a colorful score popup at the given position"""
@@ -605,41 +688,6 @@ class GameManager:
         self.score_popup_timer = 60  # Show for 60 frames (1 second at 60fps)
         self.rainbow_color_index = (self.rainbow_color_index + 1) % len(self.rainbow_colors)
 
-    def update_clouds(self):
-        """Update cloud positions and generate new ones"""
-        # Update existing clouds
-        for cloud in self.clouds[:]:
-            cloud.update(self.game_speed)
-            # Use radius * 3 as an approximation of the cloud's total width
-            if cloud.x + cloud.radius * 3 < 0:
-                self.clouds.remove(cloud)
-        
-        # Generate new clouds
-        if random.random() < CLOUD_FREQUENCY:
-            self.clouds.append(Cloud(self.screen.get_width()))
-
-    def update_obstacles(self):
-        """Update obstacles and check collisions"""
-        for obstacle in self.obstacles[:]:
-            obstacle.update(self.game_speed)
-            if obstacle.x + obstacle.width < 0:
-                self.obstacles.remove(obstacle)
-                # Award points for successfully avoiding an obstacle
-                self.update_score(10)
-                self.show_score_popup("+10", 
-                                   self.screen.get_width()//2,
-                                   GROUND_Y - 100)
-            elif self.check_collision(obstacle):
-                return True
-        
-        # Generate new obstacles
-        if (len(self.obstacles) == 0 or 
-                self.obstacles[-1].x < self.screen.get_width() - MIN_OBSTACLE_DISTANCE):
-            # Add new obstacle
-            self.add_new_obstacle()
-            
-        return False
-        
     def reset_game(self):
         """Reset the game to start a new round"""
         self.game_speed = INITIAL_GAME_SPEED
@@ -647,18 +695,16 @@ class GameManager:
         self.score = 0
         self.jump_score = 0
         self.time_score = 0
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = frame_clock.ticks
         self.sheep.reset()
-        self.obstacles = []
-        self.eagles = []
+        self.world.clear(ecs.OBSTACLE, ecs.EAGLE)
         
-        # Play click sound
-        self.sound_manager.play('click')
+        self.events.emit(Click())
         
         # Add first obstacle
-        self.add_new_obstacle()
+        self.start_course()
 
     def show_rainbow_text(self, text, x, y):
         """Show rainbow text at the given position"""
         rainbow_text = self.font.render(text, True, (255, 0, 0))  # Red
-        self.screen.blit(rainbow_text, (x - rainbow_text.get_width() // 2, y))
+        self.render_queue.submit(rainbow_text, (x - rainbow_text.get_width() // 2, y), HUD)
@@ -1,46 +1,245 @@
 import os
+import time
+STARTED = time.perf_counter()  # Fallback origin for time to first frame
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'  # Hide Pygame welcome message
 
+import argparse
 import pygame
 from game.game_manager import GameManager
 from game.utils.constants import SCREEN_WIDTH, SCREEN_HEIGHT, WHITE
+from game.utils.display import create_display
+from game.utils.leaderboard import Leaderboard, DEFAULT_PATH as LEADERBOARD_PATH
+from game.utils.animation import frame_clock
+from game.utils.startup import time_to_first_frame
+from game.utils.render_queue import LAYER_NAMES, parse_layers
+# Recording, tick log, telemetry, spectator, autopilot, profiler and asyncio loop modules
+# are imported only when asked for
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sheep Jump!")
+    parser.add_argument('--renderer', choices=['surface', 'sdl2', 'sdl2-software'],
+                        default='surface',
+                        help="drawing backend, sdl2 composes cached layers with the SDL "
+                             "renderer and falls back to surface if it is unavailable")
+    parser.add_argument('--render-scale', type=float, default=1.0,
+                        help="render resolution as a fraction of the window, e.g. 0.5 "
+                             "opens a window twice the game size and upscales once per frame")
+    parser.add_argument('--fullscreen', action='store_true',
+                        help="fill the desktop, the game still renders at its own resolution")
+    parser.add_argument('--smooth-scale', action='store_true',
+                        help="filter when upscaling instead of keeping hard pixels")
+    parser.add_argument('--hide-layers', metavar='NAMES', default='',
+                        help="comma separated layers not to draw, of " + ", ".join(LAYER_NAMES))
+    parser.add_argument('--seed', type=int,
+                        help="play the same obstacle course every game")
+    parser.add_argument('--record', metavar='PATH',
+                        help="save the seed and inputs of this session for replay_renderer")
+    parser.add_argument('--tick-log', metavar='PATH',
+                        help="write a fixed-size telemetry record for every frame to PATH")
+    parser.add_argument('--telemetry', metavar='PATH',
+                        help="append per-game metrics to a JSONL file from a background thread")
+    parser.add_argument('--spectate', metavar='ADDRESS', nargs='?', const='127.0.0.1:7777',
+                        help="stream the game to spectators on host:port or a Unix socket "
+                             "path, watch with python -m game.spectate")
+    parser.add_argument('--autopilot', action='store_true',
+                        help="let a bot play, starting and restarting games by itself")
+    parser.add_argument('--async-loop', action='store_true',
+                        help="run the game loop on asyncio, pacing frames so other "
+                             "coroutines can run in the time left over")
+    parser.add_argument('--leaderboard', metavar='PATH', default=LEADERBOARD_PATH,
+                        help="file every final score is saved to and ranked against")
+    parser.add_argument('--profile', metavar='PREFIX',
+                        help="profile a window of frames, writes PREFIX.pstats, "
+                             "PREFIX.collapsed and PREFIX.trace.json")
+    parser.add_argument('--profile-start', type=int, default=0, metavar='FRAMES',
+                        help="frames to run before the profile starts")
+    parser.add_argument('--profile-frames', type=int, default=600, metavar='FRAMES',
+                        help="frames to profile")
+    parser.add_argument('--profile-replay', metavar='PATH',
+                        help="with --profile, play this recording offscreen instead of a game")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="print the time from process start to the first frame and exit")
+    args = parser.parse_args(argv)
+    if args.render_scale <= 0:
+        parser.error("--render-scale must be positive")
+    if args.profile_replay and not args.profile:
+        parser.error("--profile-replay needs --profile")
+    try:
+        args.hide_layers = parse_layers(args.hide_layers) if args.hide_layers else set()
+    except ValueError as e:
+        parser.error(f"--hide-layers: {e}")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    if args.profile_replay:
+        from game.utils.profiler import profile_replay
+        profile_replay(args.profile_replay, args.profile, args.profile_start, args.profile_frames)
+        return
+    
     # Initialize Pygame
     pygame.init()
     
     # Set up the display with white background
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    display = create_display(args.renderer, (SCREEN_WIDTH, SCREEN_HEIGHT), "Sheep Jump!",
+                             render_scale=args.render_scale, fullscreen=args.fullscreen,
+                             smooth=args.smooth_scale)
+    screen = display.screen
     screen.fill(WHITE)  # Start with white background
-    pygame.display.set_caption("Sheep Jump!")
-    pygame.display.flip()  # Show white background immediately
+    display.present()  # Show white background immediately
+    
+    # Only queue the events the game reads, everything else is dropped by SDL
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN])
+    
+    # Recordings seed everything and run the game clock at a fixed rate
+    recording = None
+    if args.record:
+        from game.utils.replay import Recording
+        recording = Recording(args.seed)
+        recording.begin()
     
     # Create game manager
-    game = GameManager(screen)
+    game = GameManager(screen, display=display,
+                       seed=recording.seed if recording else args.seed)
+    game.recording = recording
+    game.render_queue.skipped = args.hide_layers
+    game.leaderboard = Leaderboard(args.leaderboard)
+    game.leaderboard.preload()  # Read in the background, ready for the first game over
+    if args.tick_log:
+        from game.utils.tick_log import TickLogWriter
+        # Logs from recorded sessions carry the seed and rate, so they replay too
+        game.tick_log = TickLogWriter(args.tick_log,
+                                      seed=recording.seed if recording else 0,
+                                      fps=recording.fps if recording else 0)
+    if args.telemetry:
+        from game.utils.telemetry import TelemetrySink, SessionTelemetry
+        game.telemetry = SessionTelemetry(game, TelemetrySink(args.telemetry))
+    if args.autopilot:
+        from game.utils.autopilot import Autopilot
+        game.autopilot = Autopilot()
+    spectators = None
+    tasks = []
+    if args.spectate:
+        from game.utils.spectator import SpectatorServer
+        spectators = SpectatorServer(args.spectate)
+        if args.async_loop:
+            # Served from the event loop between frames instead of within them
+            tasks.append(lambda pacer: spectators.serve(game, pacer))
+        else:
+            game.spectators = spectators
     
     # Game loop
     clock = pygame.time.Clock()
-    running = True
+    profiler = None
+    if args.profile:
+        from game.utils.profiler import SessionProfiler
+        profiler = SessionProfiler(args.profile, args.profile_start, args.profile_frames)
+    frames = 1 if args.startup_report else None
+    try:
+        if args.async_loop:
+            import asyncio
+            asyncio.run(run_async(game, display, frames, profiler, tasks))
+        else:
+            run_loop(game, display, clock, frames, profiler)
+        if args.startup_report:
+            print(f"Time to first frame: {game.instrumentation.gauges['first_frame_ms']} ms")
+    finally:
+        if recording is not None:
+            recording.frames = frame_clock.frame
+            recording.save(args.record)
+        if game.tick_log is not None:
+            game.tick_log.close()
+        if game.telemetry is not None:
+            game.telemetry.close()
+        if spectators is not None:
+            spectators.close()
+        if profiler is not None:
+            profiler.close()
+        game.leaderboard.close()
     
+    pygame.quit()
+
+def run_loop(game, display, clock, frames=None, profiler=None):
+    """Run frames until the window is closed, or for a number of frames
+
+    A utils.profiler.SessionProfiler gets the times of each frame's phases.
+    """
+    running = True
+    first_frame = True
     while running:
-        # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            else:
-                game.handle_event(event)
-        
-        # Update game state
-        game.update()
-        
-        # Draw everything
-        game.draw()
-        pygame.display.flip()
+        running = run_frame(game, display, profiler, first_frame)
+        first_frame = False
         
         # Cap the frame rate at 60 FPS
         clock.tick(60)
+        
+        if frames is not None:
+            frames -= 1
+            running = running and frames > 0
+
+async def run_async(game, display, frames=None, profiler=None, tasks=()):
+    """run_loop on asyncio, with other coroutines running in the slack of each frame
+
+    Frames are paced by a utils.async_loop.FramePacer, whose split of the
+    frame budget into used, other tasks and idle goes to the overlay.
+    tasks are functions taking the pacer and returning a coroutine.
+    """
+    import asyncio
+    from game.utils.async_loop import FramePacer
+    pacer = FramePacer()
+    first_frame = True
+
+    def frame():
+        nonlocal first_frame
+        running = run_frame(game, display, profiler, first_frame)
+        first_frame = False
+        if pacer.frames % 60 == 0:
+            for name, value in pacer.summary().items():
+                game.instrumentation.set(name, value)
+        return running
+
+    background = [asyncio.create_task(task(pacer)) for task in tasks]
+    try:
+        await pacer.run(frame, frames)
+    finally:
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+
+def run_frame(game, display, profiler=None, first_frame=False):
+    """Handle input, update, draw and present one frame, False once the window is closed"""
+    running = True
+    frame_start = time.perf_counter()
     
-    pygame.quit()
+    # Event handling, inputs are stamped here for the latency tracker
+    game.latency.poll()
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            running = False
+        else:
+            game.handle_event(event)
+    if game.autopilot is not None:
+        game.autopilot.tick(game)  # Its inputs go in with the player's
+    
+    # Update game state
+    update_start = time.perf_counter()
+    game.update()
+    
+    # Draw everything
+    update_end = time.perf_counter()
+    game.draw()
+    draw_end = time.perf_counter()
+    display.present()
+    if profiler is not None:
+        profiler.frame(frame_start, update_start, update_end, draw_end, time.perf_counter())
+    if first_frame:
+        game.instrumentation.set('first_frame_ms', time_to_first_frame(STARTED))
+    
+    # Time spent on this frame, not counting the wait for the next one
+    game.record_frame_time((time.perf_counter() - frame_start) * 1000)
+    return running
 
 if __name__ == "__main__":
     main()
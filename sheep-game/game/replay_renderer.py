@@ -0,0 +1,160 @@
+"""Render a recorded session to frames, faster than real time
+
+    python -m game.replay_renderer session.replay --output frames/
+    python -m game.replay_renderer session.replay --format raw --output clip.rgb
+
+The recording is first simulated without drawing to snapshot the start of
+every segment, then worker processes restore those snapshots and draw their
+segments in parallel. Raw output is a single RGB24 stream at the game
+resolution that can be piped into an encoder, e.g.
+
+    ffmpeg -f rawvideo -pix_fmt rgb24 -s 800x400 -r 60 -i clip.rgb clip.mp4
+"""
+import os
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'  # Hide Pygame welcome message
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Never open a window
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import multiprocessing
+import shutil
+import time
+import pygame
+from game.game_manager import GameManager
+from game.utils.constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from game.utils.replay import Recording, apply_input
+
+
+def create_game(recording):
+    """Fresh offscreen game in the state the recording started from"""
+    recording.begin()
+    return GameManager(pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)),
+                       audio=False, seed=recording.seed)
+
+
+def step(game, inputs):
+    """Apply one frame's inputs and update, the same order as the live loop"""
+    for kind, value in inputs:
+        apply_input(game, kind, value)
+    game.update()
+
+
+def plan_segments(recording, segment_frames):
+    """Simulate the whole recording without drawing, snapshotting each segment start
+
+    Returns (segments, final_snapshot) where segments are (start, end, snapshot).
+    """
+    game = create_game(recording)
+    inputs = recording.inputs_by_frame()
+    segments = []
+    for frame in range(recording.frames):
+        if frame % segment_frames == 0:
+            end = min(frame + segment_frames, recording.frames)
+            segments.append((frame, end, game.snapshot()))
+        step(game, inputs.get(frame, ()))
+    return segments, game.snapshot()
+
+
+def segment_path(output, start):
+    return f"{output}.part{start:07d}"
+
+
+def init_worker():
+    pygame.init()
+
+
+def render_segment(task):
+    """Restore a segment's snapshot and draw its frames
+
+    Returns (start, snapshot after the last frame) so the caller can check
+    the segment ended exactly where the next one starts.
+    """
+    recording, start, end, snapshot, output, image_format = task
+    game = create_game(recording)
+    game.restore(snapshot)
+    inputs = recording.inputs_by_frame()
+
+    raw = open(segment_path(output, start), 'wb') if image_format == 'raw' else None
+    try:
+        for frame in range(start, end):
+            step(game, inputs.get(frame, ()))
+            game.draw()
+            if raw is not None:
+                raw.write(pygame.image.tobytes(game.screen, 'RGB'))
+            else:
+                pygame.image.save(game.screen, os.path.join(output, f"frame_{frame:06d}.{image_format}"))
+    finally:
+        if raw is not None:
+            raw.close()
+    return start, game.snapshot()
+
+
+def render(recording, output, image_format='png', workers=None, segment_frames=600):
+    """Render every frame of a recording, returns the number of desynced segments"""
+    segments, final = plan_segments(recording, segment_frames)
+    if image_format != 'raw':
+        os.makedirs(output, exist_ok=True)
+    tasks = [(recording, start, end, snapshot, output, image_format)
+             for start, end, snapshot in segments]
+
+    if workers == 1:
+        init_worker()
+        results = [render_segment(task) for task in tasks]
+    else:
+        # Spawned workers start clean, forking a process with SDL running can hang
+        context = multiprocessing.get_context('spawn')
+        pool = context.Pool(workers, initializer=init_worker)
+        try:
+            results = pool.map(render_segment, tasks)
+        finally:
+            # Let the workers shut pygame down on their own instead of terminate()
+            pool.close()
+            pool.join()
+
+    # Each segment has to end on the snapshot the next one started from
+    expected = [snapshot for _, _, snapshot in segments[1:]] + [final]
+    desynced = sum(1 for (_, ended), start in zip(results, expected) if ended != start)
+
+    if image_format == 'raw':
+        with open(output, 'wb') as stream:
+            for start, _, _ in segments:
+                with open(segment_path(output, start), 'rb') as part:
+                    shutil.copyfileobj(part, stream)
+                os.remove(segment_path(output, start))
+    return desynced
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render a recorded Sheep Jump! session")
+    parser.add_argument('replay', help="file saved with main.py --record")
+    parser.add_argument('--output', default='frames',
+                        help="directory for image frames, or the file for --format raw")
+    parser.add_argument('--format', choices=['png', 'bmp', 'raw'], default='png',
+                        help="image sequence format, or raw RGB24 for an encoder")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="worker processes, 1 renders in this process")
+    parser.add_argument('--segment-frames', type=int, default=600,
+                        help="frames rendered per task, each starts from a snapshot")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    pygame.init()
+    recording = Recording.load(args.replay)
+
+    start = time.perf_counter()
+    desynced = render(recording, args.output, args.format, args.workers, args.segment_frames)
+    elapsed = time.perf_counter() - start
+
+    duration = recording.frames / recording.fps
+    print(f"Rendered {recording.frames} frames ({duration:.1f}s of play) in {elapsed:.1f}s, "
+          f"{recording.frames / elapsed:.0f} fps, {duration / elapsed:.1f}x real time")
+    if desynced:
+        print(f"Warning: {desynced} segments did not match the simulation, "
+              "the recording may come from a different game version")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
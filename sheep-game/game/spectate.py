@@ -0,0 +1,82 @@
+"""Watch a game streamed with main.py --spectate
+
+    python main.py --spectate 127.0.0.1:7777
+    python -m game.spectate 127.0.0.1:7777
+
+The window is drawn by a GameManager that never updates, its state comes
+from the stream (see utils.spectator). Whatever arrived since the last
+frame is applied before drawing, so a spectator that falls behind catches
+up instead of lagging further.
+"""
+import os
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'  # Hide Pygame welcome message
+
+import argparse
+import socket
+import time
+import pygame
+from game.game_manager import GameManager
+from game.utils.constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from game.utils.display import create_display
+from game.utils.spectator import SpectatorClient, DEFAULT_ADDRESS, parse_address
+
+
+def connect(address, timeout=10.0):
+    """Connect to a server, retrying until it is up or the timeout runs out"""
+    family, target = parse_address(address)
+    deadline = time.monotonic() + timeout
+    while True:
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.connect(target)
+            return sock
+        except OSError:
+            sock.close()
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.25)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a Sheep Jump! game")
+    parser.add_argument('address', nargs='?', default=DEFAULT_ADDRESS,
+                        help="host:port or Unix socket path the game streams to")
+    args = parser.parse_args(argv)
+
+    sock = connect(args.address)
+    sock.setblocking(False)
+
+    pygame.init()
+    display = create_display('surface', (SCREEN_WIDTH, SCREEN_HEIGHT), "Sheep Jump! (spectating)")
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN])
+    game = GameManager(display.screen, audio=False)
+    client = SpectatorClient(game)
+
+    clock = pygame.time.Clock()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN
+                                             and event.key in (pygame.K_ESCAPE, pygame.K_q)):
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                game.instrumentation.toggle()
+        try:
+            while True:
+                data = sock.recv(1 << 16)
+                if not data:
+                    running = False  # The game was closed
+                    break
+                client.feed(data)
+        except BlockingIOError:
+            pass
+        game.draw()
+        display.present()
+        clock.tick(60)
+    sock.close()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
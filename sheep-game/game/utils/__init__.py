@@ -1 +0,0 @@
-from .constants import *
@@ -0,0 +1,85 @@
+import math
+import pygame
+
+# Periodic tables use a power of two length so wrapping an index is a mask
+TABLE_SIZE = 256
+# Multiply an angle in radians by this to get a table index
+RADIANS_TO_INDEX = TABLE_SIZE / (2 * math.pi)
+
+
+class Curve:
+    """A precomputed animation curve sampled by index instead of calling trig"""
+
+    def __init__(self, func, size=TABLE_SIZE, periodic=True):
+        self.size = size
+        self.periodic = periodic
+        self.mask = size - 1
+        if periodic:
+            # func is sampled over one cycle, [0, 1)
+            self.values = [func(i / size) for i in range(size)]
+        else:
+            # func is sampled over [0, 1] inclusive and clamped outside it
+            self.values = [func(i / (size - 1)) for i in range(size)]
+
+    def at(self, index):
+        """Sample the curve at a (fractional) table index"""
+        if self.periodic:
+            return self.values[int(index) & self.mask]
+        return self.values[min(max(int(index), 0), self.size - 1)]
+
+
+class FrameClock:
+    """Frame counter and timestamp shared by everything that animates
+
+    The clock is read from pygame once per frame in advance(), so entities
+    don't each call pygame.time.get_ticks(). Recordings and replays switch it
+    to a fixed rate, so game time only depends on the frame count.
+    """
+
+    def __init__(self):
+        self.frame = 0
+        self.ticks = pygame.time.get_ticks()
+        self.fixed_fps = None  # Frames per second of game time, None follows the real clock
+
+    def advance(self):
+        """Move to the next frame"""
+        self.seek(self.frame + 1)
+
+    def seek(self, frame):
+        """Jump to a frame, fixed-rate clocks also jump to its time"""
+        self.frame = frame
+        if self.fixed_fps is None:
+            self.ticks = pygame.time.get_ticks()
+        else:
+            self.ticks = frame * 1000 // self.fixed_fps
+
+    def use_fixed_rate(self, fps=60, frame=0):
+        """Derive the time from the frame count from now on"""
+        self.fixed_fps = fps
+        self.seek(frame)
+
+
+# Curve registry, extend it with register_curve() for new effects
+CURVES = {}
+
+
+def register_curve(name, func, size=TABLE_SIZE, periodic=True):
+    """Precompute a curve and make it available by name"""
+    curve = Curve(func, size, periodic)
+    CURVES[name] = curve
+    return curve
+
+
+def get_curve(name):
+    """Look up a registered curve"""
+    return CURVES[name]
+
+
+# Built-in curves
+SINE = register_curve('sine', lambda t: math.sin(2 * math.pi * t))
+ABS_SINE = register_curve('abs_sine', lambda t: abs(math.sin(2 * math.pi * t)))
+PULSE = register_curve('pulse', lambda t: (math.sin(2 * math.pi * t) + 1) * 0.5)
+POPUP_RISE = register_curve('popup_rise', lambda t: t, size=61, periodic=False)  # One entry per popup frame
+
+# Shared clock, advanced once per frame by the game manager
+frame_clock = FrameClock()
@@ -0,0 +1,140 @@
+"""Incremental build of the generated sound effects
+
+    python -m game.utils.asset_build
+    python -m game.utils.asset_build --force --pack
+
+Every effect in sound_generator.SOUND_EFFECTS is keyed by a hash of its
+generator's source, which holds all of its synthesis parameters. Effects
+whose hash or output file changed since the last build are regenerated in
+parallel worker processes, the rest are skipped. The manifest written next
+to the sounds records each hash with the output's size and modification
+time, so SoundManager can spot stale or edited files with a stat() instead
+of reading them. Only what that check needs is imported at the top.
+"""
+import json
+import os
+import random
+import time
+
+# Bump to rebuild everything, e.g. when the WAV writing itself changes
+BUILD_VERSION = 1
+
+SOUNDS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'sounds')
+MANIFEST_NAME = 'sounds.manifest'
+
+
+def manifest_path(sounds_dir=SOUNDS_DIR):
+    return os.path.join(sounds_dir, MANIFEST_NAME)
+
+
+def load_manifest(sounds_dir=SOUNDS_DIR):
+    """The last build's manifest, empty if there is none or it can't be read"""
+    try:
+        with open(manifest_path(sounds_dir), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get('version') == BUILD_VERSION else {}
+
+
+def stale_outputs(manifest, sounds_dir=SOUNDS_DIR):
+    """Outputs that are missing or differ from the manifest, checked with stat() only"""
+    stale = []
+    for filename, record in manifest.get('sounds', {}).items():
+        try:
+            stat = os.stat(os.path.join(sounds_dir, filename))
+        except OSError:
+            stale.append(filename)
+            continue
+        if stat.st_size != record['size'] or stat.st_mtime_ns != record['mtime_ns']:
+            stale.append(filename)
+    return stale
+
+
+def effect_hash(create_sound):
+    """Hash of an effect's generator code, its parameters are literals in it"""
+    import hashlib
+    import inspect
+    source = inspect.getsource(create_sound)
+    return hashlib.sha256(f"{BUILD_VERSION}\n{source}".encode('utf-8')).hexdigest()
+
+
+def generate(task):
+    """Worker: synthesize one effect, returns (filename, size, mtime_ns, seconds)"""
+    from .sound_generator import SOUND_EFFECTS
+    filename, sounds_dir = task
+    start = time.perf_counter()
+    random.seed(filename)  # Noisy effects come out the same on every build
+    path = os.path.join(sounds_dir, filename)
+    SOUND_EFFECTS[filename](path)
+    stat = os.stat(path)
+    return filename, stat.st_size, stat.st_mtime_ns, time.perf_counter() - start
+
+
+def build(sounds_dir=SOUNDS_DIR, workers=None, force=False):
+    """Regenerate the stale effects and write the manifest
+
+    Returns (built, skipped) lists of file names.
+    """
+    import multiprocessing
+    from .sound_generator import SOUND_EFFECTS
+    os.makedirs(sounds_dir, exist_ok=True)
+    previous = load_manifest(sounds_dir).get('sounds', {})
+    hashes = {filename: effect_hash(create) for filename, create in SOUND_EFFECTS.items()}
+    edited = set(stale_outputs({'sounds': previous}, sounds_dir))
+
+    tasks = [(filename, sounds_dir) for filename in SOUND_EFFECTS
+             if force or filename in edited or filename not in previous
+             or previous[filename]['hash'] != hashes[filename]]
+    if len(tasks) <= 1 or workers == 1:
+        results = [generate(task) for task in tasks]
+    else:
+        # Same as the replay renderer, spawned workers don't inherit SDL state
+        context = multiprocessing.get_context('spawn')
+        pool = context.Pool(min(workers or os.cpu_count(), len(tasks)))
+        try:
+            results = pool.map(generate, tasks)
+        finally:
+            pool.close()
+            pool.join()
+
+    sounds = {filename: record for filename, record in previous.items()
+              if filename in SOUND_EFFECTS}
+    for filename, size, mtime_ns, seconds in results:
+        sounds[filename] = {'hash': hashes[filename], 'size': size, 'mtime_ns': mtime_ns,
+                            'seconds': round(seconds, 3)}
+    temp_path = manifest_path(sounds_dir) + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': BUILD_VERSION, 'sounds': sounds}, f, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path(sounds_dir))
+
+    built = [filename for filename, *_ in results]
+    return built, [filename for filename in SOUND_EFFECTS if filename not in built]
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate the sound effects that are out of date")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="worker processes, 1 builds in this process")
+    parser.add_argument('--force', action='store_true', help="rebuild every effect")
+    parser.add_argument('--pack', action='store_true',
+                        help="repack game/assets/assets.pack when anything was built")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    built, skipped = build(workers=args.workers, force=args.force)
+    print(f"Built {len(built)} sounds, {len(skipped)} up to date "
+          f"in {time.perf_counter() - start:.2f}s")
+    for filename in built:
+        print(f"  {filename}")
+
+    if args.pack:
+        from .asset_pack import pack_assets, DEFAULT_PATH
+        if built or not os.path.exists(DEFAULT_PATH):
+            count = pack_assets()
+            print(f"Packed {count} assets into {DEFAULT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
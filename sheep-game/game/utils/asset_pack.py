@@ -0,0 +1,192 @@
+"""Single-file asset bundle, mapped into memory instead of read file by file
+
+    python -m game.utils.asset_pack
+
+packs everything under game/assets into game/assets/assets.pack. Sounds are
+stored as raw PCM in the mixer's format and images as raw RGBA pixels, so
+the game can hand slices of the mapped file straight to
+pygame.mixer.Sound(buffer=...) and pygame.image.frombuffer without decoding
+anything. Assets are named by their path under game/assets, and the game
+falls back to those loose files when there is no pack or an asset is
+missing from it.
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import wave
+from array import array
+from collections import namedtuple
+import pygame
+
+# Bump whenever the layout below changes
+ASSET_PACK_MAGIC = b'SHAP'
+ASSET_PACK_VERSION = 1
+
+# Entry count, then one ENTRY per asset, then the payloads
+HEADER = struct.Struct('<4sHI6x')
+# Name, kind, payload offset and size, then for sounds the mixer format
+# (frequency, sample size, channels) and for images (width, height, 4)
+NAME_SIZE = 48
+ENTRY = struct.Struct(f'<{NAME_SIZE}sB3xQQiiI')
+PAYLOAD_ALIGNMENT = 16
+
+SOUND = 0
+IMAGE = 1
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets')
+DEFAULT_PATH = os.path.join(ASSETS_DIR, 'assets.pack')
+SOUND_EXTENSIONS = ('.wav',)
+IMAGE_EXTENSIONS = ('.png', '.bmp')
+
+# pygame's default mixer format, sounds are converted to it when packed
+SOUND_FORMAT = (44100, -16, 2)
+
+Entry = namedtuple('Entry', 'kind offset size a b c')
+
+
+class AssetPack:
+    """Read-only view of a pack file, payloads are slices of the mapped file"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        magic, version, count = HEADER.unpack_from(self.view)
+        if magic != ASSET_PACK_MAGIC or version != ASSET_PACK_VERSION:
+            self.close()
+            raise ValueError("Not a compatible asset pack")
+        self.entries = {}
+        for i in range(count):
+            name, *fields = ENTRY.unpack_from(self.view, HEADER.size + i * ENTRY.size)
+            self.entries[name.rstrip(b'\0').decode('utf-8')] = Entry(*fields)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def data(self, name):
+        """Payload of an asset as a memoryview, no bytes are copied"""
+        entry = self.entries[name]
+        return self.view[entry.offset:entry.offset + entry.size]
+
+    def sound(self, name):
+        """Sound from the packed PCM, None if the mixer runs in another format"""
+        entry = self.entries[name]
+        if entry.kind != SOUND or pygame.mixer.get_init() != (entry.a, entry.b, entry.c):
+            return None
+        return pygame.mixer.Sound(buffer=self.data(name))
+
+    def image(self, name):
+        """Surface drawing straight from the mapped pixels
+
+        The surface shares the pack's memory, so the pack has to stay open
+        for as long as the surface is used.
+        """
+        entry = self.entries[name]
+        if entry.kind != IMAGE:
+            return None
+        return pygame.image.frombuffer(self.data(name), (entry.a, entry.b), 'RGBA')
+
+    def close(self):
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+
+def open_pack(path=DEFAULT_PATH):
+    """The pack at path, or None when there isn't one and loose files are used"""
+    if not os.path.exists(path):
+        return None
+    try:
+        return AssetPack(path)
+    except (OSError, ValueError, struct.error):
+        print(f"Ignoring unreadable asset pack: {path}")
+        return None
+
+
+def read_sound(path):
+    """PCM of a 16-bit WAV file in SOUND_FORMAT, returns (bytes, format)"""
+    frequency, size, channels = SOUND_FORMAT
+    with wave.open(path, 'rb') as wav_file:
+        if wav_file.getsampwidth() != 2 or wav_file.getframerate() != frequency:
+            raise ValueError(f"{path}: only {frequency} Hz 16-bit sounds can be packed")
+        samples = array('h', wav_file.readframes(wav_file.getnframes()))
+        source_channels = wav_file.getnchannels()
+    if sys.byteorder == 'big':
+        samples.byteswap()  # WAV data is little-endian
+    if source_channels != channels:
+        if source_channels != 1:
+            raise ValueError(f"{path}: only mono sounds can be converted")
+        # Copy the one channel into every output channel
+        mono = samples
+        samples = array('h', bytes(len(mono) * channels * mono.itemsize))
+        for channel in range(channels):
+            samples[channel::channels] = mono
+    return samples.tobytes(), SOUND_FORMAT
+
+
+def read_image(path):
+    """RGBA pixels of an image file, returns (bytes, (width, height, 4))"""
+    surface = pygame.image.load(path)
+    return pygame.image.tobytes(surface, 'RGBA'), (*surface.get_size(), 4)
+
+
+def collect_assets(assets_dir=ASSETS_DIR):
+    """(name, kind, path) of every packable file, in a stable order"""
+    assets = []
+    for root, _, files in os.walk(assets_dir):
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, assets_dir).replace(os.sep, '/')
+            extension = os.path.splitext(filename)[1].lower()
+            if extension in SOUND_EXTENSIONS:
+                assets.append((name, SOUND, path))
+            elif extension in IMAGE_EXTENSIONS:
+                assets.append((name, IMAGE, path))
+    return sorted(assets)
+
+
+def pack_assets(output=DEFAULT_PATH, assets_dir=ASSETS_DIR):
+    """Write every asset under assets_dir into one pack, returns the entry count
+
+    The pack is written next to the output and renamed over it, so a running
+    game never maps a half-written file.
+    """
+    payloads = []
+    for name, kind, path in collect_assets(assets_dir):
+        data, fields = read_sound(path) if kind == SOUND else read_image(path)
+        payloads.append((name, kind, data, fields))
+
+    offset = HEADER.size + ENTRY.size * len(payloads)
+    entries = []
+    for name, kind, data, fields in payloads:
+        if len(name.encode('utf-8')) > NAME_SIZE:
+            raise ValueError(f"Asset name too long to pack: {name}")
+        offset += -offset % PAYLOAD_ALIGNMENT
+        entries.append(ENTRY.pack(name.encode('utf-8'), kind, offset, len(data), *fields))
+        offset += len(data)
+
+    temp_path = output + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(ASSET_PACK_MAGIC, ASSET_PACK_VERSION, len(payloads)))
+        f.write(b''.join(entries))
+        for name, kind, data, fields in payloads:
+            f.write(bytes(-f.tell() % PAYLOAD_ALIGNMENT))
+            f.write(data)
+    os.replace(temp_path, output)
+    return len(payloads)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack the game assets into one file")
+    parser.add_argument('--assets', default=ASSETS_DIR, help="directory to pack")
+    parser.add_argument('--output', default=DEFAULT_PATH, help="pack file to write")
+    args = parser.parse_args(argv)
+    count = pack_assets(args.output, args.assets)
+    print(f"Packed {count} assets into {args.output} ({os.path.getsize(args.output) / 1e3:.0f} kB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Frame pacing on asyncio, so other coroutines can share the game thread
+
+    python main.py --async-loop
+    python -m game.utils.async_loop
+
+FramePacer runs one frame per period as a coroutine and awaits the rest
+of the period, so any other task on the event loop (a telemetry upload,
+a socket server, a search) runs in the slack of each frame instead of
+needing a thread. The event loop's timers are only good to a millisecond,
+so the last PRECISE_SLEEP_MS before a frame are slept with time.sleep()
+instead, which keeps frames on schedule at the cost of the other tasks
+not running in that stretch. A task that holds on to the thread for
+longer than that between awaits still delays the next frame. Tasks
+that work once per frame await next_frame(), and run in the slack right
+after the frame they wait for.
+
+Each frame's budget is split into the time the frame itself took, the
+CPU time other tasks used while it was awaiting, and what was left idle.
+A frame that starts more than a period late doesn't make the following
+ones hurry to catch up, the schedule restarts from it.
+"""
+import asyncio
+import time
+from collections import deque
+from .instrumentation import percentile
+
+FPS = 60
+PRECISE_SLEEP_MS = 1.5
+
+
+class FramePacer:
+    """Calls a frame function once per period from a coroutine
+
+    Args:
+        fps (int): Frames per second to pace at
+        window (int): Frames the reported shares and lateness cover
+        precise_sleep_ms (float): Stretch before each frame slept without
+            the event loop, for accurate pacing
+    """
+
+    def __init__(self, fps=FPS, window=240, precise_sleep_ms=PRECISE_SLEEP_MS):
+        self.period = 1 / fps
+        self.precise_sleep = precise_sleep_ms / 1000
+        self.used = deque(maxlen=window)  # Milliseconds the frame itself took
+        self.tasks = deque(maxlen=window)  # CPU milliseconds other tasks took in the slack
+        self.lateness = deque(maxlen=window)  # Milliseconds each frame started after its time
+        self.overruns = 0  # Frames that started over a period late
+        self.frames = 0
+        self.waiters = []  # Futures of tasks waiting for the next frame
+
+    async def run(self, frame, frames=None):
+        """Call frame() every period until it returns False, or for a number of frames"""
+        deadline = time.perf_counter()
+        while True:
+            start = time.perf_counter()
+            late = start - deadline
+            if late > self.period:
+                self.overruns += 1
+                deadline = start  # Don't rush the next frames to catch up
+                late = 0.0
+            self.lateness.append(late * 1000)
+            running = frame()
+            used = time.perf_counter() - start
+            self.used.append(used * 1000)
+            self.frames += 1
+            for waiter in self.waiters:
+                if not waiter.done():
+                    waiter.set_result(self.frames)
+            self.waiters.clear()
+            if frames is not None:
+                frames -= 1
+                running = running and frames > 0
+            if not running:
+                self.tasks.append(0.0)
+                return
+
+            # Let the other tasks have the slack, then sleep the last
+            # stretch precisely. Always yield, even without any slack.
+            deadline += self.period
+            cpu = time.thread_time()
+            await asyncio.sleep(max(0.0, deadline - time.perf_counter() - self.precise_sleep))
+            self.tasks.append((time.thread_time() - cpu) * 1000)
+            remaining = deadline - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+
+    async def next_frame(self):
+        """Wait until another frame has run, returns the number of frames so far"""
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        return await waiter
+
+    def summary(self):
+        """Shares of the frame budget and pacing accuracy over the window"""
+        budget = self.period * 1000 * max(1, len(self.used))
+        used = sum(self.used)
+        tasks = sum(self.tasks)
+        return {
+            'loop_used_pct': round(100 * used / budget, 1),
+            'loop_tasks_pct': round(100 * tasks / budget, 1),
+            'loop_idle_pct': round(max(0.0, 100 * (budget - used - tasks) / budget), 1),
+            'loop_late_ms_p50': round(percentile(self.lateness, 50), 3),
+            'loop_late_ms_p99': round(percentile(self.lateness, 99), 3),
+            'loop_overruns': self.overruns,
+        }
+
+
+def benchmark(frames=600):
+    """Pace a headless game with Clock.tick(60) and with the pacer, with a task in the slack
+
+    The game is played by the autopilot. The task compresses 8 KB chunks
+    in a loop, yielding between chunks, to show how much work fits next to
+    the game without a thread.
+    """
+    import os
+    import zlib
+    import pygame
+    from .autopilot import autoplayed_game
+
+    game, autopilot = autoplayed_game(warmup=0)
+
+    def frame():
+        autopilot.tick(game)
+        game.update()
+        game.draw()
+        return True
+
+    clock = pygame.time.Clock()
+    starts = []
+    for _ in range(frames):
+        starts.append(time.perf_counter())
+        frame()
+        clock.tick(FPS)
+    gaps = sorted(abs(b - a - 1 / FPS) * 1000 for a, b in zip(starts, starts[1:]))
+    print(f"Clock.tick:  period error p50 {gaps[len(gaps) // 2]:.3f} ms, "
+          f"p99 {gaps[len(gaps) * 99 // 100]:.3f} ms")
+
+    async def main():
+        chunk = os.urandom(8 * 1024)
+        done = 0
+        pacer = FramePacer()
+
+        async def background():
+            nonlocal done
+            while True:
+                zlib.compress(chunk, 1)
+                done += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(background())
+        await pacer.run(frame, frames)
+        task.cancel()
+        return pacer, done
+
+    pacer, chunks = asyncio.run(main())
+    summary = pacer.summary()
+    print(f"FramePacer:  start lateness p50 {summary['loop_late_ms_p50']:.3f} ms, "
+          f"p99 {summary['loop_late_ms_p99']:.3f} ms, {summary['loop_overruns']} overruns")
+    print(f"             budget used {summary['loop_used_pct']}%, other tasks "
+          f"{summary['loop_tasks_pct']}%, idle {summary['loop_idle_pct']}%, "
+          f"{chunks} chunks compressed in the slack ({chunks / frames:.1f} per frame)")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,276 @@
+"""A bot that plays the game, for attract mode and soak tests
+
+    python main.py --autopilot
+    python -m game.utils.autopilot
+
+Every tick the autopilot clones the sheep and predicts where every
+hitbox in the world will be for the next HORIZON_FRAMES frames, then
+searches jump, no-jump and double jump sequences against them. The
+sheep is simulated with Sheep.update() and Sheep.jump() and a frame
+collides under the same rect test as ecs.collide(), so the bot plays by
+the game's rules rather than its own copy of them.
+
+The search is depth-first with waiting tried before jumping. The first
+line that lasts the whole horizon decides this tick's input, so the bot
+jumps as late as it safely can and keeps its second jump for as long as
+possible. If the per-tick budget runs out, or nothing survives, it
+takes the line that lasted longest. The budget covers the prediction as
+well, and the clock is read every BUDGET_CHECK_NODES simulated frames,
+so a tick overruns it by one batch of frames at most.
+
+A wall clock budget makes the bot play differently from run to run. When
+the game clock runs at a fixed rate (recordings, the benchmark) the
+budget is BUDGET_NODES simulated frames instead, so the same seed is
+played the same way every time.
+"""
+import time
+import numpy as np
+import pygame
+from . import ecs
+from .animation import frame_clock
+from .constants import MAX_GAME_SPEED, SPEED_INCREMENT
+from ..entities.sheep import Sheep
+
+# How far ahead lines are searched, 750 ms at 60 FPS. A jump takes about
+# 37 frames, shorter horizons land the sheep on eagles they can't see yet.
+HORIZON_FRAMES = 45
+DECISION_FRAMES = 2  # Frames between the points a line can jump at, after the first
+BUDGET_MS = 1.0  # Search time per tick
+RESTART_FRAMES = 90  # Wait on the menu and game over screens before pressing SPACE
+BUDGET_CHECK_NODES = 16  # Nodes searched between looks at the clock
+BUDGET_NODES = 512  # Nodes per tick at a fixed clock rate, about BUDGET_MS of searching
+
+
+class Autopilot:
+    """Presses SPACE for a game, call tick(game) before each update
+
+    Args:
+        horizon (int): Frames each line is simulated ahead
+        decision_frames (int): Frames between jump decisions within a line
+        budget_ms (float): Search time per tick
+        budget_nodes (int): Nodes per tick instead, when the game clock
+            runs at a fixed rate
+        restart_frames (int): Frames to wait before starting or restarting
+            a game, None never leaves the menus
+    """
+
+    def __init__(self, horizon=HORIZON_FRAMES, decision_frames=DECISION_FRAMES,
+                 budget_ms=BUDGET_MS, budget_nodes=BUDGET_NODES,
+                 restart_frames=RESTART_FRAMES):
+        self.horizon = horizon
+        self.decision_frames = decision_frames
+        self.budget = budget_ms / 1000
+        self.budget_nodes = budget_nodes
+        self.restart_frames = restart_frames
+        self.waited = 0  # Frames spent on a menu or the game over screen
+        self.sheep = Sheep()  # Scratch sheep the searched lines run on
+        self.space = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)
+        # Totals since the autopilot started
+        self.searches = 0
+        self.nodes = 0  # Simulated sheep frames
+        self.search_time = 0.0  # Predicting and searching
+        self.expand_time = 0.0  # Searching alone, the time the nodes took
+        self.cut_short = 0  # Searches stopped by the budget
+        self.unavoidable = 0  # Searches where every line collided
+        self.last_search_us = 0.0
+
+    def tick(self, game):
+        """Decide this frame's input and hand it to the game"""
+        if game.is_paused:
+            return
+        if not game.game_started or game.is_game_over:
+            self.waited += 1
+            if self.restart_frames is not None and self.waited >= self.restart_frames:
+                self.waited = 0
+                game.handle_event(self.space)
+            return
+        self.waited = 0
+        if self.decide(game):
+            game.handle_event(self.space)
+
+    def decide(self, game):
+        """True if the sheep should jump this frame"""
+        start = time.perf_counter()
+        hazards = self.predict(game)
+        expand = time.perf_counter()
+        if frame_clock.fixed_fps is None:
+            jump = self.search(game.sheep, hazards, deadline=start + self.budget)
+        else:
+            jump = self.search(game.sheep, hazards, max_nodes=self.budget_nodes)
+        end = time.perf_counter()
+        elapsed = end - start
+        self.searches += 1
+        self.search_time += elapsed
+        self.expand_time += end - expand
+        self.last_search_us = elapsed * 1e6
+        return jump
+
+    def predict(self, game):
+        """Vertical extents of the hitboxes level with the sheep, for each frame ahead
+
+        Entry t - 1 lists (top, bottom) for frame t after this one, when
+        the world has scrolled t more times at the rising game speed.
+        """
+        world = game.world
+        n = world.size
+        rows = np.flatnonzero(world.hit_w[:n] > 0)
+        if not len(rows):
+            return [()] * self.horizon
+        frames = np.arange(1, self.horizon + 1)
+        speeds = np.minimum(game.game_speed + frames * SPEED_INCREMENT, MAX_GAME_SPEED)
+        distance = np.cumsum(speeds)[:, None]
+        if frame_clock.fixed_fps is None:
+            ticks = frame_clock.ticks + frames * 1000 / 60
+        else:
+            ticks = (frame_clock.frame + frames) * 1000 // frame_clock.fixed_fps
+        # The same arithmetic as ecs.move, animate and sync_hitboxes
+        x = world.x[rows] - distance * world.scroll[rows]
+        rate = world.rate[rows]
+        index = (ticks[:, None] * rate).astype(np.int64) & ecs.TABLE_MASK
+        offset = np.where(rate != 0, ecs.SINE_TABLE[index] * world.amount[rows],
+                          world.offset[rows])
+        hit_x = x.astype(np.int32) + world.hit_dx[rows]
+        hit_y = (world.y[rows] + offset).astype(np.int32) + world.hit_dy[rows]
+        hit_w = world.hit_w[rows]
+        hit_h = world.hit_h[rows]
+
+        # The sheep never moves sideways, so which hitboxes it can touch on
+        # each frame doesn't depend on the line being searched
+        rect = game.sheep.rect
+        level = (hit_x < rect.right) & (rect.x < hit_x + hit_w)
+        hazards = [[] for _ in range(self.horizon)]
+        for t, column in zip(*np.nonzero(level)):
+            top = int(hit_y[t, column])
+            hazards[t].append((top, top + int(hit_h[column])))
+        return hazards
+
+    def search(self, sheep, hazards, deadline=None, max_nodes=None):
+        """Depth-first search over the lines, returns whether the first one jumps
+
+        Past the perf_counter() deadline, or max_nodes, it returns the first
+        move of the line that lasted longest so far, counting the one being
+        simulated.
+        """
+        sim = self.sheep
+        height = sheep.rect.height
+        horizon = self.horizon
+        decision = self.decision_frames
+        best_frames, best_jump = -1, False
+        nodes = 0
+        # Jump branches still to search as (frame, y, velocity, jumping,
+        # jumps left, first move), the line from the top of the loop
+        # always waits first
+        state = (0, sheep.y, sheep.velocity_y, sheep.is_jumping, sheep.jumps_left)
+        pending = [(*state, True)] if sheep.jumps_left else []
+        line = (*state, False)
+        jump_now = False
+        while True:
+            t, sim.y, sim.velocity_y, sim.is_jumping, sim.jumps_left, first = line
+            if jump_now:
+                sim.jump()
+            while True:
+                sim.update()
+                t += 1
+                nodes += 1
+                top = int(sim.y)
+                if any(top < bottom and hit_top < top + height
+                       for hit_top, bottom in hazards[t - 1]):
+                    if t > best_frames:
+                        best_frames, best_jump = t, first
+                    break
+                if t == horizon:
+                    self._count(nodes, cut_short=False)
+                    return first
+                if t % decision == 0 and sim.jumps_left:
+                    pending.append((t, sim.y, sim.velocity_y, sim.is_jumping,
+                                    sim.jumps_left, first))
+                if nodes % BUDGET_CHECK_NODES == 0 and (
+                        nodes >= max_nodes if deadline is None else time.perf_counter() > deadline):
+                    self._count(nodes, cut_short=True)
+                    return first if t > best_frames else best_jump
+            if not pending:
+                self.unavoidable += 1
+                break
+            line = pending.pop()
+            jump_now = True
+        self._count(nodes, cut_short=False)
+        return best_jump
+
+    def _count(self, nodes, cut_short):
+        self.nodes += nodes
+        self.cut_short += cut_short
+
+    def stats(self):
+        """Totals for the instrumentation overlay and the benchmark"""
+        return {
+            'autopilot_searches': self.searches,
+            'autopilot_knodes_per_s': round(self.nodes / self.expand_time / 1000, 1)
+            if self.expand_time else 0.0,
+            'autopilot_nodes_per_search': round(self.nodes / self.searches, 1)
+            if self.searches else 0.0,
+            'autopilot_us': round(self.last_search_us, 1),
+            'autopilot_cut_short': self.cut_short,
+            'autopilot_unavoidable': self.unavoidable,
+        }
+
+
+def autoplayed_game(seed=3, warmup=600, headless=False):
+    """An offscreen game and the autopilot playing it, for benchmarks
+
+    The game is seeded and clocked the way a recording is, eagles and
+    clouds included, so every run plays the same game. The autopilot has
+    played the first warmup frames of it already.
+
+    Returns:
+        (GameManager, Autopilot)
+    """
+    import os
+    import random
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from ..game_manager import GameManager
+    from .constants import SCREEN_WIDTH, SCREEN_HEIGHT
+
+    pygame.init()
+    random.seed(seed)
+    frame_clock.use_fixed_rate()
+    game = GameManager(pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)), headless=headless,
+                       audio=False, seed=seed)
+    autopilot = Autopilot(restart_frames=1)
+    for _ in range(warmup):
+        autopilot.tick(game)
+        game.update()
+    return game, autopilot
+
+
+def benchmark(seeds=(1, 2, 3, 4, 5), frames=6000):
+    """Let the autopilot play headless games and report how it does
+
+    Doubles as a soak test: every seed is played for a number of frames,
+    restarting after each death. The clock runs at a fixed rate, so the
+    search has a node budget and the deaths and scores of a seed are the
+    same on every run and machine, only the timings vary.
+    """
+    print("seed  deaths  best score  search us (mean / max)  nodes per search  knodes/s  cut short")
+    for seed in seeds:
+        game, autopilot = autoplayed_game(seed, warmup=0, headless=True)
+        deaths = best = 0
+        longest = 0.0
+        for _ in range(frames):
+            autopilot.tick(game)
+            was_over = game.is_game_over
+            game.update()
+            if game.is_game_over and not was_over:
+                deaths += 1
+                best = max(best, game.score)
+            if not game.is_game_over:
+                best = max(best, game.score)
+            longest = max(longest, autopilot.last_search_us)
+        stats = autopilot.stats()
+        mean = autopilot.search_time / max(1, autopilot.searches) * 1e6
+        print(f"{seed:4d}  {deaths:6d}  {best:10d}  {mean:10.1f} / {longest:7.1f}  "
+              f"{stats['autopilot_nodes_per_search']:16.1f}  {stats['autopilot_knodes_per_s']:8.1f}  "
+              f"{stats['autopilot_cut_short']:9d}")
+
+
+if __name__ == "__main__":
+    benchmark()
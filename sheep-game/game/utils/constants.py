@@ -1,5 +1,3 @@
-import pygame
-
 # Screen settings
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 400
@@ -43,6 +41,9 @@ MAX_GAME_SPEED = 8.0  # Keep max speed as per user preference
 SPEED_INCREMENT = 0.0002  # Keep gradual increase as per user preference
 SPEED_MILESTONE = 1000  # Keep milestone spacing as per user preference
 MIN_OBSTACLE_DISTANCE = 300  # Minimum distance between obstacles
+EAGLE_MIN_CHANCE = 0.005  # Eagle spawn chance per frame at the start of a run
+EAGLE_MAX_CHANCE = 0.02  # Caps at 2% per frame
+EAGLE_RAMP_DISTANCE = 15000  # Distance scrolled before the chance reaches the cap
 
 # Jump constants
 JUMP_SPEED = -13  # Stronger initial jump to compensate for gravity
@@ -50,6 +51,7 @@ DOUBLE_JUMP_MULTIPLIER = 1.0  # Full power for second jump
 MAX_OBSTACLE_HEIGHT = 45  # Reduced height for easier jumping
 MAX_FALL_SPEED = 4  # Increased fall speed
 FLOAT_THRESHOLD = 0.3  # Point at which to start floating effect
+JUMP_BUFFER_FRAMES = 6  # A jump pressed this many frames before landing still happens
 
 # Visual constants
 GROUND_THICKNESS = 20
@@ -0,0 +1,192 @@
+import math
+import random
+from collections import deque, namedtuple
+from .constants import (
+    GROUND_Y, SCREEN_WIDTH, INITIAL_GAME_SPEED, MAX_GAME_SPEED, SPEED_INCREMENT,
+    MIN_OBSTACLE_DISTANCE, EAGLE_MIN_CHANCE, EAGLE_MAX_CHANCE, EAGLE_RAMP_DISTANCE
+)
+
+# Placements are positioned in world distance, the distance the ground has
+# scrolled plus the screen width. A placement spawns at the right edge of the
+# screen once the game has scrolled far enough for it to come into view.
+Placement = namedtuple('Placement', 'kind distance height is_double y')
+
+CHUNK_LENGTH = SCREEN_WIDTH // 4  # World distance generated per chunk, small enough to stay cheap
+LOOKAHEAD = 2 * SCREEN_WIDTH  # How far past the right edge the buffer reaches
+EAGLE_MAX_BOB = 3.0  # Largest bob amount entities.eagle.spawn can roll
+EAGLE_SCROLL = 1.2  # entities.eagle.SCROLL, eagles fly faster than the ground scrolls
+EAGLE_WIDTH = 32  # entities.eagle.WIDTH
+EAGLE_MIN_SCORE = 100  # Score from which eagles are generated
+MAX_EAGLES = 2  # Eagles on screen at once
+
+
+def speed_at(distance):
+    """Game speed after scrolling distance pixels from the start of a run"""
+    # The speed grows by SPEED_INCREMENT per frame, so v^2 = v0^2 + 2 * a * d
+    return min(math.sqrt(INITIAL_GAME_SPEED ** 2 + 2 * SPEED_INCREMENT * max(distance, 0)),
+               MAX_GAME_SPEED)
+
+
+class CourseGenerator:
+    """Seeded, chunked generator of upcoming obstacles and eagles
+
+    Every placement is checked against the jump table when it is generated,
+    so the course is always clearable and the same seed always produces the
+    same course. Generated placements wait in a lookahead buffer that bots and
+    validators can inspect with upcoming(), and every one of them spawns.
+
+    Eagles are only kept once allow_eagles() was called, when the score
+    reached EAGLE_MIN_SCORE, and while fewer than MAX_EAGLES earlier ones
+    can still be on screen. Eagles that are left out still draw from the
+    generator's random numbers, so the obstacles of a seed don't depend on
+    how it was played.
+    """
+
+    def __init__(self, jump_table, seed=None, width=SCREEN_WIDTH):
+        self.jump_table = jump_table
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.width = width
+        self.generated_to = 0  # Placements up to this distance are in the buffer
+        self.last_obstacle = None  # Most recently generated obstacle placement
+        self.ahead = []  # Obstacles generated past generated_to, not yet buffered
+        self.recent = deque(maxlen=4)  # Buffered obstacles eagles are checked against
+        self.next_eagle = self.width + self.eagle_gap(0)
+        self.eagles_allowed = False  # Whether the score is high enough for eagles
+        self.eagle_exits = deque()  # Distance each kept eagle is off screen by, at the latest
+        self.buffer = deque()
+        self.chunks = self.generate_chunks()
+
+    def generate_chunks(self):
+        """Endless stream of placement chunks"""
+        # All state lives on self, so a restored generator just starts a new stream
+        while True:
+            yield self.generate_chunk()
+
+    def generate_chunk(self):
+        end = self.generated_to + CHUNK_LENGTH
+
+        # Obstacles run a screen ahead of eagles so each eagle can be checked
+        # against every obstacle it could meet
+        while self.last_obstacle is None or self.last_obstacle.distance < end + self.width:
+            self.last_obstacle = self.make_obstacle()
+            self.ahead.append(self.last_obstacle)
+
+        chunk = [o for o in self.ahead if o.distance <= end]
+        self.ahead = [o for o in self.ahead if o.distance > end]
+
+        while self.next_eagle <= end:
+            eagle = self.make_eagle(self.next_eagle, chunk)
+            if eagle is not None and self.keep_eagle(eagle):
+                chunk.append(eagle)
+            self.next_eagle += self.eagle_gap(self.next_eagle)
+
+        self.recent.extend(o for o in chunk if o.kind == 'obstacle')
+        self.generated_to = end
+        chunk.sort(key=lambda p: p.distance)
+        return chunk
+
+    def make_obstacle(self):
+        """Generate the next obstacle behind the last one"""
+        height = self.rng.randint(30, 50)
+        is_double = self.rng.random() < 0.3  # Sometimes create a double hurdle
+        width = 40 if is_double else 20
+
+        if self.last_obstacle is None:
+            return Placement('obstacle', self.width, height, is_double, GROUND_Y - height)
+
+        last = self.last_obstacle
+        last_width = 40 if last.is_double else 20
+        distance = last.distance + last_width + MIN_OBSTACLE_DISTANCE
+        speed = speed_at(distance - self.width)
+
+        # Fall back to a single hurdle if the double one can't be cleared at this speed
+        if not self.jump_table.can_clear(height, width, speed):
+            is_double = False
+            width = 20
+
+        # Push the obstacle back until the sheep can land and jump again in between
+        needed = self.jump_table.min_gap(last.height, last_width, height, width, speed)
+        if needed is not None and not self.jump_table.gap_clearable(
+                last.height, last_width, height, width, MIN_OBSTACLE_DISTANCE, speed):
+            distance = last.distance + last_width + needed
+        return Placement('obstacle', distance, height, is_double, GROUND_Y - height)
+
+    def make_eagle(self, distance, chunk):
+        """Generate an eagle, or None if it would block the only way over an obstacle"""
+        y = self.rng.randint(GROUND_Y - 150, GROUND_Y - 70)
+        scrolled = distance - self.width
+        speed = speed_at(scrolled)
+        eagle = self.eagle_constraint(self.width, y, speed)
+        # Obstacles further away than one jump get a jump of their own
+        airtime = max(len(t) for t in self.jump_table.trajectories)
+
+        for obstacle in list(self.recent) + chunk + self.ahead:
+            if obstacle.kind != 'obstacle':
+                continue
+            constraint = self.obstacle_constraint(obstacle, obstacle.distance - scrolled, speed)
+            if (constraint is None or constraint[0] > eagle[1] + airtime or
+                    constraint[1] < eagle[0] - airtime):
+                continue
+            if self.jump_table.find_jump([constraint, eagle]) is None:
+                return None
+        return Placement('eagle', distance, 0, False, y)
+
+    def allow_eagles(self):
+        """Keep the eagles generated from now on, once the score reached EAGLE_MIN_SCORE"""
+        self.eagles_allowed = True
+
+    def keep_eagle(self, eagle):
+        """Whether an eagle is allowed and fits under MAX_EAGLES, remembers it if so"""
+        if not self.eagles_allowed:
+            return False
+        # An eagle spawns at the right edge within a frame of scrolling
+        # distance - width, and is culled once it flew its width past the
+        # left edge, at least a frame later than that here
+        spawned = eagle.distance - self.width
+        while self.eagle_exits and self.eagle_exits[0] <= spawned:
+            self.eagle_exits.popleft()
+        if len(self.eagle_exits) >= MAX_EAGLES:
+            return False
+        self.eagle_exits.append(spawned + (self.width + EAGLE_WIDTH) / EAGLE_SCROLL +
+                                2 * MAX_GAME_SPEED)
+        return True
+
+    def eagle_gap(self, distance):
+        """Distance until the next eagle, from the spawn chance at this distance"""
+        ramp = min(max(distance - self.width, 0) / EAGLE_RAMP_DISTANCE, 1.0)
+        chance = EAGLE_MIN_CHANCE + (EAGLE_MAX_CHANCE - EAGLE_MIN_CHANCE) * ramp
+        # Frames until a per-frame chance would have hit, drawn in one go
+        frames = int(math.log(1.0 - self.rng.random()) / math.log(1.0 - chance)) + 1
+        return frames * speed_at(distance - self.width)
+
+    def obstacle_constraint(self, obstacle, left, speed):
+        """Jump-table constraint for an obstacle whose left edge is at screen x left"""
+        width = 40 if obstacle.is_double else 20
+        first, last = self.jump_table.overlap_window(left, width, speed)
+        if last < 0:
+            return None  # Already behind the sheep
+        low, high = self.jump_table.band_for(obstacle.y, GROUND_Y)
+        return first, last, low, high
+
+    def eagle_constraint(self, x, y, speed):
+        """Jump-table constraint for an eagle spawned at screen x, including its bobbing"""
+        first, last = self.jump_table.overlap_window(x + 5, 22, speed * EAGLE_SCROLL)
+        bob = math.ceil(EAGLE_MAX_BOB) + 1
+        top = y + 3 - bob
+        low, high = self.jump_table.band_for(top, top + 17 + 2 * bob)
+        return first, last, low, high
+
+    def due(self, scrolled):
+        """Pop every placement that has reached the right edge of the screen"""
+        edge = scrolled + self.width
+        while self.generated_to < edge + LOOKAHEAD:
+            self.buffer.extend(next(self.chunks))
+        placements = []
+        while self.buffer and self.buffer[0].distance <= edge:
+            placements.append(self.buffer.popleft())
+        return placements
+
+    def upcoming(self):
+        """Placements generated but not spawned yet, nearest first"""
+        return list(self.buffer) + self.ahead
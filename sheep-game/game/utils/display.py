@@ -0,0 +1,152 @@
+import pygame
+
+# SDL_BlendMode value for alpha blending textures
+BLENDMODE_BLEND = 1
+
+
+class SurfaceDisplay:
+    """Classic software display, everything is drawn onto the window surface"""
+
+    name = 'surface'
+    layered = False
+
+    def __init__(self, size, caption, fullscreen=False):
+        # SCALED lets SDL stretch the game resolution to the whole desktop
+        flags = pygame.SCALED | pygame.FULLSCREEN if fullscreen else 0
+        self.screen = pygame.display.set_mode(size, flags)
+        pygame.display.set_caption(caption)
+
+    def set_layer(self, name, surface):
+        """Layers are drawn by the game itself on this backend"""
+        pass
+
+    def present(self):
+        pygame.display.flip()
+
+
+class OffscreenDisplay:
+    """Display for a game drawn into a plain surface, for profiling without a window
+
+    present() copies the finished frame into a front buffer, the copy a
+    window flip makes on the surface backend.
+    """
+
+    name = 'offscreen'
+    layered = False
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.front = screen.copy()
+
+    def set_layer(self, name, surface):
+        """Layers are drawn by the game itself on this backend"""
+        pass
+
+    def present(self):
+        self.front.blit(self.screen, (0, 0))
+
+
+class ScaledDisplay:
+    """Software display that renders at the game resolution and scales once
+
+    The game draws into an offscreen surface of its own size, so drawing cost
+    doesn't depend on the window size. present() scales it into the window in
+    one step, keeping the aspect ratio and letterboxing the rest.
+    """
+
+    name = 'surface'
+    layered = False
+
+    def __init__(self, size, caption, window_size, smooth=False):
+        self.window = pygame.display.set_mode(window_size)
+        pygame.display.set_caption(caption)
+        self.window.fill((0, 0, 0))
+        self.screen = pygame.Surface(size).convert()  # Match the window format for fast scaling
+        self.smooth = smooth
+        
+        scale = min(window_size[0] / size[0], window_size[1] / size[1])
+        self.target_rect = pygame.Rect(0, 0, int(size[0] * scale), int(size[1] * scale))
+        self.target_rect.center = (window_size[0] // 2, window_size[1] // 2)
+        self.target = self.window.subsurface(self.target_rect)
+
+    def set_layer(self, name, surface):
+        """Layers are drawn by the game itself on this backend"""
+        pass
+
+    def present(self):
+        if self.smooth:
+            pygame.transform.smoothscale(self.screen, self.target_rect.size, self.target)
+        else:
+            pygame.transform.scale(self.screen, self.target_rect.size, self.target)
+        pygame.display.flip()
+
+
+class RendererDisplay:
+    """SDL2 Renderer display, cached layers live on the GPU as textures
+
+    The game still draws into self.screen, but that surface is transparent and
+    only holds the moving parts of the frame. present() uploads it to a
+    streaming texture and lets the renderer compose it over the cached layers.
+    """
+
+    name = 'sdl2'
+    layered = True
+
+    def __init__(self, size, caption, accelerated=-1, window_size=None, fullscreen=False):
+        from pygame._sdl2.video import Window, Renderer, Texture
+        self.texture_class = Texture
+        self.window = Window(caption, window_size or size, fullscreen_desktop=fullscreen)
+        try:
+            # accelerated=-1 lets SDL pick, 0 forces the software renderer
+            self.renderer = Renderer(self.window, accelerated=accelerated)
+        except Exception:
+            self.window.destroy()
+            raise
+        # The renderer scales the game resolution to the window when presenting
+        self.renderer.logical_size = size
+        self.screen = pygame.Surface(size, pygame.SRCALPHA)
+        self.frame_texture = Texture(self.renderer, size, depth=32, streaming=True)
+        self.frame_texture.blend_mode = BLENDMODE_BLEND
+        self.layers = {}
+
+    def set_layer(self, name, surface):
+        """Upload a cached layer, layers are drawn in the order they were added"""
+        self.layers[name] = self.texture_class.from_surface(self.renderer, surface)
+
+    def present(self):
+        self.renderer.clear()
+        for texture in self.layers.values():
+            texture.draw()
+        self.frame_texture.update(self.screen)
+        self.frame_texture.draw()
+        self.renderer.present()
+
+
+def window_size_for(size, render_scale):
+    """Window size that shows a size-pixel render at render_scale of the window"""
+    return (round(size[0] / render_scale), round(size[1] / render_scale))
+
+
+def create_display(renderer, size, caption, render_scale=1.0, fullscreen=False, smooth=False):
+    """Create the requested display backend, falling back to plain surfaces
+
+    Args:
+        renderer (str): 'surface', 'sdl2' (any SDL renderer) or 'sdl2-software'
+        size (tuple): Game (render) resolution in pixels
+        caption (str): Window title
+        render_scale (float): Render resolution as a fraction of the window,
+            0.5 renders at half the window size and upscales
+        fullscreen (bool): Fill the desktop, the render resolution is unchanged
+        smooth (bool): Filter when scaling instead of using nearest neighbour
+    """
+    window_size = window_size_for(size, render_scale)
+    if renderer in ('sdl2', 'sdl2-software'):
+        try:
+            return RendererDisplay(size, caption,
+                                   accelerated=0 if renderer == 'sdl2-software' else -1,
+                                   window_size=window_size, fullscreen=fullscreen)
+        except Exception as error:  # Missing pygame._sdl2 or no usable renderer
+            print(f"SDL2 renderer unavailable ({error}), using software surfaces")
+    if fullscreen or window_size == tuple(size):
+        return SurfaceDisplay(size, caption, fullscreen=fullscreen)
+    return ScaledDisplay(size, caption, window_size, smooth=smooth)
@@ -0,0 +1,63 @@
+from collections import namedtuple
+
+# Simulation events. Game logic only emits these, presentation (sounds,
+# particles, popups, telemetry) reacts to them once per frame.
+Jump = namedtuple('Jump', 'x y top is_double')  # x/y at the sheep's feet, top of the sheep
+Land = namedtuple('Land', 'x y')
+Run = namedtuple('Run', 'x y')  # Sheep running on the ground this frame
+Scored = namedtuple('Scored', 'points score milestone')
+Passed = namedtuple('Passed', 'kind points')  # 'obstacle' or 'eagle' left the screen
+Died = namedtuple('Died', 'cause score')  # cause is 'obstacle' or 'eagle'
+Click = namedtuple('Click', '')  # Menu/UI interaction
+
+
+class EventBus:
+    """Per-frame event queue drained in one batch by dispatch()"""
+
+    def __init__(self):
+        self.queue = []
+        self.handlers = {}
+        self.all_handlers = []
+
+    def subscribe(self, event_type, handler):
+        """Call handler(events) each frame with that frame's events of one type"""
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    def subscribe_all(self, handler):
+        """Call handler(events) each frame with every event, in emit order"""
+        self.all_handlers.append(handler)
+
+    def emit(self, event):
+        """Queue an event for the end of the frame"""
+        self.queue.append(event)
+
+    def dispatch(self):
+        """Hand this frame's events to the subscribers and clear the queue"""
+        if not self.queue:
+            return
+        events, self.queue = self.queue, []
+        for handler in self.all_handlers:
+            handler(events)
+        if self.handlers:
+            batches = {}
+            for event in events:
+                batches.setdefault(type(event), []).append(event)
+            for event_type, batch in batches.items():
+                for handler in self.handlers.get(event_type, ()):
+                    handler(batch)
+
+
+class NullEventBus:
+    """Event bus for headless runs, every event is dropped on emit"""
+
+    def subscribe(self, event_type, handler):
+        pass
+
+    def subscribe_all(self, handler):
+        pass
+
+    def emit(self, event):
+        pass
+
+    def dispatch(self):
+        pass
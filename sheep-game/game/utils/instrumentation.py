@@ -0,0 +1,59 @@
+from collections import deque
+import pygame
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a sequence, 0.0 when it is empty"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+    return ordered[index]
+
+
+class Instrumentation:
+    """Rolling frame timings and named gauges, with an optional overlay"""
+
+    def __init__(self, window=120):
+        self.frame_times = deque(maxlen=window)  # Milliseconds of work per frame
+        self.gauges = {}
+        self.visible = False
+        self.font = None
+
+    def record_frame(self, frame_ms):
+        """Record how long the last frame took to update, draw and present"""
+        self.frame_times.append(frame_ms)
+
+    def set(self, name, value):
+        """Set a gauge shown in the overlay and the summary"""
+        self.gauges[name] = value
+
+    def percentile(self, percent):
+        """Frame time percentile over the rolling window, in milliseconds"""
+        return percentile(self.frame_times, percent)
+
+    def summary(self):
+        """Frame time percentiles and all gauges as a dict"""
+        summary = {
+            'frame_ms_p50': round(self.percentile(50), 2),
+            'frame_ms_p95': round(self.percentile(95), 2),
+        }
+        summary.update(self.gauges)
+        return summary
+
+    def toggle(self):
+        """Show or hide the overlay"""
+        self.visible = not self.visible
+
+    def draw(self, screen):
+        """Draw the overlay in the top right corner if it is visible"""
+        if not self.visible:
+            return
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+        lines = [f"{name}: {value}" for name, value in self.summary().items()]
+        y = 10
+        for line in lines:
+            text = self.font.render(line, True, (255, 255, 255), (0, 0, 0))
+            screen.blit(text, (screen.get_width() - text.get_width() - 10, y))
+            y += text.get_height() + 2
@@ -0,0 +1,243 @@
+import math
+from ..entities.sheep import Sheep
+from .constants import GROUND_Y
+
+
+def _longer(run, other):
+    """True if run is longer than other, or as long and earlier"""
+    if run is None:
+        return False
+    if other is None:
+        return True
+    return (run[1] - run[0], -run[0]) > (other[1] - other[0], -other[0])
+
+
+def _min_known(a, b):
+    """Smaller of two values where None means unknown"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+
+class JumpTable:
+    """Precomputed sheep trajectories for answering "can this be cleared?" queries.
+
+    Every trajectory is stored as the sheep's lift (pixels between the bottom of
+    its hitbox and the ground) after each frame, starting with the frame on which
+    the jump key was pressed. Trajectory 0 is a single jump, trajectory k is a
+    jump followed by a double jump after k frames in the air.
+
+    Queries work in frames relative to "now" and on lift bands, so callers never
+    have to re-run the physics in `Sheep.update`.
+    """
+
+    def __init__(self, sheep_x=80):
+        # Use a throwaway sheep so the table always matches the real physics
+        self.sheep_x = sheep_x
+        sheep = Sheep(sheep_x)
+        sheep.update()
+        self.sheep_left = sheep.rect.left
+        self.sheep_right = sheep.rect.right
+        self.sheep_height = sheep.rect.height
+
+        self.trajectories = [self._simulate(None)]
+        airtime = len(self.trajectories[0])
+        for k in range(1, airtime - 1):
+            self.trajectories.append(self._simulate(k))
+
+        self.max_lift = max(max(t) for t in self.trajectories)
+
+        # Per trajectory, per height: longest run of frames with lift >= height
+        # and the first/last frame with lift > height
+        self.clear_runs = []
+        self.above_spans = []
+        for lifts in self.trajectories:
+            self.clear_runs.append([(0, len(lifts) - 1)] + self._longest_runs(lifts, self.max_lift + 1))
+            self.above_spans.append(self._above_spans(lifts, self.max_lift))
+
+        # Aggregates for the O(1) obstacle queries, indexed [height][frames]
+        self.max_clear_frames = [0] * (self.max_lift + 2)
+        self.rise_frames = []
+        self.recover_frames = []
+        for h in range(self.max_lift + 2):
+            # Best takeoff and landing margins among runs of exactly each length,
+            # then carried down so index n covers every run at least n long
+            rise = [None] * (airtime + 1)
+            recover = [None] * (airtime + 1)
+            for lifts, runs in zip(self.trajectories, self.clear_runs):
+                run = runs[h]
+                if run is None:
+                    continue
+                length = run[1] - run[0] + 1
+                self.max_clear_frames[h] = max(self.max_clear_frames[h], length)
+                n = min(length, airtime)
+                landing = len(lifts) - 1
+                if rise[n] is None or run[0] < rise[n]:
+                    rise[n] = run[0]
+                if recover[n] is None or landing - run[1] < recover[n]:
+                    recover[n] = landing - run[1]
+            for n in range(airtime - 1, 0, -1):
+                rise[n] = _min_known(rise[n], rise[n + 1])
+                recover[n] = _min_known(recover[n], recover[n + 1])
+            self.rise_frames.append(rise)
+            self.recover_frames.append(recover)
+
+    def _simulate(self, double_jump_frame):
+        """Record the lift of one jump until the sheep is back on the ground"""
+        sheep = Sheep(self.sheep_x)
+        ground_top = sheep.rect.y
+        lifts = []
+        sheep.jump()
+        while True:
+            if len(lifts) == double_jump_frame:
+                sheep.jump()
+            sheep.update()
+            lifts.append(ground_top - sheep.rect.y)
+            if not sheep.is_jumping:
+                return lifts
+
+    @staticmethod
+    def _longest_runs(lifts, top):
+        """Longest run of frames with lift >= h for every h in 1..top
+
+        Every run is the widest stretch around its lowest frame where nothing
+        is lower, so one pass with a stack finds all of them, instead of one
+        scan of the trajectory per height.
+        """
+        n = len(lifts)
+        left = [0] * n
+        stack = []
+        for i, lift in enumerate(lifts):
+            while stack and lifts[stack[-1]] >= lift:
+                stack.pop()
+            left[i] = stack[-1] + 1 if stack else 0
+            stack.append(i)
+        right = [n - 1] * n
+        stack = []
+        for i in range(n - 1, -1, -1):
+            while stack and lifts[stack[-1]] >= lifts[i]:
+                stack.pop()
+            right[i] = stack[-1] - 1 if stack else n - 1
+            stack.append(i)
+
+        # Runs keyed by the height of their lowest frame, the earliest wins ties
+        best = [None] * (top + 2)
+        for i, lift in enumerate(lifts):
+            h = min(lift, top)
+            if h >= 1 and _longer((left[i], right[i]), best[h]):
+                best[h] = (left[i], right[i])
+        # A run at least h + 1 high also counts for h
+        for h in range(top - 1, 0, -1):
+            if _longer(best[h + 1], best[h]):
+                best[h] = best[h + 1]
+        return best[1:top + 1]
+
+    @staticmethod
+    def _above_spans(lifts, top):
+        """First and last frame with lift > c for every c in 0..top"""
+        first = [None] * (top + 1)
+        highest = 0
+        for i, lift in enumerate(lifts):
+            for c in range(highest, min(lift, top + 1)):
+                first[c] = i
+            highest = max(highest, lift)
+        last = [None] * (top + 1)
+        highest = 0
+        for i in range(len(lifts) - 1, -1, -1):
+            for c in range(highest, min(lifts[i], top + 1)):
+                last[c] = i
+            highest = max(highest, lifts[i])
+        return [(f, l) if f is not None else None for f, l in zip(first, last)]
+
+    def overlap_window(self, left, width, speed):
+        """Frames (first, last) during which a hitbox moving left overlaps the sheep"""
+        if speed <= 0:
+            return None
+        first = max(0, math.floor((left - self.sheep_right) / speed))
+        last = math.ceil((left + width - self.sheep_left) / speed)
+        return first, last
+
+    def frames_over(self, width, speed):
+        """Number of frames an obstacle of this width spends over the sheep"""
+        return math.ceil((width + self.sheep_right - self.sheep_left) / speed) + 1
+
+    def band_for(self, top, bottom):
+        """Lift band (low, high) that collides with a hitbox spanning top..bottom"""
+        return GROUND_Y - self.sheep_height - bottom, GROUND_Y - top
+
+    def can_clear(self, height, width, speed):
+        """True if some jump keeps the sheep above an obstacle for its whole pass"""
+        if height > self.max_lift:
+            return False
+        return self.frames_over(width, speed) <= self.max_clear_frames[max(height, 0)]
+
+    def min_gap(self, height_a, width_a, height_b, width_b, speed):
+        """Smallest edge-to-edge distance that lets two jumps clear both obstacles
+
+        Returns None if either obstacle cannot be cleared on its own.
+        """
+        if not (self.can_clear(height_a, width_a, speed) and
+                self.can_clear(height_b, width_b, speed)):
+            return None
+        recover = self.recover_frames[max(height_a, 0)][self.frames_over(width_a, speed)]
+        rise = self.rise_frames[max(height_b, 0)][self.frames_over(width_b, speed)]
+        # One extra frame of margin for the speed increase while they approach
+        return (recover + rise + 2) * speed + self.sheep_right - self.sheep_left
+
+    def gap_clearable(self, height_a, width_a, height_b, width_b, gap, speed):
+        """True if obstacles gap pixels apart can both be cleared"""
+        needed = self.min_gap(height_a, width_a, height_b, width_b, speed)
+        if needed is None:
+            return False
+        if gap >= needed:
+            return True
+        # Otherwise both have to fit under a single (double) jump
+        frames = self.frames_over(width_a + gap + width_b, speed)
+        return frames <= self.max_clear_frames[min(max(height_a, height_b, 0), self.max_lift + 1)]
+
+    def _fits(self, trajectory, takeoff, constraint):
+        first, last, low, high = constraint
+        # Keeping the lift at or below low for the whole window
+        if low >= 0:
+            span = self.above_spans[trajectory][low] if low <= self.max_lift else None
+            if span is None or last < takeoff + span[0] or first > takeoff + span[1]:
+                return True
+        # Keeping the lift at or above high for the whole window
+        if high <= 0:
+            return True
+        if high > self.max_lift:
+            return False
+        run = self.clear_runs[trajectory][high]
+        return run is not None and takeoff + run[0] <= first and last <= takeoff + run[1]
+
+    def find_jump(self, constraints, horizon=None):
+        """Find a jump that satisfies every constraint
+
+        Args:
+            constraints (list): (first_frame, last_frame, low, high) tuples; during
+                those frames the lift must stay <= low or >= high
+            horizon (int, optional): Latest takeoff frame to consider
+
+        Returns:
+            None if no single jump works, (None, None) if staying on the ground
+            works, otherwise (takeoff_frame, trajectory_index)
+        """
+        if all(low >= 0 for _, _, low, _ in constraints):
+            return None, None
+        if horizon is None:
+            horizon = max([c[0] for c in constraints] + [0])
+        # A jump can't keep the sheep up for longer than the longest trajectory
+        longest = max(len(t) for t in self.trajectories)
+        earliest = max([last - longest for _, last, low, _ in constraints if low < 0] + [0])
+        for takeoff in range(earliest, horizon + 1):
+            for trajectory in range(len(self.trajectories)):
+                if all(self._fits(trajectory, takeoff, c) for c in constraints):
+                    return takeoff, trajectory
+        return None
+
+    def lift_at(self, trajectory, frame):
+        """Lift of a trajectory frame frames after takeoff (0 once landed)"""
+        lifts = self.trajectories[trajectory]
+        return lifts[frame] if 0 <= frame < len(lifts) else 0
@@ -0,0 +1,85 @@
+import time
+from collections import deque
+from .instrumentation import percentile
+
+
+class LatencyTracker:
+    """Time from an input reaching the game to the frame showing its effect
+
+    Pygame events carry no timestamp, so inputs are stamped when the loop
+    polls for them and measured to the end of present() for that frame. An
+    input can have arrived any time since the previous poll, so the gap
+    between polls is kept as well; adding it gives the worst case, which is
+    what a press made just after a poll (during the frame cap sleep) sees.
+
+    A jump pressed just before landing is buffered and only happens on the
+    landing frame, a few frames later. Its stamp is kept until then, and
+    it is measured from that press to the present() of the landing frame.
+    """
+
+    def __init__(self, window=240):
+        self.samples = deque(maxlen=window)  # Poll to present, in milliseconds
+        self.worst = deque(maxlen=window)  # The same plus the gap since the previous poll
+        self.poll_time = None
+        self.poll_gap = 0.0
+        self.pending = 0  # Inputs handled this frame, not presented yet
+        self.count = 0  # Inputs measured in total
+        self.buffered = None  # (poll time, poll gap) of the press waiting in the jump buffer
+        self.fired = []  # Stamps of buffered presses that took effect this frame
+        self.buffered_samples = deque(maxlen=window)  # Press to present of buffered jumps
+
+    def poll(self):
+        """Call right before pygame.event.get()"""
+        now = time.perf_counter()
+        self.poll_gap = now - self.poll_time if self.poll_time is not None else 0.0
+        self.poll_time = now
+
+    def input(self):
+        """An input polled this frame changed what will be drawn"""
+        self.pending += 1
+
+    def buffer(self):
+        """An input polled this frame was buffered, it takes effect on a later frame"""
+        if self.poll_time is not None:
+            self.buffered = (self.poll_time, self.poll_gap)
+
+    def fire_buffered(self):
+        """The buffered input took effect this frame"""
+        if self.buffered is not None:
+            self.fired.append(self.buffered)
+            self.buffered = None
+
+    def drop_buffered(self):
+        """The buffered input expired without taking effect"""
+        self.buffered = None
+
+    def presented(self):
+        """Call right after the frame is presented, returns True if anything was measured"""
+        if not (self.pending or self.fired) or self.poll_time is None:
+            self.pending = 0
+            self.fired.clear()
+            return False
+        now = time.perf_counter()
+        latency = (now - self.poll_time) * 1000
+        for _ in range(self.pending):
+            self.samples.append(latency)
+            self.worst.append(latency + self.poll_gap * 1000)
+        for poll_time, poll_gap in self.fired:
+            latency = (now - poll_time) * 1000
+            self.samples.append(latency)
+            self.worst.append(latency + poll_gap * 1000)
+            self.buffered_samples.append(latency)
+        self.count += self.pending + len(self.fired)
+        self.pending = 0
+        self.fired.clear()
+        return True
+
+    def summary(self):
+        """Latency percentiles over the rolling window, in milliseconds"""
+        return {
+            'input_ms_p50': round(percentile(self.samples, 50), 2),
+            'input_ms_p95': round(percentile(self.samples, 95), 2),
+            'input_ms_p99': round(percentile(self.samples, 99), 2),
+            'input_ms_worst_p95': round(percentile(self.worst, 95), 2),
+            'input_ms_buffered_p95': round(percentile(self.buffered_samples, 95), 2),
+        }
@@ -0,0 +1,236 @@
+import bisect
+import heapq
+import os
+import struct
+import threading
+import time
+from array import array
+
+# Bump whenever the layout below changes
+LEADERBOARD_MAGIC = b'SHLB'
+LEADERBOARD_VERSION = 1
+
+# Top entry count and score count, then the top entries and all scores sorted
+HEADER = struct.Struct('<4sHHI')
+TOP_ENTRY = struct.Struct('<id')  # score, unix time it was set
+TOP_K = 10
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'savedata', 'leaderboard.dat')
+
+
+class Leaderboard:
+    """Persistent scores with a top-K table and a sorted index for ranks
+
+    Every score is kept in one sorted array, so a rank is a binary search no
+    matter how many scores there are. The best top_k also keep the time they
+    were set, in a min-heap so a new score only has to beat the smallest.
+    Nothing is read from disk until the leaderboard is first used, or
+    preload() has a background thread read it.
+
+    Scores added during a session wait in a short sorted list, so adding one
+    never moves the big array. save() merges them in and writes the file.
+    save_later() does the same on the background thread, so the game loop
+    never waits on the disk.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, top_k=TOP_K):
+        self.path = path
+        self.top_k = top_k
+        self.loaded = False
+        self.scores = array('i')  # Every saved score, ascending
+        self.recent = []  # Scores added since the last save, ascending
+        self.top = []  # Min-heap of (score, time) for the best top_k
+        self.lock = threading.Lock()  # Held while loading and swapping in merged scores
+        self.thread = None
+        self.wake = threading.Event()
+        self.dirty = False  # A save was asked for and not written yet
+        self.closing = False
+        self.save_errors = 0
+
+    def load(self):
+        """Read the file on first use
+
+        A file that can't be read or decoded is moved aside to PATH.bad and
+        the leaderboard starts empty, rather than failing the game over.
+        """
+        if self.loaded:
+            return
+        with self.lock:
+            if self.loaded:
+                return
+            try:
+                self._read()
+            except (OSError, struct.error, ValueError) as error:
+                self.scores = array('i')
+                self.top = []
+                print(f"Ignoring unreadable leaderboard {self.path}: {error}")
+                try:
+                    os.replace(self.path, self.path + '.bad')
+                except OSError:
+                    pass
+            self.loaded = True
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        magic, version, n_top, n_scores = HEADER.unpack_from(data)
+        if magic != LEADERBOARD_MAGIC or version != LEADERBOARD_VERSION:
+            raise ValueError("not a compatible leaderboard file")
+        size = HEADER.size + TOP_ENTRY.size * n_top + self.scores.itemsize * n_scores
+        if len(data) != size:
+            raise ValueError(f"{len(data)} bytes, the header says {size}")
+        offset = HEADER.size
+        top = list(TOP_ENTRY.iter_unpack(data[offset:offset + TOP_ENTRY.size * n_top]))
+        heapq.heapify(top)
+        offset += TOP_ENTRY.size * n_top
+        scores = array('i')
+        scores.frombytes(data[offset:])
+        self.top = top
+        self.scores = scores
+
+    def preload(self):
+        """Start reading the file on the background thread"""
+        self._start()
+
+    def add(self, score, when=None):
+        """Insert a score, returns its rank"""
+        self.load()
+        with self.lock:
+            bisect.insort(self.recent, score)
+            self._offer((score, when if when is not None else time.time()))
+        return self.rank(score)
+
+    def add_many(self, scores, when=None):
+        """Insert a batch of scores with a single sort, for simulation runs"""
+        self.load()
+        when = when if when is not None else time.time()
+        with self.lock:
+            self.scores = array('i', sorted(self.scores + array('i', scores)))
+            for score in heapq.nlargest(self.top_k, scores):
+                self._offer((score, when))
+
+    def _offer(self, entry):
+        if len(self.top) < self.top_k:
+            heapq.heappush(self.top, entry)
+        elif entry[0] > self.top[0][0]:
+            heapq.heapreplace(self.top, entry)
+
+    def rank(self, score):
+        """1 + the number of scores strictly better than score"""
+        self.load()
+        with self.lock:
+            return (len(self.scores) - bisect.bisect_right(self.scores, score)
+                    + len(self.recent) - bisect.bisect_right(self.recent, score) + 1)
+
+    def __len__(self):
+        self.load()
+        with self.lock:
+            return len(self.scores) + len(self.recent)
+
+    def best(self):
+        """Top entries as (score, time), best first"""
+        self.load()
+        with self.lock:
+            return sorted(self.top, reverse=True)
+
+    def save(self):
+        """Write to a temporary file and rename it over the old one
+
+        The rename is atomic, so a crash leaves either the old or the new
+        leaderboard on disk, never a half-written one.
+        """
+        self.load()
+        with self.lock:
+            scores, recent, top = self.scores, list(self.recent), list(self.top)
+        merged = array('i', scores)
+        for score in recent:
+            bisect.insort(merged, score)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(HEADER.pack(LEADERBOARD_MAGIC, LEADERBOARD_VERSION,
+                                len(top), len(merged)))
+            for entry in top:
+                f.write(TOP_ENTRY.pack(*entry))
+            f.write(merged.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        with self.lock:
+            # Scores added while writing stay in recent for the next save
+            self.scores = merged
+            for score in recent:
+                del self.recent[bisect.bisect_left(self.recent, score)]
+
+    def save_later(self):
+        """Have the background thread save, errors are reported instead of raised"""
+        self.dirty = True
+        self._start()
+        self.wake.set()
+
+    def close(self):
+        """Finish any save still waiting and stop the background thread"""
+        if self.thread is None or self.closing:
+            return
+        self.closing = True
+        self.wake.set()
+        self.thread.join()
+
+    def _start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name='leaderboard', daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        self.load()
+        while True:
+            self.wake.wait()
+            self.wake.clear()
+            closing = self.closing  # Read before saving so a last request isn't missed
+            if self.dirty:
+                self.dirty = False
+                try:
+                    self.save()
+                except OSError as error:
+                    self.save_errors += 1
+                    print(f"Could not save the leaderboard to {self.path}: {error}")
+            if closing:
+                break
+
+
+def benchmark(path='benchmark_leaderboard.dat', count=1_000_000, lookups=100_000):
+    """Fill a leaderboard with simulated scores, then time the game-over path"""
+    import random
+    board = Leaderboard(path)
+    board.add_many([int(random.expovariate(1 / 150)) for _ in range(count)])
+    board.save()
+
+    start = time.perf_counter()
+    board = Leaderboard(path)
+    board.load()
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(lookups):
+        board.rank(random.randrange(1000))
+    rank_time = (time.perf_counter() - start) / lookups
+
+    start = time.perf_counter()
+    rank = board.add(420)
+    game_over_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    board.save()
+    save_time = time.perf_counter() - start
+
+    os.remove(path)
+    print(f"Loaded {len(board)} scores in {load_time * 1000:.1f} ms")
+    print(f"Rank lookup: {rank_time * 1e6:.2f} us")
+    print(f"Insert and rank at game over: {game_over_time * 1e6:.1f} us (420 ranks #{rank} of {len(board)})")
+    print(f"Save, on the background thread in game: {save_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
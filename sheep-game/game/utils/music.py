@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import deque
+import pygame
+
+# The progression loops every len(CHORDS) bars: I - V - vi - IV in C
+CHORDS = ((0, 4, 7), (7, 11, 14), (9, 12, 16), (5, 9, 12))
+BEATS_PER_BAR = 4
+NOTES_PER_BEAT = 4  # Arpeggio sixteenths
+BASE_FREQUENCY = 261.63  # C4, chord tones are semitones above it
+
+BASE_TEMPO = 112  # Beats per minute at the initial game speed
+MAX_TEMPO = 160
+FADE_SECONDS = 0.004  # Ramp at both ends of every chunk so they join without clicks
+
+
+class MusicStream:
+    """Procedural background music streamed to a reserved mixer channel
+
+    A background thread synthesizes one beat at a time with NumPy and keeps
+    at most `buffered` beats ready. update() runs on the game loop and
+    queues the next beat on the channel whenever its queue slot is free, so
+    only a couple of seconds of audio ever exist at once and a tempo change
+    is heard within `buffered` beats. A beat that isn't ready when the
+    channel runs dry is counted as an underrun.
+    """
+
+    def __init__(self, channel=0, buffered=3, volume=0.3):
+        import numpy
+        self.np = numpy
+        self.frequency, size, self.channels = pygame.mixer.get_init()
+        if size != -16:
+            raise ValueError("Music needs a signed 16-bit mixer")
+        pygame.mixer.set_reserved(channel + 1)  # Effects never play on our channel
+        self.channel = pygame.mixer.Channel(channel)
+        self.buffered = buffered
+        self.volume = volume
+        self.tempo = BASE_TEMPO  # Set from the game loop, read by the synth thread
+        self.ready = deque()  # Synthesized beats as bytes, at most buffered
+        self.wake = threading.Condition()
+        self.beat = 0  # Next beat to synthesize
+        self.paused = False
+        self.started = False
+        self.starving = False  # In an underrun, so one gap counts once
+        self.underruns = 0
+        self.played = 0  # Beats handed to the channel
+        self.synth_ms = 0.0  # Time spent synthesizing, in the background thread
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name='music', daemon=True)
+        self.thread.start()
+        pygame.register_quit(self.stop)
+
+    def run(self):
+        while True:
+            with self.wake:
+                while self.running and len(self.ready) >= self.buffered:
+                    self.wake.wait()
+                if not self.running:
+                    return
+            start = time.perf_counter()
+            data = self.synthesize(self.beat, self.tempo)
+            self.synth_ms += (time.perf_counter() - start) * 1000
+            self.beat += 1
+            with self.wake:
+                self.ready.append(data)
+
+    def synthesize(self, beat, tempo):
+        """PCM of one beat in the mixer's format"""
+        np = self.np
+        length = int(self.frequency * 60 / tempo)
+        t = np.arange(length) / self.frequency
+        chord = CHORDS[beat // BEATS_PER_BAR % len(CHORDS)]
+
+        # Bass: the chord root two octaves down, plucked on every beat
+        root = BASE_FREQUENCY * 2 ** (chord[0] / 12 - 2)
+        wave = 0.5 * np.sin(2 * np.pi * root * t) * np.exp(-t * 5)
+        # Kick on the first and third beat of the bar
+        if beat % 2 == 0:
+            wave += 0.6 * np.sin(2 * np.pi * 55 * t * np.exp(-t * 12)) * np.exp(-t * 18)
+
+        # Arpeggio: sixteenths walking up the chord an octave higher
+        step = length // NOTES_PER_BEAT
+        note_t = t[:step]
+        note_envelope = np.minimum(note_t / FADE_SECONDS, 1) * np.exp(-note_t * 14)
+        for i in range(NOTES_PER_BEAT):
+            note = chord[(beat * NOTES_PER_BEAT + i) % len(chord)]
+            pitch = BASE_FREQUENCY * 2 ** (note / 12 + 1)
+            phase = 2 * np.pi * pitch * note_t
+            # Odd harmonics for a soft square-ish lead
+            tone = np.sin(phase) + np.sin(3 * phase) / 3 + np.sin(5 * phase) / 5
+            wave[i * step:(i + 1) * step] += 0.18 * tone * note_envelope
+
+        fade = np.minimum(1, np.minimum(t, t[-1] - t) / FADE_SECONDS)
+        samples = (np.clip(wave * fade * self.volume, -1, 1) * 32767).astype(np.int16)
+        return np.repeat(samples, self.channels).tobytes()
+
+    def update(self, speed_scale=1.0):
+        """Call once per frame; speed_scale is the game speed over its initial value"""
+        self.tempo = min(BASE_TEMPO * speed_scale ** 0.5, MAX_TEMPO)
+        if self.paused or self.channel.get_queue() is not None:
+            return
+        with self.wake:
+            data = self.ready.popleft() if self.ready else None
+            self.wake.notify()
+        if data is None:
+            if self.started and not self.channel.get_busy() and not self.starving:
+                self.underruns += 1
+                self.starving = True
+            return
+        self.starving = False
+        sound = pygame.mixer.Sound(buffer=data)
+        if self.channel.get_busy():
+            self.channel.queue(sound)
+        else:
+            self.channel.play(sound)
+            self.started = True
+        self.played += 1
+
+    def pause(self):
+        self.paused = True
+        self.channel.pause()
+
+    def unpause(self):
+        self.paused = False
+        self.channel.unpause()
+
+    def stop(self):
+        """Stop the synth thread and the channel"""
+        with self.wake:
+            self.running = False
+            self.wake.notify()
+        self.thread.join()
+        if pygame.mixer.get_init():
+            self.channel.stop()
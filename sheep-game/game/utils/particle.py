@@ -5,6 +5,7 @@ from .constants import (
     DUST_COLORS, DUST_PARTICLE_LIFETIME, DUST_PARTICLE_SIZE,
     DUST_SPAWN_RATE, JUMP_PARTICLE_COUNT, GROUND_Y
 )
+from .render_queue import PARTICLES
 
 class Particle:
     def __init__(self, x, y, dx, dy, color, lifetime=DUST_PARTICLE_LIFETIME):
@@ -26,20 +27,24 @@ class Particle:
         self.alpha = max(0, self.alpha - self.alpha_decay)
         return self.lifetime > 0
 
-    def draw(self, screen):
-        if self.alpha > 0:
-            surface = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-            color = (*self.color[:3], int(self.alpha))
-            pygame.draw.circle(surface, color, (self.size, self.size), self.size)
-            screen.blit(surface, (int(self.x - self.size), int(self.y - self.size)))
+    def sprite(self, assets):
+        """The particle's dot at its current alpha, there are only a few of each"""
+        color = (*self.color[:3], int(self.alpha))
+        return assets.surface(('particle', self.size, color), lambda: self._render(color))
+
+    def _render(self, color):
+        surface = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
+        pygame.draw.circle(surface, color, (self.size, self.size), self.size)
+        return surface
 
 class ParticleSystem:
     def __init__(self):
         self.particles = []
+        self.spawn_rate = 1.0  # Scales how many particles get spawned, set by the quality tier
 
     def add_run_particles(self, x, y):
         """Add dust particles when running"""
-        if random.random() < 0.3:  # Only spawn particles sometimes
+        if random.random() < 0.3 * self.spawn_rate:  # Only spawn particles sometimes
             color = random.choice(DUST_COLORS)
             dx = random.uniform(-0.2, 0.2)  # Gentler movement
             dy = random.uniform(-0.3, 0)
@@ -56,6 +61,7 @@ class ParticleSystem:
             count (int, optional): Number of particles to spawn. If None, default count is used
         """
         particle_count = count if count is not None else JUMP_PARTICLE_COUNT
+        particle_count = int(particle_count * self.spawn_rate)
         
         for _ in range(particle_count):
             # Use provided color or random choice from dust colors
@@ -69,7 +75,7 @@ class ParticleSystem:
 
     def add_land_particles(self, x, y):
         """Add particles when landing"""
-        for _ in range(JUMP_PARTICLE_COUNT * 2):
+        for _ in range(int(JUMP_PARTICLE_COUNT * 2 * self.spawn_rate)):
             color = random.choice(DUST_COLORS)
             angle = random.uniform(-150, -30)  # Upward spread
             speed = random.uniform(1, 3)
@@ -81,6 +87,6 @@ class ParticleSystem:
     def update(self):
         self.particles = [p for p in self.particles if p.update()]
 
-    def draw(self, screen):
-        for particle in self.particles:
-            particle.draw(screen)
+    def draw(self, queue, assets):
+        queue.submit_all([(p.sprite(assets), (int(p.x - p.size), int(p.y - p.size)))
+                          for p in self.particles if p.alpha > 0], PARTICLES)
@@ -0,0 +1,176 @@
+"""Call-level profiles of a window of frames, from a live game or a replay
+
+    python main.py --profile prof/session --profile-start 300 --profile-frames 600
+    python main.py --profile prof/replay --profile-replay session.replay
+
+Three files are written when the window closes:
+
+- PREFIX.pstats: cProfile statistics, for pstats, snakeviz and friends
+- PREFIX.collapsed: stacks sampled every millisecond, one "a;b;c count"
+  line per distinct stack, the input flamegraph.pl, speedscope and
+  inferno take
+- PREFIX.trace.json: Chrome trace events with a span for every frame and
+  its input, update, draw and present phases, open it in chrome://tracing or
+  Perfetto
+
+The sampler is a thread reading the main thread's stack, so its samples
+include cProfile's own overhead, which weighs on code making many small
+calls. Compare with the pstats totals before chasing a thin frame.
+"""
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+SAMPLE_INTERVAL_MS = 1.0
+
+
+class SessionProfiler:
+    """Profiles frames start_frame to start_frame + frames of a loop
+
+    The loop calls frame() once per frame with the times its phases
+    ended, the profiler switches itself on and off around the window and
+    writes everything when it ends, or on close() if the loop stops first.
+    Create it right before the loop, a window from frame 0 starts at once.
+
+    Args:
+        prefix (str): Path the output files are named after
+        start_frame (int): Frames to let run before profiling, so startup
+            and warm up can be left out
+        frames (int): Frames to profile
+        sample_interval_ms (float): Time between stack samples
+    """
+
+    def __init__(self, prefix, start_frame=0, frames=600, sample_interval_ms=SAMPLE_INTERVAL_MS):
+        self.prefix = prefix
+        self.start_frame = start_frame
+        self.end_frame = start_frame + frames
+        self.sample_interval = sample_interval_ms / 1000
+        self.frame_count = 0
+        self.active = False
+        self.done = False
+        self.profile = cProfile.Profile()
+        self.stacks = Counter()  # Folded stack -> samples
+        self.labels = {}  # Code object -> its name in the folded stacks
+        self.events = []  # Chrome trace events
+        self.origin = 0.0  # perf_counter() at the start of the window
+        self.thread_id = threading.get_ident()  # The thread that is profiled
+        self.sampler = None
+        self.stop_sampling = threading.Event()
+        self.switch_interval = sys.getswitchinterval()
+        if start_frame == 0:
+            self.start()
+
+    def frame(self, start, update_start, update_end, draw_end, end):
+        """Record a frame's phases, as perf_counter() times, and move the window along
+
+        Input handling runs from start to update_start, present() from
+        draw_end to end.
+        """
+        if self.active:
+            self._span('frame', start, end)
+            if update_start > start:
+                self._span('input', start, update_start)
+            self._span('update', update_start, update_end)
+            self._span('draw', update_end, draw_end)
+            if end > draw_end:
+                self._span('present', draw_end, end)
+        self.frame_count += 1
+        if self.frame_count == self.start_frame and not self.done:
+            self.start()
+        elif self.frame_count == self.end_frame and self.active:
+            self.stop()
+
+    def start(self):
+        self.active = True
+        self.origin = time.perf_counter()
+        self.stop_sampling.clear()
+        # The sampler only runs when the game thread lets go of the GIL, by
+        # default every 5 ms, so samples would bunch up where it does
+        sys.setswitchinterval(self.sample_interval / 4)
+        self.sampler = threading.Thread(target=self._sample, name='profiler', daemon=True)
+        self.sampler.start()
+        self.profile.enable()
+
+    def stop(self):
+        """End the window and write the output files"""
+        self.profile.disable()
+        self.stop_sampling.set()
+        self.sampler.join()
+        sys.setswitchinterval(self.switch_interval)
+        self.active = False
+        self.done = True
+        self.write()
+
+    def close(self):
+        """Write what was profiled so far if the window is still open"""
+        if self.active:
+            self.stop()
+
+    def write(self):
+        directory = os.path.dirname(self.prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.profile.dump_stats(self.prefix + '.pstats')
+        with open(self.prefix + '.collapsed', 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(self.prefix + '.trace.json', 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f)
+        print(f"Profiled frames {self.start_frame}-{self.frame_count}: {self.prefix}.pstats, "
+              f".collapsed ({sum(self.stacks.values())} samples) and .trace.json")
+
+    def _span(self, name, start, end):
+        self.events.append({
+            'name': name, 'cat': 'frame', 'ph': 'X', 'pid': 1, 'tid': 1,
+            'ts': round((start - self.origin) * 1e6, 1), 'dur': round((end - start) * 1e6, 1),
+            'args': {'frame': self.frame_count},
+        })
+
+    def _sample(self):
+        """Sampler thread: fold the profiled thread's stack every interval"""
+        while not self.stop_sampling.wait(self.sample_interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                label = self.labels.get(code)
+                if label is None:
+                    label = self.labels[code] = (
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                names.append(label)
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+
+def profile_replay(path, prefix, start_frame=0, frames=600):
+    """Play a recording offscreen as fast as it goes and profile a window of it"""
+    import pygame
+    from ..replay_renderer import create_game
+    from .display import OffscreenDisplay
+    from .replay import Recording, apply_input
+
+    pygame.init()
+    recording = Recording.load(path)
+    game = create_game(recording)
+    display = OffscreenDisplay(game.screen)
+    inputs = recording.inputs_by_frame()
+    profiler = SessionProfiler(prefix, start_frame, frames)
+    for frame in range(recording.frames):
+        start = time.perf_counter()
+        for kind, value in inputs.get(frame, ()):
+            apply_input(game, kind, value)
+        update_start = time.perf_counter()
+        game.update()
+        update_end = time.perf_counter()
+        game.draw()
+        draw_end = time.perf_counter()
+        display.present()
+        profiler.frame(start, update_start, update_end, draw_end, time.perf_counter())
+        if profiler.done:
+            break
+    profiler.close()
@@ -0,0 +1,67 @@
+from collections import deque, namedtuple
+
+QualityTier = namedtuple('QualityTier', 'name ground_shadows grass particle_rate eagle_detail max_clouds')
+
+# Ordered from best looking to cheapest
+QUALITY_TIERS = [
+    QualityTier('high', ground_shadows=True, grass=True, particle_rate=1.0, eagle_detail=True, max_clouds=12),
+    QualityTier('medium', ground_shadows=False, grass=True, particle_rate=0.5, eagle_detail=True, max_clouds=6),
+    QualityTier('low', ground_shadows=False, grass=False, particle_rate=0.25, eagle_detail=False, max_clouds=3),
+    QualityTier('minimal', ground_shadows=False, grass=False, particle_rate=0.0, eagle_detail=False, max_clouds=1),
+]
+
+
+class QualityGovernor:
+    """Steps through quality tiers based on measured frame time
+
+    Drops a tier when the average frame time goes over budget and only climbs
+    back when the average stayed well under budget for a longer stretch, so it
+    doesn't flip back and forth around the threshold. Any window above that
+    restarts the stretch.
+    """
+
+    def __init__(self, budget_ms=1000 / 60, tiers=QUALITY_TIERS, window=30,
+                 downgrade_at=1.0, upgrade_at=0.6, downgrade_after=60, upgrade_after=300):
+        self.budget_ms = budget_ms
+        self.tiers = tiers
+        self.level = 0
+        self.samples = deque(maxlen=window)
+        self.downgrade_at = downgrade_at  # Fractions of the budget
+        self.upgrade_at = upgrade_at
+        self.downgrade_after = downgrade_after  # Frames to wait after a change
+        self.upgrade_after = upgrade_after  # Frames in a row under upgrade_at
+        self.frames_since_change = 0
+        self.good_frames = 0  # Frames in a row the average was under upgrade_at
+
+    @property
+    def tier(self):
+        return self.tiers[self.level]
+
+    def observe(self, frame_ms):
+        """Feed one frame time, returns True if the tier changed"""
+        self.samples.append(frame_ms)
+        self.frames_since_change += 1
+        if len(self.samples) < self.samples.maxlen:
+            return False
+
+        average = sum(self.samples) / len(self.samples)
+        if average < self.budget_ms * self.upgrade_at:
+            self.good_frames += 1
+        else:
+            self.good_frames = 0
+        if (average > self.budget_ms * self.downgrade_at and
+                self.frames_since_change >= self.downgrade_after and
+                self.level < len(self.tiers) - 1):
+            self.set_level(self.level + 1)
+            return True
+        if self.good_frames >= self.upgrade_after and self.level > 0:
+            self.set_level(self.level - 1)
+            return True
+        return False
+
+    def set_level(self, level):
+        """Jump to a tier and restart the measurement window"""
+        self.level = level
+        self.samples.clear()
+        self.frames_since_change = 0
+        self.good_frames = 0
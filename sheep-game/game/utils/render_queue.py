@@ -0,0 +1,124 @@
+"""Draw commands collected over a frame and blitted back to front in one batch
+
+    python -m game.utils.render_queue
+
+Everything the game draws is a cached sprite. The background, entities,
+particles, the sheep, the HUD and the menus submit (sprite, position,
+layer, blend) commands while a frame is drawn, in whatever order their
+code runs, and flush() puts them in layer order. Within a layer commands
+keep the order they were submitted in, so a shadow submitted before its
+obstacle stays under it. The queue is there for the draw order, the
+skipped layers and the tint below. Handing the batch to one
+Surface.blits() call instead of a blit() per command saves little: the
+benchmark measures about 0.33 ms against 0.34-0.46 ms for a frame's
+commands, within run to run noise.
+
+Skipped layers are counted but not drawn, for seeing what a layer costs
+or what is hiding behind it. The command counts of the last flush go to
+the overlay. A tint function, when set, swaps the sprites of the scene
+layers as they are flushed (see utils.time_of_day).
+"""
+import pygame
+
+# Layers, back to front
+SKY, CLOUDS, GROUND, OBSTACLES, EAGLES, PARTICLES, SHEEP, HUD, MENU = range(9)
+LAYER_NAMES = ('sky', 'clouds', 'ground', 'obstacles', 'eagles', 'particles', 'sheep', 'hud', 'menu')
+SCENE = range(SKY, HUD)  # Layers of the scene itself, under the HUD and menus
+
+
+def parse_layers(names):
+    """Layer numbers for a comma separated list of layer names"""
+    layers = set()
+    for name in names.split(','):
+        name = name.strip()
+        if name not in LAYER_NAMES:
+            raise ValueError(f"unknown layer {name!r}, expected one of {', '.join(LAYER_NAMES)}")
+        layers.add(LAYER_NAMES.index(name))
+    return layers
+
+
+class RenderQueue:
+    """One frame's blits, bucketed by layer until flush()
+
+    Args:
+        skipped (iterable): Layers not to draw
+    """
+
+    def __init__(self, skipped=()):
+        self.layers = [[] for _ in LAYER_NAMES]  # Commands as Surface.blits() items
+        self.skipped = set(skipped)
+        self.counts = [0] * len(LAYER_NAMES)  # Commands per layer in the last flush
+        self.tint = None  # Function from a scene sprite to the one to draw instead
+
+    def submit(self, sprite, pos, layer, blend=0):
+        """Queue sprite to be blitted at pos, blend is a pygame BLEND_* flag"""
+        if blend:
+            self.layers[layer].append((sprite, pos, None, blend))
+        else:
+            self.layers[layer].append((sprite, pos))
+
+    def submit_all(self, commands, layer):
+        """Queue (sprite, pos) pairs in order, for drawing many of a kind at once"""
+        self.layers[layer].extend(commands)
+
+    def toggle(self, layer):
+        """Skip a layer that is drawn or draw one that is skipped"""
+        self.skipped ^= {layer}
+
+    def flush(self, screen):
+        """Blit everything queued onto screen, back to front, and empty the queue"""
+        batch = []
+        tint = self.tint
+        for layer, commands in enumerate(self.layers):
+            self.counts[layer] = len(commands)
+            if commands:
+                if layer in self.skipped:
+                    pass
+                elif tint is not None and layer in SCENE:
+                    batch += [(tint(command[0]),) + command[1:] for command in commands]
+                else:
+                    batch += commands
+                commands.clear()
+        if batch:
+            screen.blits(batch, doreturn=False)
+        return len(batch)
+
+    def stats(self):
+        """Commands per layer in the last flush, for the overlay"""
+        return {f"layer_{name}": count for name, count in zip(LAYER_NAMES, self.counts)}
+
+
+def benchmark(frames=600):
+    """Draw an offscreen game played by the autopilot, and time one blits() against a blit() per command"""
+    import time
+    from .autopilot import autoplayed_game
+
+    game, autopilot = autoplayed_game(warmup=0)
+    queue = game.render_queue
+    draw = flush = single = commands = 0.0
+    for frame in range(frames):
+        autopilot.tick(game)
+        game.update()
+        start = time.perf_counter()
+        game.draw()
+        draw += time.perf_counter() - start
+
+        # Queue the same frame again and flush it both ways
+        game.draw_frame()
+        batch = [command for layer in queue.layers for command in layer]
+        commands += len(batch)
+        start = time.perf_counter()
+        queue.flush(game.screen)
+        flush += time.perf_counter() - start
+        start = time.perf_counter()
+        for command in batch:
+            game.screen.blit(*command)
+        single += time.perf_counter() - start
+    print(f"{commands / frames:.1f} commands per frame, "
+          + ", ".join(f"{name} {count}" for name, count in zip(LAYER_NAMES, queue.counts)))
+    print(f"draw() {draw / frames * 1000:.3f} ms per frame, flushing with one blits() "
+          f"{flush / frames * 1000:.3f} ms, with a blit() per command {single / frames * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
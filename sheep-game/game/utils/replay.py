@@ -0,0 +1,87 @@
+import random
+import struct
+import pygame
+from .animation import frame_clock
+
+# Bump whenever the layout below changes
+REPLAY_MAGIC = b'SHRP'
+REPLAY_VERSION = 1
+
+# Seed, fixed frame rate, length in frames, then the input count
+HEADER = struct.Struct('<4sHQHII')
+INPUT = struct.Struct('<IBI')  # frame, kind, value
+
+# Input kinds
+KEY = 0  # value is the pygame key code of a KEYDOWN
+QUALITY = 1  # value is the quality level the governor switched to
+
+RECORDING_FPS = 60
+
+
+class Recording:
+    """Everything needed to play a session again: a seed and its inputs
+
+    The seed drives both the global random module and the course, and the
+    frame clock runs at a fixed rate while recording, so replaying the
+    inputs on the same frames rebuilds the session exactly.
+    """
+
+    def __init__(self, seed=None, fps=RECORDING_FPS):
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.fps = fps
+        self.frames = 0  # Length of the session in updates
+        self.inputs = []  # (frame, kind, value) in the order they happened
+
+    def begin(self):
+        """Seed the random module and fix the clock, call before creating the game"""
+        random.seed(self.seed)
+        frame_clock.use_fixed_rate(self.fps)
+
+    def add_key(self, frame, key):
+        self.inputs.append((frame, KEY, key))
+
+    def add_quality(self, frame, level):
+        self.inputs.append((frame, QUALITY, level))
+
+    def inputs_by_frame(self):
+        """Inputs grouped by the frame they were handled on"""
+        frames = {}
+        for frame, kind, value in self.inputs:
+            frames.setdefault(frame, []).append((kind, value))
+        return frames
+
+    def to_bytes(self):
+        parts = [HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.fps,
+                             self.frames, len(self.inputs))]
+        parts.extend(INPUT.pack(*record) for record in self.inputs)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        view = memoryview(data)
+        magic, version, seed, fps, frames, count = HEADER.unpack_from(view)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError("Not a compatible replay")
+        recording = cls(seed, fps)
+        recording.frames = frames
+        end = HEADER.size + INPUT.size * count
+        recording.inputs = list(INPUT.iter_unpack(view[HEADER.size:end]))
+        return recording
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def apply_input(game, kind, value):
+    """Feed one recorded input back into a game"""
+    if kind == KEY:
+        game.handle_event(pygame.event.Event(pygame.KEYDOWN, key=value))
+    elif kind == QUALITY:
+        game.quality.set_level(value)
+        game.apply_quality()
@@ -0,0 +1,94 @@
+import pygame
+from collections import OrderedDict
+from .jump_table import JumpTable
+from .sound_manager import SoundManager
+
+SPRITE_CACHE_SIZE = 512  # Sprites kept by sprite(), least recently used go first
+
+
+class SharedAssets:
+    """Read-only resources built once and handed to every game that asks
+
+    Several GameManagers in one process (split screen, see game.arena) get
+    the same fonts, background, jump table, sound effects and cached
+    sprites instead of each loading their own, so load time and memory
+    don't grow with the number of games. Everything handed out is shared:
+    surfaces may be blitted but never drawn on.
+    """
+
+    def __init__(self):
+        self.fonts = {}
+        self.surfaces = {}  # Key -> surface, see surface()
+        self.sprites = OrderedDict()  # Key -> surface, see sprite()
+        self.jump_tables = {}
+        self.sounds = None  # SoundManager, loaded by the first game with audio
+
+    def font(self, size):
+        """The default font at a size"""
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def surface(self, key, build):
+        """The surface cached under key, build() makes it on first use"""
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.surfaces[key] = build()
+        return surface
+
+    def sprite(self, key, build):
+        """Like surface(), for keys that keep coming, only the most recently used are kept"""
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.sprites[key] = build()
+            if len(self.sprites) > SPRITE_CACHE_SIZE:
+                self.sprites.popitem(last=False)
+        else:
+            self.sprites.move_to_end(key)
+        return sprite
+
+    def fill(self, size, color):
+        """A translucent surface of one color, for overlays and panels"""
+        def build():
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            surface.fill(color)
+            return surface
+        return self.surface(('fill', size, color), build)
+
+    def ellipse(self, size, color):
+        """A translucent ellipse filling a surface of size, for shadows"""
+        def build():
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.ellipse(surface, color, (0, 0, *size))
+            return surface
+        return self.surface(('ellipse', size, color), build)
+
+    def jump_table(self, sheep_x):
+        """The jump table for a sheep at sheep_x, it only depends on the physics"""
+        table = self.jump_tables.get(sheep_x)
+        if table is None:
+            table = self.jump_tables[sheep_x] = JumpTable(sheep_x)
+        return table
+
+    def sound_manager(self):
+        """The one SoundManager, with the background music started"""
+        if self.sounds is None:
+            self.sounds = SoundManager()
+            self.sounds.start_music()
+        return self.sounds
+
+    def stats(self):
+        """How much is cached, for the arena benchmark"""
+        return {
+            'fonts': len(self.fonts),
+            'surfaces': len(self.surfaces) + len(self.sprites),
+            'surface_bytes': sum(s.get_bytesize() * s.get_width() * s.get_height()
+                                 for cache in (self.surfaces, self.sprites)
+                                 for s in cache.values()),
+            'jump_tables': len(self.jump_tables),
+        }
+
+
+# Used by every game that isn't given its own
+default_assets = SharedAssets()
@@ -0,0 +1,214 @@
+import random
+import struct
+from array import array
+from collections import deque
+import pygame
+from .particle import Particle
+from .animation import frame_clock
+from .course import CourseGenerator, Placement
+
+# Bump whenever a record layout below changes
+SNAPSHOT_MAGIC = b'SHSN'
+SNAPSHOT_VERSION = 7
+
+# Game manager scalars, then the world's entity count, the particle count
+# and the popup text length
+HEADER = struct.Struct('<4sHBiiiiiddddiddiBBHHH')
+SHEEP = struct.Struct('<dddBBBdiiii')
+# The world's entities follow the sheep as whole columns, see ecs.World.pack
+PARTICLE = struct.Struct('<dddd4BBhdhd')
+# Mersenne Twister state is 624 words plus the position, then gauss_next
+RNG = struct.Struct('<Bd')
+RNG_WORDS = 625
+# Course seed, scroll distance and generator cursors, whether eagles are
+# allowed, then its placement and eagle exit counts
+COURSE = struct.Struct('<QdddBBHHHB')
+PLACEMENT = struct.Struct('<BdhBh')
+PLACEMENT_KINDS = ('obstacle', 'eagle')
+
+
+def pack_state(game):
+    """Pack the complete simulation state of a GameManager into bytes"""
+    sheep = game.sheep
+    flags = (game.game_started << 0) | (game.is_game_over << 1) | (game.is_paused << 2)
+    popup_text = game.score_popup_text.encode('utf-8')
+    parts = [
+        HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags,
+            game.score, game.jump_score, game.time_score, frame_clock.frame,
+            frame_clock.ticks - game.start_time,  # Elapsed time survives a restart
+            game.game_speed, game.last_obstacle_x, game.last_cloud_x,
+            game.time_since_last_point, game.score_popup_timer,
+            game.score_popup_pos[0], game.score_popup_pos[1],
+            game.score_milestone, game.rainbow_color_index, game.quality.level,
+            game.world.size, len(game.particle_system.particles), len(popup_text)
+        ),
+        popup_text,
+        SHEEP.pack(sheep.x, sheep.y, sheep.velocity_y, sheep.is_jumping,
+                   sheep.jumps_left, sheep.jump_buffer, sheep.leg_frame, *sheep.rect),
+    ]
+    parts.append(game.world.pack())
+    for p in game.particle_system.particles:
+        color = tuple(p.color) + (255,) * (4 - len(p.color))
+        parts.append(PARTICLE.pack(p.x, p.y, p.dx, p.dy, *color, len(p.color),
+                                   p.lifetime, p.alpha, p.size, p.alpha_decay))
+
+    parts.append(_pack_rng(random.getstate()))
+
+    course = game.course
+    last = [course.last_obstacle] if course.last_obstacle is not None else []
+    parts.append(COURSE.pack(course.seed, game.distance, course.generated_to,
+                             course.next_eagle, course.eagles_allowed, len(last),
+                             len(course.buffer), len(course.ahead), len(course.recent),
+                             len(course.eagle_exits)))
+    for placement in last + list(course.buffer) + course.ahead + list(course.recent):
+        parts.append(PLACEMENT.pack(PLACEMENT_KINDS.index(placement.kind),
+                                    placement.distance, placement.height,
+                                    placement.is_double, placement.y))
+    parts.append(array('d', course.eagle_exits).tobytes())
+    parts.append(_pack_rng(course.rng.getstate()))
+    return b''.join(parts)
+
+
+def restore_state(game, data):
+    """Restore a GameManager from bytes produced by pack_state"""
+    view = memoryview(data)
+    (magic, version, flags, game.score, game.jump_score, game.time_score,
+     frame, elapsed,
+     game.game_speed, game.last_obstacle_x, game.last_cloud_x,
+     game.time_since_last_point, game.score_popup_timer, popup_x, popup_y,
+     game.score_milestone, game.rainbow_color_index, quality_level, n_entities,
+     n_particles, text_length) = HEADER.unpack_from(view)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError("Not a compatible game snapshot")
+    offset = HEADER.size
+
+    frame_clock.seek(frame)
+    # The quality tier decides how many clouds and particles get spawned
+    if quality_level != game.quality.level:
+        game.quality.set_level(quality_level)
+        game.apply_quality()
+    game.game_started = bool(flags & 1)
+    game.is_game_over = bool(flags & 2)
+    game.is_paused = bool(flags & 4)
+    game.start_time = frame_clock.ticks - elapsed
+    game.score_popup_pos = (popup_x, popup_y)
+    game.score_popup_text = bytes(view[offset:offset + text_length]).decode('utf-8')
+    offset += text_length
+
+    sheep = game.sheep
+    (sheep.x, sheep.y, sheep.velocity_y, is_jumping, sheep.jumps_left,
+     sheep.jump_buffer, sheep.leg_frame, *rect) = SHEEP.unpack_from(view, offset)
+    sheep.is_jumping = bool(is_jumping)
+    sheep.rect.update(rect)
+    offset += SHEEP.size
+
+    offset = game.world.unpack(view, offset, n_entities)
+
+    particles = []
+    for fields in _records(PARTICLE, view, offset, n_particles):
+        p = Particle.__new__(Particle)
+        p.x, p.y, p.dx, p.dy = fields[:4]
+        p.color = fields[4:4 + fields[8]]
+        p.lifetime, p.alpha, p.size, p.alpha_decay = fields[9:]
+        particles.append(p)
+    game.particle_system.particles = particles
+    offset += PARTICLE.size * n_particles
+
+    state, offset = _unpack_rng(view, offset)
+    random.setstate(state)
+
+    # The course generator holds all of its state in attributes, a fresh
+    # chunk stream picks up exactly where the saved one left off
+    (seed, game.distance, generated_to, next_eagle, eagles_allowed, n_last, n_buffer,
+     n_ahead, n_recent, n_exits) = COURSE.unpack_from(view, offset)
+    offset += COURSE.size
+    placements = [
+        Placement(PLACEMENT_KINDS[kind], distance, height, bool(is_double), y)
+        for kind, distance, height, is_double, y in _records(
+            PLACEMENT, view, offset, n_last + n_buffer + n_ahead + n_recent)
+    ]
+    offset += PLACEMENT.size * len(placements)
+    exits = array('d')
+    exits.frombytes(view[offset:offset + 8 * n_exits])
+    offset += 8 * n_exits
+    course = CourseGenerator.__new__(CourseGenerator)
+    course.jump_table = game.jump_table
+    course.seed = seed
+    course.width = game.screen.get_width()
+    course.generated_to = generated_to
+    course.next_eagle = next_eagle
+    course.eagles_allowed = bool(eagles_allowed)
+    course.eagle_exits = deque(exits)
+    course.last_obstacle = placements[0] if n_last else None
+    course.buffer = deque(placements[n_last:n_last + n_buffer])
+    course.ahead = placements[n_last + n_buffer:n_last + n_buffer + n_ahead]
+    course.recent = deque(placements[n_last + n_buffer + n_ahead:], maxlen=4)
+    state, offset = _unpack_rng(view, offset)
+    course.rng = random.Random()
+    course.rng.setstate(state)
+    course.chunks = course.generate_chunks()
+    game.course = course
+
+
+def _pack_rng(state):
+    """Pack a Mersenne Twister state from getstate()"""
+    version, words, gauss_next = state
+    return array('I', words).tobytes() + RNG.pack(gauss_next is not None, gauss_next or 0.0)
+
+
+def _unpack_rng(view, offset):
+    """Unpack a state for setstate(), returns it with the offset after it"""
+    words = array('I')
+    words.frombytes(view[offset:offset + RNG_WORDS * 4])
+    offset += RNG_WORDS * 4
+    has_gauss, gauss_next = RNG.unpack_from(view, offset)
+    return (3, tuple(words), gauss_next if has_gauss else None), offset + RNG.size
+
+
+def _records(record, view, offset, count):
+    """Iterate over count fixed-size records starting at offset"""
+    return record.iter_unpack(view[offset:offset + record.size * count])
+
+
+def benchmark(frames=600, iterations=5000):
+    """Play a scripted headless game, then time snapshot and restore"""
+    import os
+    import time
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    from ..game_manager import GameManager
+    from .constants import SCREEN_WIDTH, SCREEN_HEIGHT
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    game = GameManager(screen)
+    space = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)
+    game.handle_event(space)
+    for frame in range(frames):
+        if frame % 45 == 0 or game.is_game_over:
+            game.handle_event(space)
+        game.update()
+
+    data = pack_state(game)
+    restore_state(game, data)
+    assert pack_state(game) == data, "Snapshot round trip changed the state"
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        pack_state(game)
+    pack_time = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        restore_state(game, data)
+    restore_time = (time.perf_counter() - start) / iterations
+
+    print(f"Snapshot size: {len(data)} bytes")
+    print(f"Snapshot: {pack_time * 1e6:.1f} us ({1 / pack_time:.0f}/s)")
+    print(f"Restore:  {restore_time * 1e6:.1f} us ({1 / restore_time:.0f}/s)")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -12,26 +12,8 @@ def generate_sound_effects():
     if not os.path.exists(sounds_dir):
         os.makedirs(sounds_dir)
     
-    # Generate jump sound (ascending beep)
-    create_jump_sound(os.path.join(sounds_dir, 'jump.wav'))
-    
-    # Generate double jump sound (higher-pitched ascending beep with echo)
-    create_double_jump_sound(os.path.join(sounds_dir, 'double_jump.wav'))
-    
-    # Generate landing sound (soft thump)
-    create_land_sound(os.path.join(sounds_dir, 'land.wav'))
-    
-    # Generate game over sound (descending sad tone)
-    create_game_over_sound(os.path.join(sounds_dir, 'game_over.wav'))
-    
-    # Generate score milestone sound (happy jingle)
-    create_milestone_sound(os.path.join(sounds_dir, 'milestone.wav'))
-    
-    # Generate click sound (UI interaction)
-    create_click_sound(os.path.join(sounds_dir, 'click.wav'))
-    
-    # Generate score sound (simple beep)
-    create_score_sound(os.path.join(sounds_dir, 'score.wav'))
+    for filename, create_sound in SOUND_EFFECTS.items():
+        create_sound(os.path.join(sounds_dir, filename))
 
 def create_jump_sound(filename):
     """Create a simple jump sound effect"""
@@ -315,5 +297,16 @@ def create_score_sound(filename):
         for sample in samples:
             wav_file.writeframes(struct.pack('<h', sample))
 
+# Output file of every effect and the function that synthesizes it
+SOUND_EFFECTS = {
+    'jump.wav': create_jump_sound,  # Ascending beep
+    'double_jump.wav': create_double_jump_sound,  # Higher-pitched ascending beep with echo
+    'land.wav': create_land_sound,  # Soft thump
+    'game_over.wav': create_game_over_sound,  # Descending sad tone
+    'milestone.wav': create_milestone_sound,  # Happy jingle
+    'click.wav': create_click_sound,  # UI interaction
+    'score.wav': create_score_sound,  # Simple beep
+}
+
 if __name__ == "__main__":
     generate_sound_effects()
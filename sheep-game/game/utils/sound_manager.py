@@ -1,5 +1,7 @@
 import pygame
 import os
+from .asset_pack import open_pack
+from .asset_build import load_manifest, stale_outputs
 
 class SoundManager:
     def __init__(self):
@@ -10,6 +12,7 @@ class SoundManager:
         # Sound effects storage
         self.sounds = {}
         self.music = None
+        self.music_stream = None  # utils.music.MusicStream once start_music() is called
         self.sound_enabled = True
         self.music_enabled = True
         
@@ -17,13 +20,20 @@ class SoundManager:
         self.load_sounds()
     
     def load_sounds(self):
-        """Load all sound effects"""
+        """Load all sound effects, from the asset pack when there is one"""
+        pack = open_pack()
         sounds_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'sounds')
         
         # Create directory if it doesn't exist
         if not os.path.exists(sounds_dir):
             os.makedirs(sounds_dir)
         
+        # Sounds edited or deleted since the last asset build, found with stat() only
+        stale = stale_outputs(load_manifest(sounds_dir), sounds_dir)
+        if stale:
+            print(f"Sounds changed since the last build: {', '.join(stale)} "
+                  "(run python -m game.utils.asset_build)")
+        
         # Dictionary mapping sound names to file paths (to be implemented)
         sound_files = {
             'jump': os.path.join(sounds_dir, 'jump.wav'),
@@ -37,12 +47,23 @@ class SoundManager:
         
         # Load each sound that exists
         for sound_name, sound_path in sound_files.items():
+            # Packed sounds need no file lookups, loose files are the fallback
+            packed_name = 'sounds/' + os.path.basename(sound_path)
+            if pack is not None and packed_name in pack:
+                sound = pack.sound(packed_name)
+                if sound is not None:
+                    self.sounds[sound_name] = sound
+                    continue
             # Check if file exists before loading
             if os.path.exists(sound_path):
                 try:
                     self.sounds[sound_name] = pygame.mixer.Sound(sound_path)
                 except:
                     print(f"Failed to load sound: {sound_path}")
+        
+        # Sounds have their own copy of the samples, the mapping isn't needed
+        if pack is not None:
+            pack.close()
     
     def play(self, sound_name, volume=1.0):
         """Play a sound effect by name if sound is enabled"""
@@ -65,11 +86,37 @@ class SoundManager:
         if self.music_enabled:
             if self.music:
                 pygame.mixer.music.unpause()
+            if self.music_stream:
+                self.music_stream.unpause()
         else:
             pygame.mixer.music.pause()
+            if self.music_stream:
+                self.music_stream.pause()
         
         return self.music_enabled
     
+    def start_music(self):
+        """Start the procedural background music, needs NumPy"""
+        if self.music_stream is not None:
+            return
+        try:
+            from .music import MusicStream
+            self.music_stream = MusicStream()
+        except (ImportError, ValueError) as error:
+            print(f"Background music disabled: {error}")
+            return
+        if not self.music_enabled:
+            self.music_stream.pause()
+    
+    def update_music(self, speed_scale, paused=False):
+        """Keep the music stream fed, called once per frame"""
+        stream = self.music_stream
+        if stream is None:
+            return
+        if paused != stream.paused and self.music_enabled:
+            stream.pause() if paused else stream.unpause()
+        stream.update(speed_scale)
+    
     def play_music(self, music_file):
         """Play background music if it exists and music is enabled"""
         if os.path.exists(music_file) and self.music_enabled:
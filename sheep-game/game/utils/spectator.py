@@ -0,0 +1,419 @@
+"""Stream a live game to spectators as binary state deltas
+
+    python main.py --spectate 127.0.0.1:7777
+    python -m game.spectate 127.0.0.1:7777
+
+The server sends what the draw code reads: the score, popup and menu
+state, the sheep and the world's entities. Entities only ever scroll,
+animate and leave the screen between frames, and the spectator runs the
+same passes on its copy of the world, so a delta carries the scalars,
+the sheep and the rows spawned since the last tick. Whenever the world
+changed some other way (a restart, a quality change dropping clouds) or
+every KEYFRAME_INTERVAL ticks, a zlib compressed keyframe carries all of
+it instead.
+
+Messages are encoded once per tick whatever the number of spectators,
+and sent without blocking. Once a tick has used its budget, the
+remaining spectators wait for the next tick, and one that hasn't caught
+up by the next keyframe skips straight to it. Particles are not sent,
+spectators see the game without them.
+"""
+import asyncio
+import bisect
+import os
+import socket
+import struct
+import time
+import zlib
+import numpy as np
+from . import ecs
+from .animation import frame_clock
+from .snapshot import SHEEP
+
+DEFAULT_ADDRESS = '127.0.0.1:7777'
+KEYFRAME_INTERVAL = 120  # Ticks, two seconds at 60 FPS
+BUDGET_MS = 1.0  # CPU time per tick, for encoding and sending to every spectator
+
+KEYFRAME, DELTA = 1, 2
+# Message type and payload length
+MESSAGE = struct.Struct('<BI')
+# Flags, frame, clock ticks, score, speed, popup timer, position and color,
+# quality level, rank and total (0 without one), popup text length, then
+# the number of entities after this message
+TICK = struct.Struct('<BIiididdBBiiHH')
+STARTED, GAME_OVER, PAUSED, STEPPED = 1, 2, 4, 8
+
+
+def parse_address(address):
+    """(family, address) for socket(), host:port is TCP and anything else a Unix socket path"""
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit():
+        return socket.AF_INET, (host or '127.0.0.1', int(port))
+    return socket.AF_UNIX, address
+
+
+def step(world, speed, ticks):
+    """Scroll, animate and cull a world the way GameManager.update does"""
+    ecs.move(world, speed)
+    ecs.animate(world, ticks)
+    ecs.sync_hitboxes(world)
+    ecs.cull(world)
+
+
+def _pack_tick(game, flags, n_entities):
+    """The scalars, popup text and sheep every message starts with"""
+    sheep = game.sheep
+    rank, total = game.rank or (0, 0)
+    popup_text = game.score_popup_text.encode('utf-8')
+    flags |= ((game.game_started and STARTED) | (game.is_game_over and GAME_OVER) |
+              (game.is_paused and PAUSED))
+    return (TICK.pack(flags, frame_clock.frame, frame_clock.ticks, game.score,
+                      game.game_speed, game.score_popup_timer,
+                      game.score_popup_pos[0], game.score_popup_pos[1],
+                      game.rainbow_color_index, game.quality.level, rank, total,
+                      len(popup_text), n_entities) +
+            popup_text +
+            SHEEP.pack(sheep.x, sheep.y, sheep.velocity_y, sheep.is_jumping,
+                       sheep.jumps_left, sheep.jump_buffer, sheep.leg_frame, *sheep.rect))
+
+
+class _Spectator:
+    def __init__(self, sock):
+        self.sock = sock
+        self.position = 0  # Offset of the next byte to send in the server's stream
+        self.rest = b''  # End of a message from the previous stream, sent first
+
+
+class SpectatorServer:
+    """Accepts spectators on a local socket and streams a game to them
+
+    Call tick(game) once per frame after the game updated, or run
+    serve(game, pacer) on the game's utils.async_loop. The server
+    keeps its own copy of the world as the spectators have it, to find
+    out what a delta has to carry. The last keyframe and every delta
+    since are kept in one buffer, and each spectator only has a position
+    in it: a new spectator starts at the keyframe, and one that waits for
+    a later tick costs nothing until it is served.
+
+    Args:
+        address (str): host:port for TCP or a path for a Unix socket
+        budget_ms (float): CPU time per tick before sends are deferred
+        keyframe_interval (int): Ticks between keyframes
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, budget_ms=BUDGET_MS,
+                 keyframe_interval=KEYFRAME_INTERVAL):
+        self.family, self.address = parse_address(address)
+        self.listener = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_INET:
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        elif os.path.exists(self.address):
+            os.unlink(self.address)  # Left over from a server that didn't close
+        self.listener.bind(self.address)
+        self.listener.listen()
+        self.listener.setblocking(False)
+        self.budget = budget_ms / 1000
+        self.keyframe_interval = keyframe_interval
+        self.spectators = []
+        self.next_spectator = 0  # First to be served next tick, so deferrals rotate
+        self.world = ecs.World()  # The world as spectators have it
+        self.stream = bytearray()  # The last keyframe and the deltas since
+        self.starts = []  # Offset of every message in the stream
+        self.since_keyframe = 0
+        # Totals since the server started
+        self.ticks = 0
+        self.keyframes = 0
+        self.bytes_sent = 0
+        self.deferred = 0  # Spectators whose send waited for the next tick
+        self.resyncs = 0  # Spectators that fell a keyframe behind and skipped ahead
+        self.last_tick_ms = 0.0
+
+    def tick(self, game):
+        """Encode this frame and send it to every spectator, within the budget"""
+        start = time.thread_time()
+        self._accept()
+        if not self.spectators:
+            self.stream.clear()  # Nobody to keep in sync, start over with a keyframe
+            return
+        self.ticks += 1
+
+        delta = self._encode_delta(game) if self.stream else None
+        if delta is None or self.since_keyframe >= self.keyframe_interval:
+            self._restart(self._encode_keyframe(game))
+        else:
+            self.starts.append(len(self.stream))
+            self.stream += delta
+            self.since_keyframe += 1
+
+        count = len(self.spectators)
+        served = 0
+        gone = []
+        while served < count and time.thread_time() - start < self.budget:
+            spectator = self.spectators[(self.next_spectator + served) % count]
+            if not self._send(spectator):
+                gone.append(spectator)
+            served += 1
+        self.deferred += count - served
+        self.next_spectator = (self.next_spectator + served) % count
+        for spectator in gone:
+            spectator.sock.close()
+            self.spectators.remove(spectator)
+        self.last_tick_ms = (time.thread_time() - start) * 1000
+
+    async def serve(self, game, pacer):
+        """tick() after every frame of a FramePacer, in the slack before the next one
+
+        New spectators are accepted as they connect rather than on the
+        next tick. The stats go to the game's overlay from here too.
+        """
+        loop = asyncio.get_running_loop()
+        loop.add_reader(self.listener, self._accept)
+        try:
+            while True:
+                await pacer.next_frame()
+                self.tick(game)
+                for name, value in self.stats().items():
+                    game.instrumentation.set(name, value)
+        finally:
+            loop.remove_reader(self.listener)
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except BlockingIOError:
+                return
+            sock.setblocking(False)
+            if self.family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.spectators.append(_Spectator(sock))
+
+    def _send(self, spectator):
+        """Send what the socket takes right now, False once the spectator is gone"""
+        try:
+            if spectator.rest:
+                sent = spectator.sock.send(spectator.rest)
+                spectator.rest = spectator.rest[sent:]
+                self.bytes_sent += sent
+                if spectator.rest:
+                    return True
+            if spectator.position < len(self.stream):
+                with memoryview(self.stream) as view:
+                    sent = spectator.sock.send(view[spectator.position:])
+                spectator.position += sent
+                self.bytes_sent += sent
+        except BlockingIOError:
+            pass
+        except OSError:  # Disconnected
+            return False
+        return True
+
+    def _restart(self, keyframe):
+        """Start a new stream with a keyframe, spectators still behind skip to it"""
+        for spectator in self.spectators:
+            position = spectator.position
+            if position < len(self.stream):
+                # Finish the message it is in the middle of, drop the ones after
+                end = bisect.bisect_right(self.starts, position)
+                end = self.starts[end] if end < len(self.starts) else len(self.stream)
+                spectator.rest += bytes(self.stream[position:end])
+                if end < len(self.stream):
+                    self.resyncs += 1
+            spectator.position = 0
+        self.stream = bytearray(keyframe)
+        self.starts = [0]
+        self.since_keyframe = 0
+
+    def _encode_delta(self, game):
+        """The message taking the spectators' world to the game's, None if only a keyframe can"""
+        world, live = self.world, game.world
+        stepped = 0
+        # Paused and in the menus nothing moves, otherwise every row did
+        if not np.array_equal(live.x[:world.size], world.x[:world.size]):
+            step(world, game.game_speed, frame_clock.ticks)
+            stepped = STEPPED
+        if live.size < world.size or live.pack(0, world.size) != world.pack():
+            return None
+        spawned = live.pack(world.size)
+        if spawned:
+            world.unpack(spawned, 0, live.size, start=world.size)
+        payload = _pack_tick(game, stepped, live.size) + spawned
+        return MESSAGE.pack(DELTA, len(payload)) + payload
+
+    def _encode_keyframe(self, game):
+        live = game.world
+        data = live.pack()
+        self.world.unpack(data, 0, live.size)
+        payload = zlib.compress(_pack_tick(game, 0, live.size) + data, 1)
+        self.keyframes += 1
+        return MESSAGE.pack(KEYFRAME, len(payload)) + payload
+
+    def stats(self):
+        """Totals for the instrumentation overlay and the benchmark"""
+        return {
+            'spectators': len(self.spectators),
+            'spectator_ms': round(self.last_tick_ms, 3),
+            'spectator_kbytes': self.bytes_sent // 1024,
+            'spectator_keyframes': self.keyframes,
+            'spectator_deferred': self.deferred,
+            'spectator_resyncs': self.resyncs,
+        }
+
+    def close(self):
+        for spectator in self.spectators:
+            spectator.sock.close()
+        self.spectators.clear()
+        self.listener.close()
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+class SpectatorClient:
+    """Applies a server's messages to a GameManager that only draws
+
+    feed() takes bytes in whatever pieces they arrive. Deltas before the
+    first keyframe are ignored, after it the game's world is always the
+    server's copy.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.buffer = bytearray()
+        self.synced = False
+        self.messages = 0
+
+    def feed(self, data):
+        """Apply every complete message in data, returns how many there were"""
+        self.buffer += data
+        applied = 0
+        offset = 0
+        while len(self.buffer) - offset >= MESSAGE.size:
+            kind, length = MESSAGE.unpack_from(self.buffer, offset)
+            end = offset + MESSAGE.size + length
+            if end > len(self.buffer):
+                break
+            payload = bytes(self.buffer[offset + MESSAGE.size:end])
+            if kind == KEYFRAME:
+                self._apply(zlib.decompress(payload), keyframe=True)
+                self.synced = True
+            elif self.synced:
+                self._apply(payload, keyframe=False)
+            offset = end
+            applied += 1
+        del self.buffer[:offset]
+        self.messages += applied
+        return applied
+
+    def _apply(self, payload, keyframe):
+        game = self.game
+        view = memoryview(payload)
+        (flags, frame, ticks, game.score, game.game_speed, game.score_popup_timer,
+         popup_x, popup_y, game.rainbow_color_index, quality_level, rank, total,
+         text_length, n_entities) = TICK.unpack_from(view)
+        offset = TICK.size
+        # Set directly, seek() would read the real clock on a live clock
+        frame_clock.frame = frame
+        frame_clock.ticks = ticks
+        game.game_started = bool(flags & STARTED)
+        game.is_game_over = bool(flags & GAME_OVER)
+        game.is_paused = bool(flags & PAUSED)
+        game.score_popup_pos = (popup_x, popup_y)
+        game.rank = (rank, total) if total else None
+        if quality_level != game.quality.level:
+            # Only what gets drawn, the server already removed any clouds
+            game.quality.set_level(quality_level)
+        game.score_popup_text = bytes(view[offset:offset + text_length]).decode('utf-8')
+        offset += text_length
+
+        sheep = game.sheep
+        (sheep.x, sheep.y, sheep.velocity_y, is_jumping, sheep.jumps_left,
+         sheep.jump_buffer, sheep.leg_frame, *rect) = SHEEP.unpack_from(view, offset)
+        sheep.is_jumping = bool(is_jumping)
+        sheep.rect.update(rect)
+        offset += SHEEP.size
+
+        world = game.world
+        if keyframe:
+            world.unpack(view, offset, n_entities)
+        else:
+            if flags & STEPPED:
+                step(world, game.game_speed, ticks)
+            world.unpack(view, offset, n_entities, start=world.size)
+
+
+def _drain(address, count):
+    """Benchmark worker: connect count spectators and read until the server closes"""
+    import selectors
+    selector = selectors.DefaultSelector()
+    for _ in range(count):
+        selector.register(socket.create_connection(address), selectors.EVENT_READ)
+    while selector.get_map():
+        for key, _ in selector.select():
+            if not key.fileobj.recv(1 << 16):
+                selector.unregister(key.fileobj)
+                key.fileobj.close()
+
+
+def benchmark(frames=1200, spectator_counts=(1, 4, 16, 64, 256)):
+    """Time the server's ticks for a scripted game with more and more spectators
+
+    One spectator is read in this process between ticks, decoded and
+    checked against the game every frame. The others are drained by a
+    worker process.
+    """
+    import multiprocessing
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    from ..game_manager import GameManager
+    from .constants import SCREEN_WIDTH, SCREEN_HEIGHT
+
+    pygame.init()
+    frame_clock.use_fixed_rate()
+    space = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)
+    context = multiprocessing.get_context('spawn')
+    print("spectators  tick us (mean / p99)  bytes per tick  keyframes  deferred  mismatches")
+    for count in spectator_counts:
+        server = SpectatorServer('127.0.0.1:0')
+        address = server.listener.getsockname()
+        game = GameManager(pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)), headless=True, seed=5)
+        viewer = GameManager(pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)), headless=True)
+        client = SpectatorClient(viewer)
+        watcher = socket.create_connection(address)
+        watcher.setblocking(False)
+        worker = context.Process(target=_drain, args=(address, count - 1))
+        worker.start()
+        while len(server.spectators) < count:
+            server._accept()
+            time.sleep(0.01)
+
+        times = []
+        mismatches = 0
+        for frame in range(frames):
+            if frame % 45 == 0 or game.is_game_over:
+                game.handle_event(space)
+            game.update()
+            server.tick(game)
+            times.append(server.last_tick_ms * 1000)
+
+            clock = frame_clock.frame, frame_clock.ticks
+            try:
+                while True:
+                    client.feed(watcher.recv(1 << 16))
+            except BlockingIOError:
+                pass
+            frame_clock.frame, frame_clock.ticks = clock  # The viewer shares the clock
+            if viewer.world.pack() != game.world.pack() or viewer.sheep.y != game.sheep.y:
+                mismatches += 1
+
+        stats = server.stats()
+        times.sort()
+        print(f"{count:10d}  {sum(times) / len(times):8.1f} / {times[len(times) * 99 // 100]:6.1f}"
+              f"     {server.bytes_sent / (server.ticks * count):10.0f}  "
+              f"{stats['spectator_keyframes']:9d}  {stats['spectator_deferred']:8d}  {mismatches:10d}")
+        watcher.close()
+        server.close()
+        worker.join()
+
+
+if __name__ == "__main__":
+    benchmark()
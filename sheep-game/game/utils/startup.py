@@ -0,0 +1,112 @@
+"""Cold-start budget for the game
+
+    python -m game.utils.startup
+
+Imports game.main in a fresh interpreter with ``-X importtime``, then starts
+the game with --startup-report to time the first frame. A warm-up import
+runs first so the bytecode cache is written, like an installed game has.
+Exits with status 1 when either figure is over its budget, so it can gate
+a build.
+"""
+import os
+import subprocess
+import sys
+import time
+
+# Importing our own modules, on top of whatever pygame itself pulls in
+IMPORT_BUDGET_MS = 40
+# Process start to the first frame on screen, dummy video and audio drivers
+FIRST_FRAME_BUDGET_MS = 400
+
+# Loaded only for the features that need them, never by a plain game start
+LAZY_MODULES = (
+    'game.utils.replay', 'game.utils.tick_log', 'game.utils.telemetry',
+    'game.utils.sound_generator', 'game.utils.spectator', 'game.utils.autopilot',
+    'game.utils.profiler', 'game.utils.async_loop',
+)
+
+
+def process_age():
+    """Seconds since this process started, None where the OS doesn't say
+
+    Read from /proc, so only on Linux and only to the kernel clock tick.
+    """
+    try:
+        with open('/proc/self/stat') as f:
+            # Fields after the command name, starttime is field 22 of the file
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def time_to_first_frame(started):
+    """Milliseconds from process start, or from perf_counter() time started
+    when the process start is unknown"""
+    age = process_age()
+    if age is None:
+        age = time.perf_counter() - started
+    return round(age * 1000, 1)
+
+
+def parse_importtime(output):
+    """(module, self_us, cumulative_us) for every line of -X importtime output"""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        modules.append((name.strip(), int(self_us), int(cumulative)))
+    return modules
+
+
+def measure_imports():
+    """Import game.main in a fresh interpreter, returns the parsed timings"""
+    subprocess.run([sys.executable, '-c', 'import game.main'], env=_environment(), check=True)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import game.main'],
+                            capture_output=True, text=True, env=_environment(), check=True)
+    return parse_importtime(result.stderr)
+
+
+def measure_first_frame():
+    """Start the game and return the first frame time it reports, in ms"""
+    result = subprocess.run([sys.executable, '-m', 'game.main', '--startup-report'],
+                            capture_output=True, text=True, env=_environment(), check=True)
+    return float(result.stdout.split()[-2])
+
+
+def _environment():
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+    env.pop('PYTHONDONTWRITEBYTECODE', None)  # Compiling every module isn't a cold start
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+    return env
+
+
+def main():
+    modules = measure_imports()
+    cumulative = {name: total for name, _, total in modules}
+    total_ms = cumulative['game.main'] / 1000
+    pygame_ms = cumulative.get('pygame', 0) / 1000
+    own_ms = total_ms - pygame_ms
+    eager = [name for name in LAZY_MODULES if name in cumulative]
+
+    print(f"import game.main: {total_ms:.1f} ms, pygame {pygame_ms:.1f} ms, "
+          f"ours {own_ms:.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+    slowest = sorted((m for m in modules if m[0].startswith('game')), key=lambda m: -m[1])
+    for name, self_us, _ in slowest[:5]:
+        print(f"  {name}: {self_us / 1000:.1f} ms")
+    if eager:
+        print(f"Imported eagerly but should be lazy: {', '.join(eager)}")
+
+    first_frame_ms = measure_first_frame()
+    print(f"Time to first frame: {first_frame_ms:.1f} ms (budget {FIRST_FRAME_BUDGET_MS} ms)")
+
+    if own_ms > IMPORT_BUDGET_MS or first_frame_ms > FIRST_FRAME_BUDGET_MS or eager:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+from collections import deque
+import pygame
+from .event_bus import Jump, Died
+
+
+class TelemetrySink:
+    """Bounded queue of records written to a JSONL file by a background thread
+
+    put() only appends to a deque, so the game loop never touches the disk or
+    waits on a lock. When the queue is full the record is dropped and
+    counted instead. The writer wakes up every flush_interval seconds, or
+    once batch_size records are waiting, and writes everything queued in one
+    go. pygame.quit() flushes and stops the thread.
+    """
+
+    def __init__(self, path, max_queue=1024, batch_size=64, flush_interval=0.5):
+        self.path = path
+        self.queue = deque()
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self.closing = False
+        self.wake = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='telemetry', daemon=True)
+        self.thread.start()
+        pygame.register_quit(self.close)
+
+    def put(self, record):
+        """Queue a record from the game loop, returns False if it was dropped"""
+        if self.closing or len(self.queue) >= self.max_queue:
+            self.dropped += 1
+            return False
+        self.queue.append(record)
+        if len(self.queue) == self.batch_size:
+            self.wake.set()
+        return True
+
+    def run(self):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            while True:
+                self.wake.wait(self.flush_interval)
+                self.wake.clear()
+                closing = self.closing  # Read before draining so nothing queued is missed
+                lines = []
+                while self.queue:
+                    lines.append(json.dumps(self.queue.popleft(), separators=(',', ':')))
+                if lines:
+                    f.write('\n'.join(lines) + '\n')
+                    f.flush()
+                    self.written += len(lines)
+                if closing:
+                    break
+
+    def close(self):
+        """Write whatever is still queued and stop the writer thread"""
+        if self.closing:
+            return
+        self.closing = True
+        self.wake.set()
+        self.thread.join()
+
+
+class SessionTelemetry:
+    """Per-game metrics collected from simulation events and frame times"""
+
+    def __init__(self, game, sink, speed_sample_frames=60):
+        self.game = game
+        self.sink = sink
+        self.speed_sample_frames = speed_sample_frames
+        self.deaths = {'obstacle': 0, 'eagle': 0}
+        self.games = 0
+        self.session_frames = 0
+        self.session_frame_ms = 0.0
+        self.session_start = time.perf_counter()
+        self.start_game()
+        game.events.subscribe(Jump, self.on_jumps)
+        game.events.subscribe(Died, self.on_deaths)
+
+    def start_game(self):
+        """Reset the per-game accumulators"""
+        self.frames = 0  # Frames played this game
+        self.frame_ms = 0.0  # Work time of those frames
+        self.started_at = None  # Wall clock of the first frame played
+        self.jumps = 0
+        self.double_jumps = 0
+        self.speed_curve = []  # game_speed every speed_sample_frames frames
+
+    def frame(self, frame_ms):
+        """Called once per frame with the measured frame time"""
+        self.session_frames += 1
+        self.session_frame_ms += frame_ms
+        game = self.game
+        if not game.game_started and self.frames:
+            self.start_game()  # Left for the menu without dying
+        if game.game_started and not (game.is_game_over or game.is_paused):
+            if self.frames % self.speed_sample_frames == 0:
+                self.speed_curve.append(round(game.game_speed, 4))
+            if self.started_at is None:
+                self.started_at = time.perf_counter()
+            self.frames += 1
+            self.frame_ms += frame_ms
+        game.instrumentation.set('telemetry_dropped', self.sink.dropped)
+
+    def on_jumps(self, events):
+        for event in events:
+            self.jumps += 1
+            self.double_jumps += event.is_double
+
+    def on_deaths(self, events):
+        game = self.game
+        for event in events:
+            elapsed = time.perf_counter() - self.started_at if self.started_at else 0
+            self.games += 1
+            self.deaths[event.cause] += 1
+            self.sink.put({
+                'type': 'game_over',
+                'game': self.games,
+                'cause': event.cause,
+                'score': event.score,
+                'jump_score': game.jump_score,
+                'time_score': game.time_score,
+                'frames': self.frames,
+                'jumps': self.jumps,
+                'double_jumps': self.double_jumps,
+                'fps': round(self.frames / elapsed, 1) if elapsed else None,
+                'frame_ms': round(self.frame_ms / self.frames, 3) if self.frames else None,
+                'speed_curve': self.speed_curve,
+                'speed_sample_frames': self.speed_sample_frames,
+            })
+            self.start_game()
+
+    def close(self):
+        """Queue the session summary and flush the sink"""
+        elapsed = time.perf_counter() - self.session_start
+        self.sink.put({
+            'type': 'session',
+            'games': self.games,
+            'deaths': self.deaths,
+            'frames': self.session_frames,
+            'fps': round(self.session_frames / elapsed, 1) if elapsed else None,
+            'frame_ms': (round(self.session_frame_ms / self.session_frames, 3)
+                         if self.session_frames else None),
+            'dropped': self.sink.dropped,
+            'input_latency': self.game.latency.summary(),
+            'first_frame_ms': self.game.instrumentation.gauges.get('first_frame_ms'),
+        })
+        self.sink.close()
@@ -0,0 +1,235 @@
+import bisect
+import mmap
+import os
+import struct
+from collections import namedtuple
+import pygame
+from . import ecs
+from .animation import frame_clock
+from .replay import Recording, QUALITY
+
+# Bump whenever the layout below changes
+TICK_LOG_MAGIC = b'SHTL'
+TICK_LOG_VERSION = 1
+
+# Record size, recording seed and fixed frame rate (0 when the game ran on
+# the real clock), padded so records start on a 32 byte boundary
+HEADER = struct.Struct('<4sHHQH14x')
+# One record per tick, 32 bytes: tick, state flags, keys pressed, quality
+# level, score, game speed, distance, entity counts and frame time
+RECORD = struct.Struct('<IBBBxiffHHHHf')
+# Sidecar index of (tick, record number) every INDEX_STRIDE records
+INDEX_ENTRY = struct.Struct('<II')
+INDEX_STRIDE = 1024
+
+Tick = namedtuple('Tick', 'tick flags inputs quality score game_speed distance '
+                          'obstacles eagles clouds particles frame_ms')
+
+# Field layout of RECORD for numpy.frombuffer
+RECORD_DTYPE = [
+    ('tick', '<u4'), ('flags', 'u1'), ('inputs', 'u1'), ('quality', 'u1'), ('pad', 'u1'),
+    ('score', '<i4'), ('game_speed', '<f4'), ('distance', '<f4'),
+    ('obstacles', '<u2'), ('eagles', '<u2'), ('clouds', '<u2'), ('particles', '<u2'),
+    ('frame_ms', '<f4'),
+]
+
+# State flags
+STARTED = 1
+GAME_OVER = 2
+PAUSED = 4
+JUMPING = 8
+
+# Keys tracked in the inputs bitmask, bit n is INPUT_KEYS[n]
+INPUT_KEYS = (pygame.K_SPACE, pygame.K_p, pygame.K_q, pygame.K_F3)
+
+
+def index_path(path):
+    return path + '.idx'
+
+
+class TickLogWriter:
+    """Append-only writer, records are packed into a buffer and written in blocks"""
+
+    def __init__(self, path, seed=0, fps=0, block_records=256):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.index_file = open(index_path(path), 'wb')
+        self.file.write(HEADER.pack(TICK_LOG_MAGIC, TICK_LOG_VERSION, RECORD.size, seed, fps))
+        self.block = bytearray(RECORD.size * block_records)
+        self.block_records = block_records
+        self.pending = 0  # Records in the block not written yet
+        self.count = 0  # Records appended so far
+        self.inputs = 0  # Keys pressed since the last record
+
+    def add_key(self, key):
+        """Remember a key press for the next record"""
+        if key in INPUT_KEYS:
+            self.inputs |= 1 << INPUT_KEYS.index(key)
+
+    def append(self, game, frame_ms=0.0):
+        """Append the state of a GameManager after its update for this tick"""
+        flags = ((game.game_started * STARTED) | (game.is_game_over * GAME_OVER) |
+                 (game.is_paused * PAUSED) | (game.sheep.is_jumping * JUMPING))
+        self.append_values(frame_clock.frame, flags, self.inputs, game.quality.level,
+                           game.score, game.game_speed, game.distance,
+                           game.world.count(ecs.OBSTACLE), game.world.count(ecs.EAGLE),
+                           game.world.count(ecs.CLOUD),
+                           len(game.particle_system.particles), frame_ms)
+        self.inputs = 0
+
+    def append_values(self, tick, *values):
+        """Append one record from raw field values, in RECORD order"""
+        if self.count % INDEX_STRIDE == 0:
+            self.index_file.write(INDEX_ENTRY.pack(tick, self.count))
+        RECORD.pack_into(self.block, self.pending * RECORD.size, tick, *values)
+        self.pending += 1
+        self.count += 1
+        if self.pending == self.block_records:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered records to the file"""
+        if self.pending:
+            self.file.write(memoryview(self.block)[:self.pending * RECORD.size])
+            self.pending = 0
+        self.file.flush()
+        self.index_file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+        self.index_file.close()
+
+
+class TickLog:
+    """Read-only view of a tick log, mapped into memory instead of read
+
+    Records are unpacked on access, and as_array() exposes the whole file as
+    a NumPy structured array without copying it.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        magic, version, record_size, self.seed, self.fps = HEADER.unpack_from(self.view)
+        if magic != TICK_LOG_MAGIC or version != TICK_LOG_VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError("Not a compatible tick log")
+        # A partly written last record from a crash is ignored
+        self.count = (len(self.map) - HEADER.size) // RECORD.size
+        self.index_ticks, self.index_records = self._load_index(path)
+
+    def _load_index(self, path):
+        ticks, records = [], []
+        if os.path.exists(index_path(path)):
+            with open(index_path(path), 'rb') as f:
+                for tick, record in INDEX_ENTRY.iter_unpack(f.read()):
+                    if record < self.count:
+                        ticks.append(tick)
+                        records.append(record)
+        return ticks, records
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return Tick(*RECORD.unpack_from(self.view, HEADER.size + i * RECORD.size))
+
+    def tick_at(self, i):
+        """Tick number of record i, without unpacking the rest of it"""
+        return struct.unpack_from('<I', self.view, HEADER.size + i * RECORD.size)[0]
+
+    def find(self, tick):
+        """Record number of the first record at or after a tick"""
+        block = bisect.bisect_right(self.index_ticks, tick) - 1
+        low = self.index_records[block] if block >= 0 else 0
+        high = self.index_records[block + 1] if block + 1 < len(self.index_records) else self.count
+        # Binary search the block between two index entries
+        while low < high:
+            middle = (low + high) // 2
+            if self.tick_at(middle) < tick:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def as_array(self):
+        """All records as a NumPy structured array backed by the mapped file"""
+        import numpy as np
+        return np.frombuffer(self.map, dtype=np.dtype(RECORD_DTYPE),
+                             count=self.count, offset=HEADER.size)
+
+    def to_recording(self):
+        """Replay Recording of the logged inputs, for logs written at a fixed rate
+
+        Keys are a bitmask per tick, so the order of different keys pressed
+        on the same tick is not kept.
+        """
+        if not self.fps:
+            raise ValueError("Tick log was written on the real clock and can't be replayed")
+        recording = Recording(self.seed, self.fps)
+        quality = 0
+        for record in (self[i] for i in range(self.count)):
+            # Keys were handled before the update that moved to this tick
+            for bit, key in enumerate(INPUT_KEYS):
+                if record.inputs & (1 << bit):
+                    recording.add_key(record.tick - 1, key)
+            # Quality changes happen after the draw, before the next tick's keys
+            if record.quality != quality:
+                quality = record.quality
+                recording.add_quality(record.tick, quality)
+            recording.frames = record.tick
+        recording.inputs.sort(key=lambda i: (i[0], i[1] != QUALITY))
+        return recording
+
+    def close(self):
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark(path='benchmark.ticklog', ticks=1_000_000):
+    """Write and read back a million synthetic ticks"""
+    import time
+    start = time.perf_counter()
+    writer = TickLogWriter(path, fps=60)
+    for tick in range(1, ticks + 1):
+        writer.append_values(tick, STARTED, 0, 0, tick // 60, 4.0 + tick * 2e-6,
+                             tick * 4.0, 1, 0, 3, 20, 5.0 + (tick % 7))
+    writer.close()
+    write_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with TickLog(path) as log:
+        records = log.as_array()
+        average = float(records['frame_ms'].mean())
+        slow = int((records['frame_ms'] > 10).sum())
+        del records  # Release the buffer before the map is closed
+        analyse_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for tick in range(1, ticks, ticks // 1000):
+            assert log[log.find(tick)].tick == tick
+        seek_time = (time.perf_counter() - start) / 1000
+
+    size = os.path.getsize(path)
+    os.remove(path)
+    os.remove(index_path(path))
+    print(f"Wrote {ticks} ticks ({size / 1e6:.1f} MB) in {write_time:.2f}s "
+          f"({ticks / write_time / 1e6:.2f}M ticks/s)")
+    print(f"Mapped and analysed in {analyse_time * 1000:.1f} ms "
+          f"(mean frame {average:.2f} ms, {slow} slow frames)")
+    print(f"Seek to tick: {seek_time * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,313 @@
+"""Day, dusk, night and dawn as the score climbs, by tinting cached sprites
+
+    python -m game.utils.time_of_day
+
+A cycle of POINTS_PER_CYCLE points is split into STEPS steps, and each
+step has a colour lookup table per channel, precomputed from a few
+keyframes of gain, lift and gamma. Nothing is re-rendered for the time
+of day: the render queue swaps every scene sprite it blits for a copy
+with the current table applied, kept until the step changes. So the sky,
+the clouds, the ground, the obstacles, the eagles and the sheep each get
+tinted once per step, and every other frame only pays a dictionary
+lookup per sprite. The HUD and menus are left alone.
+
+Tinting them all at once takes a few milliseconds, most of it the
+background, so the copies for the next step are made ahead: from
+PREPARE_POINTS before the step changes, each frame spends up to
+PREPARE_MS of CPU time tinting the sprites drawn at the current step
+into copies for the next one, a band of rows at a time. A band is only
+started when twice the slowest band so far still fits in what is left
+of the frame's share. Copies from the step before are reused as the surfaces
+to tint into, and the background's are allocated up front with
+reserve(), since allocating a surface that size alone takes longer than
+PREPARE_MS. A sprite that still has no copy when the step changes (one
+first drawn after the boundary, or every one when the score skips a
+step) is tinted on first use.
+
+Tables are applied with NumPy on a surfarray view of the copy. Surfaces
+surfarray can't reference get the gain and lift as blend fills instead,
+without the gamma.
+"""
+import time
+import numpy as np
+import pygame
+
+POINTS_PER_CYCLE = 800  # Score from one noon to the next
+STEPS = 32  # Tints per cycle
+PREPARE_POINTS = 20  # Score before a step change from which its copies are made, of 25 per step
+PREPARE_MS = 0.5  # CPU time per frame for making them
+BAND_PIXELS = 5_000  # Pixels per band of rows sprites are tinted in
+SPARES = 2  # Surfaces kept per sprite to tint the next copies into
+
+# (fraction of the cycle, gain, lift, gamma) per channel, tints between
+# keyframes are interpolated
+KEYFRAMES = (
+    (0.00, (1.00, 1.00, 1.00), (0, 0, 0), (1.0, 1.0, 1.0)),  # Day
+    (0.30, (1.00, 1.00, 1.00), (0, 0, 0), (1.0, 1.0, 1.0)),
+    (0.45, (1.00, 0.72, 0.55), (25, 5, 10), (1.0, 1.1, 1.2)),  # Dusk
+    (0.58, (0.30, 0.36, 0.55), (5, 8, 25), (1.3, 1.3, 1.1)),  # Night
+    (0.80, (0.30, 0.36, 0.55), (5, 8, 25), (1.3, 1.3, 1.1)),
+    (0.92, (0.95, 0.78, 0.75), (20, 10, 15), (1.0, 1.05, 1.1)),  # Dawn
+    (1.00, (1.00, 1.00, 1.00), (0, 0, 0), (1.0, 1.0, 1.0)),
+)
+
+
+def build_tints(steps=STEPS, keyframes=KEYFRAMES):
+    """Gains, lifts and lookup tables for every step, as (steps, 3) and (steps, 3, 256) arrays"""
+    at = np.arange(steps) / steps
+    times = [frame[0] for frame in keyframes]
+    gains = np.stack([np.interp(at, times, [f[1][c] for f in keyframes]) for c in range(3)], 1)
+    lifts = np.stack([np.interp(at, times, [f[2][c] for f in keyframes]) for c in range(3)], 1)
+    gammas = np.stack([np.interp(at, times, [f[3][c] for f in keyframes]) for c in range(3)], 1)
+    values = np.arange(256) / 255
+    curves = 255 * values ** gammas[:, :, None] * gains[:, :, None] + lifts[:, :, None]
+    luts = np.clip(np.rint(curves), 0, 255).astype(np.uint8)
+    return gains, lifts, luts
+
+
+def apply_lut(surface, lut, gain, lift):
+    """A copy of surface with lut[channel] applied to its colours, alpha is kept"""
+    tinted = surface.copy()
+    try:
+        pixels = pygame.surfarray.pixels3d(tinted)
+    except (ValueError, pygame.error):
+        # Formats surfarray can't reference, blend fills do the linear part
+        tinted.fill([int(g * 255) for g in gain], special_flags=pygame.BLEND_RGB_MULT)
+        tinted.fill([int(l) for l in lift], special_flags=pygame.BLEND_RGB_ADD)
+        return tinted
+    for channel in range(3):
+        pixels[..., channel] = lut[channel][pixels[..., channel]]
+    del pixels  # Unlocks the surface
+    return tinted
+
+
+def blank_like(surface):
+    """An uninitialised surface of the same size and format as surface"""
+    blank = pygame.Surface(surface.get_size(), surface.get_flags() & pygame.SRCALPHA, surface)
+    if surface.get_colorkey() is not None:
+        blank.set_colorkey(surface.get_colorkey())
+    if surface.get_alpha() is not None:
+        blank.set_alpha(surface.get_alpha())
+    return blank
+
+
+def tint_rows(surface, target, lut, start, stop):
+    """Rows start to stop of surface written to target with lut[channel] applied, alpha copied"""
+    pixels = pygame.surfarray.pixels3d(surface)
+    tinted = pygame.surfarray.pixels3d(target)
+    for channel in range(3):
+        tinted[:, start:stop, channel] = lut[channel][pixels[:, start:stop, channel]]
+    del pixels, tinted  # Unlocks the surfaces
+    if surface.get_flags() & pygame.SRCALPHA:
+        alpha = pygame.surfarray.pixels_alpha(target)
+        alpha[:, start:stop] = pygame.surfarray.pixels_alpha(surface)[:, start:stop]
+        del alpha
+
+
+class TimeOfDay:
+    """The time of day for a score, and the scene sprites tinted for it
+
+    Args:
+        points_per_cycle (int): Score from one noon to the next
+        steps (int): Tints per cycle
+    """
+
+    def __init__(self, points_per_cycle=POINTS_PER_CYCLE, steps=STEPS):
+        self.points_per_cycle = points_per_cycle
+        self.steps = steps
+        self.gains, self.lifts, self.luts = build_tints(steps)
+        identity = np.arange(256, dtype=np.uint8)
+        # Steps that leave colours as they are need no copies at all
+        self.plain = [bool((lut == identity).all()) for lut in self.luts]
+        self.step = 0
+        self.tinted = {}  # Sprite -> its copy for the current step, itself at plain steps
+        self.build_ms = 0.0  # Time spent tinting copies for the current step on first use
+        self.preparing = False  # Whether the next step's copies are being made
+        self.upcoming_step = None  # Step the copies made ahead are for
+        self.upcoming = {}  # Sprite -> its finished copy for that step
+        self.partial = None  # (sprite, copy, rows done) of a copy being made a band at a time
+        self.prepare_ms = 0.0  # CPU time spent making the upcoming copies
+        self.band_ms = 0.0  # CPU time of the slowest band so far
+        self.spare = {}  # Sprite -> surfaces of its size and format to tint into
+
+    @property
+    def tinting(self):
+        """Whether the current step changes any colours"""
+        return not self.plain[self.step]
+
+    def update(self, score):
+        """Move to the step for score, True if it changed"""
+        step = score * self.steps // self.points_per_cycle % self.steps
+        if step == self.step:
+            return False
+        self.step = step
+        done = self.tinted
+        if step == self.upcoming_step:
+            self.tinted = self.upcoming
+        else:
+            self.tinted = {}
+            self.recycle(self.upcoming)
+        self.recycle(done)
+        if self.partial is not None:
+            self.recycle({self.partial[0]: self.partial[1]})
+        self.build_ms = 0.0
+        self.preparing = False
+        self.upcoming_step = None
+        self.upcoming = {}
+        self.partial = None
+        self.prepare_ms = 0.0
+        return True
+
+    def reserve(self, sprite):
+        """Allocate the surfaces sprite is tinted into now, for sprites as large as the background"""
+        spare = self.spare.setdefault(sprite, [])
+        while len(spare) < SPARES:
+            spare.append(blank_like(sprite))
+
+    def recycle(self, copies):
+        """Keep copies that are no longer drawn as surfaces to tint the next ones into"""
+        for sprite, copy in copies.items():
+            if copy is not sprite:
+                spare = self.spare.setdefault(sprite, [])
+                if len(spare) < SPARES:
+                    spare.append(copy)
+
+    def prepare(self, score, sprites=()):
+        """Make some of the next step's copies, call once per frame after update()
+
+        Nothing is done before the score is PREPARE_POINTS from the next
+        step, or when that step is plain. sprites (the background) go
+        before the ones drawn at the current step. While preparing, tint()
+        has to be called for every scene sprite even at a plain step, so
+        it learns which sprites to make copies of.
+        """
+        upcoming = (self.step + 1) % self.steps
+        boundary = -(-(score * self.steps // self.points_per_cycle + 1) *
+                     self.points_per_cycle // self.steps)
+        self.preparing = boundary - score <= PREPARE_POINTS and not self.plain[upcoming]
+        if not self.preparing:
+            return
+        if upcoming != self.upcoming_step:
+            self.upcoming_step = upcoming
+            self.recycle(self.upcoming)
+            self.upcoming = {}
+            self.partial = None
+        start = time.thread_time()
+        budget = PREPARE_MS / 1000
+        lut, gain, lift = self.luts[upcoming], self.gains[upcoming], self.lifts[upcoming]
+        queue = [sprite for sprite in (*sprites, *self.tinted) if sprite not in self.upcoming]
+        if self.partial is not None:
+            queue.insert(0, self.partial[0])
+        banded = False  # Whether this frame tinted anything yet
+        for sprite in queue:
+            if self.partial is not None and self.partial[0] is sprite:
+                _, tinted, row = self.partial
+            else:
+                tinted, row = None, 0
+            width, height = sprite.get_size()
+            rows = max(1, BAND_PIXELS // max(1, width))
+            while row < height:
+                band_start = time.thread_time()
+                # Twice the slowest band leaves room for one that runs
+                # slower than any before. A band always goes in on a frame
+                # of its own, so one slower than the whole share can't
+                # stop the rest for good.
+                if banded and band_start - start + 2 * self.band_ms / 1000 > budget:
+                    break
+                if tinted is None:
+                    spare = self.spare.get(sprite)
+                    tinted = spare.pop() if spare else blank_like(sprite)
+                try:
+                    tint_rows(sprite, tinted, lut, row, row + rows)
+                    row += rows
+                except (ValueError, pygame.error):
+                    # Formats surfarray can't reference, in one go
+                    tinted = apply_lut(sprite, lut, gain, lift)
+                    row = height
+                banded = True
+                self.band_ms = max(self.band_ms, (time.thread_time() - band_start) * 1000)
+            if row < height:
+                self.partial = (sprite, tinted, row) if tinted is not None else None
+                break
+            self.partial = None
+            self.upcoming[sprite] = tinted
+        self.prepare_ms += (time.thread_time() - start) * 1000
+
+    def tint(self, sprite):
+        """sprite as it looks at the current step"""
+        tinted = self.tinted.get(sprite)
+        if tinted is None:
+            if self.plain[self.step]:
+                self.tinted[sprite] = sprite  # Only noted, for prepare()
+                return sprite
+            start = time.perf_counter()
+            step = self.step
+            tinted = self.tinted[sprite] = apply_lut(sprite, self.luts[step],
+                                                     self.gains[step], self.lifts[step])
+            self.build_ms += (time.perf_counter() - start) * 1000
+        return tinted
+
+    def stats(self):
+        """The step and what tinting it cost, for the overlay"""
+        return {
+            'time_of_day': f"{self.step}/{self.steps}",
+            'tinted_sprites': len(self.tinted),
+            'tint_build_ms': round(self.build_ms, 2),
+            'tint_ahead': len(self.upcoming),
+            'tint_prepare_ms': round(self.prepare_ms, 2),
+        }
+
+
+def benchmark(frames=300):
+    """Time a step change and the per frame cost at day and at night"""
+    from .autopilot import autoplayed_game
+
+    game, _ = autoplayed_game()
+    background = game.background
+    start = time.perf_counter()
+    for _ in range(10):
+        game.render_background()
+    print(f"Rendering the background gradient: {(time.perf_counter() - start) * 100:.2f} ms")
+
+    def draw_frames():
+        start = time.perf_counter()
+        for _ in range(frames):
+            game.draw()
+        return (time.perf_counter() - start) / frames * 1000
+
+    print(f"Day: draw() {draw_frames():.3f} ms per frame")
+    time_of_day = game.time_of_day
+    # The start of a night step, so the draws don't prepare the next one yet
+    game.score = -(-int(0.7 * time_of_day.steps) * time_of_day.points_per_cycle // time_of_day.steps)
+    game.update_time_of_day()
+    start = time.perf_counter()
+    time_of_day.tint(background)
+    background_ms = (time.perf_counter() - start) * 1000
+    game.draw()  # Tints the rest of this frame's sprites
+    print(f"Skipping to night: tinting {len(time_of_day.tinted)} sprites on first use took "
+          f"{time_of_day.build_ms:.2f} ms, {background_ms:.2f} ms of it the background")
+    print(f"Night: draw() {draw_frames():.3f} ms per frame")
+
+    # Play up to the next step change, with the copies made ahead
+    step = time_of_day.step + 1
+    boundary = -(-step * time_of_day.points_per_cycle // time_of_day.steps)
+    game.score = boundary - PREPARE_POINTS
+    slowest = 0.0
+    ahead = 0
+    while not all(sprite in time_of_day.upcoming for sprite in time_of_day.tinted):
+        before = time_of_day.prepare_ms
+        game.draw()
+        slowest = max(slowest, time_of_day.prepare_ms - before)
+        ahead += 1
+    made = len(time_of_day.upcoming)
+    prepare_ms = time_of_day.prepare_ms
+    game.score = boundary
+    game.draw()
+    print(f"Next step: {made} copies made ahead over {ahead} frames, {prepare_ms:.2f} ms in all "
+          f"and {slowest:.2f} ms at most per frame, {time_of_day.build_ms:.2f} ms left for "
+          f"the frame the step changed on")
+    assert slowest <= PREPARE_MS, f"a frame spent {slowest:.2f} ms preparing, over {PREPARE_MS} ms"
+
+
+if __name__ == "__main__":
+    benchmark()